@@ -0,0 +1,21 @@
+"""
+Micro-benchmarks of the backend components, they run offline against in-memory fakes of Mongo and Elasticsearch.
+
+Run from the backend directory:
+    python -m benchmarks.run                      time every stage
+    python -m benchmarks.run --save baseline      time them and save the results as a baseline
+    python -m benchmarks.run --compare baseline   time them and compare with a saved baseline
+"""
+import os
+
+# the values do not matter, they only have to be present when there is no .env file
+for key, value in {
+    "APP_NAME": "Al-Baheth", "APP_VERSION": "0", "FILE_ALLOWED_TYPES": '["text/plain"]', "FILE_MAX_SIZE": "5",
+    "FILE_DEFAULT_CHUNK_SIZE": "512000", "LANGUAGE_PROCESSOR": "NLTK", "PARSING_SERVICE": "LangChain",
+    "INDEXING_SERVICE": "ElasticSearch", "DB_URL": "mongodb://localhost:27017", "ES_URL": "http://localhost:9200",
+    "ES_INDEXING": "docs", "EMBEDDING_MODEL": "all-mpnet-base-v2",
+}.items():
+    os.environ.setdefault(key, value)
+
+# the benchmarks must not read or overwrite the NLP memo caches saved by the server
+os.environ.setdefault("NLP_CACHE_FILE", "")
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark of the per-request dependency overhead.
+
+Sends requests through FastAPI's TestClient to a route depending on the QueryController, so the timings include
+the real dependency resolution. The "container" app resolves the services from the app-scoped ServiceContainer,
+the "per request" app overrides the providers with the ones the dependencies used to be:
+the settings parsed for each request and the services and repository built from them.
+
+Run from the backend directory:
+    python -m benchmarks.dependency_overhead
+"""
+import timeit
+
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from core.controllers import QueryController
+from core.helpers.ServiceContainer import ServiceContainer
+from core.helpers.config import Settings
+from core.repositories import DocumentRepository, get_document_repository
+from core.services import get_language_processing_service, get_parsing_service
+from core.services.dependencies import getIndexingService, getLanguageProcessingService, getLexicalIndexingService, \
+    getParsingService
+
+REQUESTS = 500
+
+# the benchmark never calls the indexing services, Numpy is the one built without a client
+SETTINGS_OVERRIDES = {"INDEXING_SERVICE": "Numpy", "HYBRID_SEARCH_ENABLED": False}
+
+
+def parse_settings() -> Settings:
+    # the settings dependency used to read the environment and .env on every request
+    return Settings(**SETTINGS_OVERRIDES)
+
+
+def build_parsing_service(settings: Settings = Depends(parse_settings)):
+    return getParsingService(settings)
+
+
+def build_language_processing_service(settings: Settings = Depends(parse_settings)):
+    return getLanguageProcessingService(settings)
+
+
+def build_indexing_service(request: Request, settings: Settings = Depends(parse_settings)):
+    return getIndexingService(settings, request.app)
+
+
+def build_lexical_indexing_service(request: Request, settings: Settings = Depends(parse_settings)):
+    return getLexicalIndexingService(settings, request.app)
+
+
+def build_document_repository(
+        request: Request,
+        indexing_service=Depends(build_indexing_service),
+        lexical_service=Depends(build_lexical_indexing_service)
+) -> DocumentRepository:
+    # the repository parsed the settings again in its constructor
+    return DocumentRepository(
+        indexing_service,
+        lexical_service,
+        request.app.embedding_worker,
+        Settings(**SETTINGS_OVERRIDES),
+        result_cache=request.app.search_result_cache
+    )
+
+
+PER_REQUEST_OVERRIDES = {
+    get_parsing_service: build_parsing_service,
+    get_language_processing_service: build_language_processing_service,
+    get_document_repository: build_document_repository,
+}
+
+
+def make_app(per_request: bool = False) -> FastAPI:
+    """
+    :param per_request: Whether the services are built for every request instead of resolved from the container.
+    :return: An app with a single route resolving the QueryController, its lifespan is not run.
+    """
+    app = FastAPI()
+
+    # only the attributes read by the constructors, nothing is called
+    app.embedding_worker = None
+    app.query_embedding_cache = None
+    app.search_result_cache = None
+    app.vector_store = None
+    app.lexical_index = None
+    app.processing_pool = None
+    app.services = ServiceContainer(app, Settings(**SETTINGS_OVERRIDES))
+
+    if per_request:
+        app.dependency_overrides.update(PER_REQUEST_OVERRIDES)
+
+    @app.get("/")
+    async def resolve(controller: QueryController = Depends()):
+        return Response()
+
+    return app
+
+
+def make_client(per_request: bool = False) -> TestClient:
+    """
+    :param per_request: Whether the services are built for every request instead of resolved from the container.
+    :return: A client of the benchmarked app.
+    """
+    return TestClient(make_app(per_request))
+
+
+def main() -> None:
+    for name, per_request in (("per request", True), ("container", False)):
+        client = make_client(per_request)
+        seconds = min(timeit.repeat(lambda: client.get("/"), number=REQUESTS, repeat=3))
+        print(f"{name:<12} {seconds / REQUESTS * 1e6:10.1f} us per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+In-memory stand-ins for the embedding model, AsyncElasticsearch and the Beanie Document collection,
+implementing only the calls made by the services under benchmark.
+"""
+import hashlib
+from contextlib import contextmanager
+
+import numpy as np
+
+from core.models import Document
+
+DIMS = 768
+
+
+class FakeEmbeddingModel:
+    """
+    Returns a deterministic unit vector per text, seeded by the text's hash.
+    Its cost grows with the number of texts like the real model's, without its absolute cost.
+    """
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        vectors = np.empty((len(texts), DIMS), dtype=np.float32)
+        for row, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+            vectors[row] = np.random.default_rng(seed).standard_normal(DIMS, dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class _FakeIndices:
+    def __init__(self, client: "FakeAsyncElasticsearch"):
+        self.client = client
+
+    async def exists(self, index: str) -> bool:
+        return index in self.client.documents
+
+    async def create(self, index: str, **kwargs) -> dict:
+        self.client.documents.setdefault(index, {})
+        return {"acknowledged": True}
+
+
+class FakeAsyncElasticsearch:
+    """
+    An exact kNN over the stored vectors, with the cosine scores scaled to [0, 1] like Elasticsearch.
+    """
+
+    def __init__(self):
+        self.documents: dict[str, dict[str, dict]] = {}
+        self.indices = _FakeIndices(self)
+        self._matrices: dict[str, tuple[list[str], np.ndarray]] = {}
+
+    def add(self, index: str, document_id: str, source: dict) -> None:
+        self.documents.setdefault(index, {})[document_id] = source
+        self._matrices.pop(index, None)
+
+    async def index(self, index: str, id: str, document: dict) -> dict:
+        self.add(index, id, document)
+        return {"result": "created"}
+
+    def _matrix(self, index: str) -> tuple[list[str], np.ndarray]:
+        if index not in self._matrices:
+            ids = list(self.documents[index])
+            vectors = np.asarray([self.documents[index][i]["embedding"] for i in ids], dtype=np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            self._matrices[index] = (ids, vectors)
+        return self._matrices[index]
+
+    async def knn_search(self, index: str, knn: dict) -> dict:
+        return self._knn(index, knn)
+
+    async def msearch(self, searches: list[dict]) -> dict:
+        return {
+            "responses": [
+                self._knn(header["index"], body["knn"])
+                for header, body in zip(searches[::2], searches[1::2])
+            ]
+        }
+
+    def _knn(self, index: str, knn: dict) -> dict:
+        ids, vectors = self._matrix(index)
+        query = np.asarray(knn["query_vector"], dtype=np.float32)
+        scores = (1 + vectors @ (query / np.linalg.norm(query))) / 2
+
+        k = min(knn["k"], len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return {
+            "hits": {
+                "hits": [
+                    {"_id": ids[row], "_score": float(scores[row]), "_source": self.documents[index][ids[row]]}
+                    for row in top
+                ]
+            }
+        }
+
+    async def close(self) -> None:
+        pass
+
+
+class _FakeQuery:
+    def __init__(self, documents: dict[str, dict], filters: dict):
+        keys = filters.get("hashed_content", {}).get("$in")
+        self.documents = [documents[key] for key in keys if key in documents] if keys is not None \
+            else list(documents.values())
+        self.projection = None
+
+    def project(self, projection):
+        self.projection = projection
+        return self
+
+    async def to_list(self) -> list:
+        if self.projection is None:
+            return [Document.model_construct(**document) for document in self.documents]
+
+        fields = self.projection.model_fields
+        return [
+            self.projection(**{name: document.get(name) for name in fields if name in document})
+            for document in self.documents
+        ]
+
+
+@contextmanager
+def fake_documents(documents: list[dict]):
+    """
+    Serve Document.find from a list of documents held in memory, only the "$in" filter on hashed_content is supported.
+
+    :param documents: The stored documents, as dicts of their fields.
+    """
+    by_key = {document["hashed_content"]: document for document in documents}
+    original_find = Document.__dict__.get("find")
+    Document.find = classmethod(lambda cls, filters=None, *args, **kwargs: _FakeQuery(by_key, filters or {}))
+    try:
+        yield
+    finally:
+        if original_find is None:
+            del Document.find
+        else:
+            Document.find = original_find
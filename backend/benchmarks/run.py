@@ -0,0 +1,50 @@
+"""
+Run the component benchmarks, optionally saving them as a baseline or comparing them with one.
+
+Run from the backend directory:
+    python -m benchmarks.run [--filter NAME] [--save BASELINE] [--compare BASELINE] [--model MODEL_NAME]
+"""
+import argparse
+import sys
+
+from .runner import BenchmarkRunner
+from .stages import run_all
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline component benchmarks")
+    parser.add_argument("--rounds", type=int, default=20, help="timed rounds per benchmark")
+    parser.add_argument("--filter", default=None, help="only run the benchmarks whose name contains this string")
+    parser.add_argument("--save", metavar="BASELINE", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare the results with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown of the median reported as a regression")
+    parser.add_argument("--model", default=None,
+                        help="a SentenceTransformer model to encode with, instead of the deterministic fake")
+    args = parser.parse_args()
+
+    embedding_model = None
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        embedding_model = SentenceTransformer(args.model)
+
+    runner = BenchmarkRunner(rounds=args.rounds, name_filter=args.filter)
+    try:
+        run_all(runner, embedding_model)
+    finally:
+        runner.close()
+
+    if args.save:
+        print(f"\nsaved {runner.save(args.save)}")
+
+    if args.compare:
+        regressions = runner.compare(args.compare, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s)")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Callable, Optional
+
+BASELINES_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+class BenchmarkRunner:
+    """
+    Times functions the way pytest-benchmark does: a few warm-up calls, then rounds of calls,
+    keeping the min, median, mean and standard deviation of the rounds.
+    Coroutine functions are awaited on one event loop shared by all the benchmarks.
+    """
+
+    def __init__(self, rounds: int = 20, min_round_seconds: float = 0.01, name_filter: Optional[str] = None):
+        """
+        :param rounds: The number of timed rounds per benchmark.
+        :param min_round_seconds: A round calls the function as many times as needed to last at least this long.
+        :param name_filter: Only run the benchmarks whose name contains this string.
+        """
+        self.rounds = rounds
+        self.min_round_seconds = min_round_seconds
+        self.name_filter = name_filter
+        self.loop = asyncio.new_event_loop()
+        self.results: dict[str, dict] = {}
+
+    def _call(self, func: Callable) -> None:
+        if asyncio.iscoroutinefunction(func):
+            self.loop.run_until_complete(func())
+        else:
+            func()
+
+    def _time(self, func: Callable, calls: int) -> float:
+        if asyncio.iscoroutinefunction(func):
+            async def run_calls():
+                start_time = time.perf_counter()
+                for _ in range(calls):
+                    await func()
+                return time.perf_counter() - start_time
+
+            return self.loop.run_until_complete(run_calls())
+
+        start_time = time.perf_counter()
+        for _ in range(calls):
+            func()
+        return time.perf_counter() - start_time
+
+    def bench(self, name: str, func: Callable, group: str = "", warmup: int = 2) -> None:
+        """
+        Time a function taking no arguments, its failures are recorded with their reason instead of timings.
+
+        :param name: The name of the benchmark, unique in the suite.
+        :param func: The function, or coroutine function, to time.
+        :param group: The stage the benchmark belongs to.
+        :param warmup: The number of untimed calls before the rounds.
+        """
+        if self.name_filter and self.name_filter not in name:
+            return
+
+        try:
+            for _ in range(warmup):
+                self._call(func)
+
+            # calibrate the calls per round on a single call
+            calls = max(1, int(self.min_round_seconds / max(self._time(func, 1), 1e-9)))
+            timings = [self._time(func, calls) / calls for _ in range(self.rounds)]
+        except Exception as e:
+            reason = f"{type(e).__name__}: " + next((line for line in str(e).splitlines() if line.strip("* ")), "")
+            self.results[name] = {"group": group, "failed": reason}
+            print(f"{name:<48} failed ({reason})")
+            return
+
+        self.results[name] = {
+            "group": group,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.mean(timings),
+            "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            "calls_per_round": calls,
+            "rounds": self.rounds,
+        }
+        print(f"{name:<48} median {self._format(self.results[name]['median'])}"
+              f"   min {self._format(self.results[name]['min'])}")
+
+    @staticmethod
+    def _format(seconds: float) -> str:
+        for unit, scale in (("s ", 1), ("ms", 1e-3), ("us", 1e-6)):
+            if seconds >= scale:
+                return f"{seconds / scale:9.3f} {unit}"
+        return f"{seconds / 1e-9:9.1f} ns"
+
+    def save(self, baseline_name: str) -> str:
+        """
+        :param baseline_name: The name of the baseline file, without extension.
+        :return: The path of the saved baseline.
+        """
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        path = os.path.join(BASELINES_DIR, f"{baseline_name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.results, f, indent=2, sort_keys=True)
+        return path
+
+    def compare(self, baseline_name: str, threshold: float) -> list[str]:
+        """
+        Print the change of the median of every benchmark against a saved baseline.
+        A benchmark timed in the baseline that fails now is a regression too.
+
+        :param baseline_name: The name of the baseline file, without extension.
+        :param threshold: The relative slowdown reported as a regression, 0.1 for 10%.
+        :return: The names of the regressed benchmarks.
+        """
+        with open(os.path.join(BASELINES_DIR, f"{baseline_name}.json"), encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        regressions = []
+        print(f"\ncompared with {baseline_name}:")
+        for name, result in self.results.items():
+            previous = baseline.get(name)
+            if not previous or "median" not in previous:
+                continue
+
+            if "failed" in result:
+                regressions.append(name)
+                print(f"{name:<48}   failed  REGRESSION")
+                continue
+
+            change = result["median"] / previous["median"] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append(name)
+            print(f"{name:<48} {change:+8.1%}{flag}")
+
+        return regressions
+
+    def close(self) -> None:
+        self.loop.close()
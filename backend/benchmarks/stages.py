@@ -0,0 +1,250 @@
+"""
+The benchmarked stages, each timed in isolation over the evaluation corpus, or generated text when it is missing.
+"""
+import os
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.helpers.config import get_settings
+from core.services.Directory import DirectoryService
+from core.services.Embedding import EmbeddingCache, EmbeddingWorker
+from core.services.Evaluation import EvaluationDataset
+from core.services.Indexing import DenseIndexingService, ElasticSearchService
+from core.services.NLP import NLTKService
+from core.services.Parsing import LangChainService
+from core.services.Snippet import SnippetService
+from core.repositories import DocumentRepository
+from .dependency_overhead import make_client
+from .fakes import DIMS, FakeAsyncElasticsearch, FakeEmbeddingModel, fake_documents
+from .runner import BenchmarkRunner
+
+CORPUS_SIZE = 1000
+ENCODE_TEXTS = 256
+ENCODE_BATCH_SIZES = (1, 8, 32, 64)
+
+
+def load_corpus() -> tuple[list[str], list[str]]:
+    """
+    :return: The document texts and the queries, from the CISI collection when present.
+    """
+    try:
+        dataset = EvaluationDataset.load(DirectoryService.evaluation_dir)
+        return list(dataset.documents.values())[:CORPUS_SIZE], list(dataset.queries.values())
+    except FileNotFoundError:
+        rng = np.random.default_rng(0)
+        words = [f"term{i}" for i in range(5000)]
+        documents = [" ".join(rng.choice(words, 150)) for _ in range(CORPUS_SIZE)]
+        return documents, [" ".join(rng.choice(words, 8)) for _ in range(100)]
+
+
+@contextmanager
+def files_dir(directory: str):
+    original = DirectoryService.files_dir
+    DirectoryService.files_dir = directory
+    try:
+        yield
+    finally:
+        DirectoryService.files_dir = original
+
+
+def write_samples(directory: str, text: str) -> list[str]:
+    """
+    Write the same text in every supported format whose writer library is installed.
+
+    :return: The written file names.
+    """
+    names = ["sample.txt"]
+    with open(os.path.join(directory, "sample.txt"), "w", encoding="utf-8") as f:
+        f.write(text)
+
+    # a minimal docx, docx2txt only reads word/document.xml
+    paragraphs = "".join(f"<w:p><w:r><w:t>{line}</w:t></w:r></w:p>" for line in text.splitlines())
+    with zipfile.ZipFile(os.path.join(directory, "sample.docx"), "w") as docx:
+        docx.writestr("word/document.xml",
+                      '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                      f"<w:body>{paragraphs}</w:body></w:document>")
+    names.append("sample.docx")
+
+    try:
+        import fitz
+
+        pdf = fitz.open()
+        lines = text.splitlines()
+        for start in range(0, len(lines), 40):
+            pdf.new_page().insert_text((50, 50), "\n".join(lines[start:start + 40]), fontsize=9)
+        pdf.save(os.path.join(directory, "sample.pdf"))
+        names.append("sample.pdf")
+    except ImportError:
+        pass
+
+    try:
+        from pptx import Presentation
+
+        presentation = Presentation()
+        lines = text.splitlines()
+        for start in range(0, len(lines), 10):
+            slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+            slide.placeholders[1].text = "\n".join(lines[start:start + 10])
+        presentation.save(os.path.join(directory, "sample.pptx"))
+        names.append("sample.pptx")
+    except ImportError:
+        pass
+
+    return names
+
+
+def bench_parsing(runner: BenchmarkRunner, documents: list[str]) -> None:
+    parsing_service = LangChainService()
+    text = "\n".join(document.replace("\n", " ")[:400] for document in documents[:200])
+
+    with tempfile.TemporaryDirectory() as directory, files_dir(directory):
+        for name in write_samples(directory, text):
+            runner.bench(f"parse[{os.path.splitext(name)[1][1:]}]",
+                         lambda name=name: parsing_service.parse(name), group="parsing")
+
+
+def bench_cleaning(runner: BenchmarkRunner, documents: list[str]) -> None:
+    # the memo caches are warm after the warm-up calls, the timings are the steady state of a long-running server
+    language_processing_service = NLTKService()
+    text = documents[0]
+    batch = documents[:32]
+
+    runner.bench("clean_text[semantic]", lambda: language_processing_service.clean_text(text),
+                 group="cleaning")
+    for profile in ("fast", "accurate"):
+        runner.bench(f"clean_text[{profile}]",
+                     lambda profile=profile: language_processing_service.clean_text(text, False, profile),
+                     group="cleaning")
+        runner.bench(f"clean_texts[{profile}, 32 texts]",
+                     lambda profile=profile: language_processing_service.clean_texts(batch, False, profile),
+                     group="cleaning")
+
+
+def start_worker(runner: BenchmarkRunner, embedding_model, max_batch_size: int) -> EmbeddingWorker:
+    worker = EmbeddingWorker(max_batch_size, 0, max_batch_size, embedding_model)
+
+    async def start():
+        worker.start()
+
+    runner.loop.run_until_complete(start())
+    return worker
+
+
+def bench_embedding(runner: BenchmarkRunner, documents: list[str], embedding_model) -> None:
+    texts = [document[:1000] for document in documents[:ENCODE_TEXTS]]
+
+    for max_batch_size in ENCODE_BATCH_SIZES:
+        worker = start_worker(runner, embedding_model, max_batch_size)
+
+        async def encode_many(worker=worker):
+            await worker.encode_many(texts)
+
+        runner.bench(f"encode_many[{ENCODE_TEXTS} texts, batch {max_batch_size}]", encode_many, group="embedding")
+        runner.loop.run_until_complete(worker.stop())
+
+
+def bench_rocchio(runner: BenchmarkRunner) -> None:
+    rng = np.random.default_rng(0)
+    query_vector = rng.standard_normal(DIMS).astype(np.float32)
+    feedback_vectors = [vector.tolist() for vector in rng.standard_normal((20, DIMS)).astype(np.float32)]
+    hits = [
+        {"file_id": f"doc{i // 4}", "score": 1 - i / 200, "embedding": vector.tolist()}
+        for i, vector in enumerate(rng.standard_normal((200, DIMS)).astype(np.float32))
+    ]
+
+    runner.bench("rocchio[20 feedback]",
+                 lambda: DenseIndexingService.rocchio(query_vector, feedback_vectors, 1, 0.75, 0.15, 0.25),
+                 group="rocchio")
+    runner.bench("rescore[200 hits]", lambda: DenseIndexingService.rescore(query_vector, hits), group="rocchio")
+    runner.bench("max_pool[200 hits]", lambda: DenseIndexingService.max_pool(hits), group="rocchio")
+
+
+def bench_search(runner: BenchmarkRunner, documents: list[str], queries: list[str], embedding_model) -> None:
+    es_client = FakeAsyncElasticsearch()
+    index_name = get_settings().ES_INDEXING
+    vectors = embedding_model.encode(documents)
+    for row, vector in enumerate(vectors):
+        es_client.add(index_name, str(row), {"file_id": str(row), "embedding": vector.tolist()})
+
+    worker = start_worker(runner, embedding_model, 32)
+    app = SimpleNamespace(
+        embedding_worker=worker,
+        query_embedding_cache=EmbeddingCache(1024),
+        es_client=es_client,
+    )
+    indexing_service = ElasticSearchService(app)
+    query = queries[0]
+    batch = queries[:32]
+
+    async def search():
+        await indexing_service.search(query)
+
+    async def search_many():
+        await indexing_service.search_many(batch)
+
+    runner.bench(f"es_search[rocchio, {len(documents)} docs]", search, group="search")
+    runner.bench(f"es_search_many[rocchio, {len(batch)} queries, {len(documents)} docs]", search_many,
+                 group="search")
+    runner.loop.run_until_complete(worker.stop())
+
+
+def bench_hydration(runner: BenchmarkRunner, documents: list[str], queries: list[str]) -> None:
+    settings = get_settings()
+    language_processing_service = NLTKService()
+    snippet_service = SnippetService(language_processing_service, settings.SNIPPET_PASSAGE_SIZE,
+                                     settings.SNIPPET_COUNT)
+    stored = [
+        {
+            "title": f"document {row}.txt",
+            "hashed_content": str(row),
+            "parsed_text": document,
+            "passage_offsets": snippet_service.passage_offsets(document),
+        }
+        for row, document in enumerate(documents)
+    ]
+    repository = DocumentRepository(None, None, None, settings, snippet_service)
+    results = [{"file_id": str(row), "score": 1 - row / 100} for row in range(0, 100, 10)]
+    query = queries[0]
+
+    async def titles():
+        await repository.hydrate(results)
+
+    async def with_snippets():
+        await repository.hydrate(results, query)
+
+    async def with_content():
+        await repository.hydrate(results, include_content=True)
+
+    with fake_documents(stored):
+        runner.bench("hydrate[titles, cached]", titles, group="hydration")
+        runner.bench("hydrate[snippets]", with_snippets, group="hydration")
+        runner.bench("hydrate[content]", with_content, group="hydration")
+
+
+def bench_dependencies(runner: BenchmarkRunner) -> None:
+    per_request_client = make_client(per_request=True)
+    container_client = make_client()
+
+    runner.bench("dependencies[per request]", lambda: per_request_client.get("/"), group="dependencies")
+    runner.bench("dependencies[container]", lambda: container_client.get("/"), group="dependencies")
+
+
+def run_all(runner: BenchmarkRunner, embedding_model=None) -> None:
+    """
+    :param runner: The runner collecting the results.
+    :param embedding_model: The model used by the embedding and search stages, a FakeEmbeddingModel by default.
+    """
+    embedding_model = embedding_model or FakeEmbeddingModel()
+    documents, queries = load_corpus()
+
+    bench_parsing(runner, documents)
+    bench_cleaning(runner, documents)
+    bench_embedding(runner, documents, embedding_model)
+    bench_rocchio(runner)
+    bench_search(runner, documents, queries, embedding_model)
+    bench_hydration(runner, documents, queries)
+    bench_dependencies(runner)
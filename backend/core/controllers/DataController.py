@@ -1,14 +1,17 @@
-import os, aiofiles, logging
+import os, aiofiles, hashlib, logging
 
-from fastapi import HTTPException, status
-from fastapi.params import Depends
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
 
 from ..controllers import BaseController
 from ..models import File, Document
 from ..repositories import DocumentRepo
 from ..services import ParsingService, LanguageProcessingService, DirectoryService
+from ..services.Metrics import metrics
+from ..services.Processing import tasks
 from ..models.enums import ResponseEnum
-from ..helpers.config import get_settings, Settings
+from ..helpers.config import get_settings
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -19,26 +22,20 @@ class DataController(BaseController):
             self,
             parsing_service: ParsingService,
             language_processing_service: LanguageProcessingService,
-            document_repository: DocumentRepo
+            document_repository: DocumentRepo,
+            request: Request
     ):
 
         super().__init__()
         self.parsing_service = parsing_service
         self.language_processing_service = language_processing_service
         self.document_repository = document_repository
+        self.processing_pool = request.app.processing_pool
+        self.file_ingest_service = request.app.services.file_ingest_service
 
 
     def parse_file(self, file_name):
-        try:
-            loader = self.parsing_service.load(file_name)
-
-            content = loader.load()
-            content = "\n".join([doc.page_content for doc in content])
-
-            return content  # the return will be updated to be mor e generic in the future
-
-        except Exception as e:
-            raise e
+        return self.parsing_service.parse(file_name)
 
 
     def clean_text(self, text: str, semantic:bool=True) -> str:
@@ -49,55 +46,99 @@ class DataController(BaseController):
         :param semantic: Flag to indicate if semantic processing is needed.
         :return: Cleaned text.
         """
+        return self.language_processing_service.clean_text(text, semantic)
 
-        if semantic:
-            return self.language_processing_service.semantic_processing(text)
 
-        # Normalization
-        text = self.language_processing_service.normalize(text)
-
-        # Tokenization
-        tokens = self.language_processing_service.tokenize(text)
+    async def clean_texts(self, texts: list[str], semantic: bool = True, profile: Optional[str] = None) -> list[str]:
+        """
+        Clean a batch of texts in the processing pool, the batch is split between the worker processes.
 
-        # Stopwords removal
-        tokens = self.language_processing_service.remove_stopwords(tokens)
+        :param texts: Extracted texts.
+        :param semantic: Flag to indicate if semantic processing is needed.
+        :param profile: The ProcessingProfileEnum value of the non-semantic pipeline, defaults to NLP_PROFILE.
+        :return: Cleaned texts, in the same order.
+        """
+        return await self.processing_pool.run_batched(tasks.clean_texts, texts, semantic, profile)
 
-        processed_tokens = self.language_processing_service.lemmatize(tokens)
 
-        # Stemming
-        processed_tokens = self.language_processing_service.stem(processed_tokens)
+    async def process_file(self, file_name: str, semantic: bool = True) -> str:
+        """
+        Parse and clean a file in the processing pool, without blocking the event loop.
 
-        return ' '.join(processed_tokens)
+        :param file_name: Name or path of the file.
+        :param semantic: Flag to indicate if semantic processing is needed.
+        :return: Cleaned text.
+        """
+        return await self.processing_pool.run(tasks.parse_and_clean, file_name, semantic)
 
 
     async def upload_file(self, file: File) -> Document:
         """
         Upload a file and process its content.
+        The raw bytes are hashed while they are streamed to disk, so a file that was already uploaded
+        is rejected before it is parsed and embedded.
         
         :param file: File object containing the file information.
         :return: Processed content of the file.
         """
         file.filename = file.filename.replace(" ", "_").lower()
         file_path = os.path.join(DirectoryService.files_dir, file.filename)
+        partial_path = f"{file_path}.part"
         settings = get_settings()
+        raw_hash = hashlib.sha256()
+        chunks = []
 
         try:
-            async with aiofiles.open(file_path, 'wb') as out_file:
-                while chunk := await file.read(settings.FILE_DEFAULT_CHUNK_SIZE):
-                    await out_file.write(chunk)
+            with metrics.span("upload.stream"):
+                async with aiofiles.open(partial_path, 'wb') as out_file:
+                    while chunk := await file.read(settings.FILE_DEFAULT_CHUNK_SIZE):
+                        raw_hash.update(chunk)
+                        chunks.append(chunk)
+                        await out_file.write(chunk)
 
         except Exception as e:
             logger.error(f"Error writing file {file.filename}: {str(e)}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
 
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        content = self.parse_file(file_path)
-        content = self.clean_text(content)
+        raw_hash = raw_hash.hexdigest()
+        with metrics.span("upload.duplicate_check"):
+            duplicate = await self.document_repository.exists_by_raw_hash(raw_hash)
+        if duplicate:
+            os.remove(partial_path)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": ResponseEnum.FILE_ALREADY_EXISTS.value
+                }
+            )
+
+        # the assets watcher and index_all skip the file while this request ingests it
+        await self.file_ingest_service.claim(file.filename, os.stat(partial_path), raw_hash)
 
-        created_document = await self.document_repository.create(
-            file=file,
-            file_title=file.filename,
-            file_content=content
+        # the file only replaces an existing one with the same name once it is complete
+        os.replace(partial_path, file_path)
+
+        try:
+            with metrics.span("upload.process"):
+                content = await self.process_file(file_path)
+
+            with metrics.span("upload.create"):
+                created_document = await self.document_repository.create(
+                    file_title=file.filename,
+                    file_content=content,
+                    bytes_content=b"".join(chunks),
+                    raw_hash=raw_hash
+                )
+        except Exception:
+            await self.file_ingest_service.release(file.filename)
+            raise
+
+        # the next index_all skips the file instead of parsing it again
+        await self.file_ingest_service.record(
+            file.filename, raw_hash, self.document_repository.hash_content(content)
         )
 
         if created_document is None:
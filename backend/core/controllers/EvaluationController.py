@@ -0,0 +1,248 @@
+import time
+from typing import Optional
+
+from beanie import PydanticObjectId
+from fastapi import Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+
+from .BaseController import BaseController
+from .DataController import DataController
+from ..models import EvaluationJob, EvaluationRequest, RocchioParameters
+from ..models.enums import IndexingEnum, ResponseEnum
+from ..repositories import DocumentRepo, DocumentRepository
+from ..services import DirectoryService, EvaluationJobRunner
+from ..services.Evaluation import EvaluationDataset, RetrievalMetrics
+from ..services.Indexing import DenseIndexingService
+
+
+class EvaluationController(BaseController):
+    def __init__(self,
+                 document_repository: DocumentRepo,
+                 evaluation_job_runner: EvaluationJobRunner,
+                 data_controller: DataController = Depends()):
+        super().__init__()
+        self.document_repository = document_repository
+        self.evaluation_job_runner = evaluation_job_runner
+        self.data_controller = data_controller
+
+    def load_dataset(self) -> EvaluationDataset:
+        directory = self.app_settings.EVALUATION_DATA_DIR or DirectoryService.evaluation_dir
+        try:
+            return EvaluationDataset.load(directory)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "message": ResponseEnum.EVALUATION_DATA_NOT_FOUND.value
+                }
+            )
+
+    async def ingest(self, dataset: EvaluationDataset, ingest: bool) -> tuple[dict[str, str], int]:
+        """
+        Clean the evaluation corpus in the processing pool, the same way index_all cleans the files,
+        and store and index it in batches of INDEXING_BATCH_SIZE.
+
+        :param dataset: The evaluation dataset.
+        :param ingest: Whether to store and index the documents, otherwise they are only cleaned and hashed.
+        :return: The doc_id of each document keyed by its hashed_content, and the number of documents created.
+        """
+        doc_ids = list(dataset.documents)
+        contents = await self.data_controller.clean_texts([dataset.documents[doc_id] for doc_id in doc_ids])
+        doc_id_by_key = {
+            DocumentRepository.hash_content(content): doc_id
+            for doc_id, content in zip(doc_ids, contents)
+        }
+
+        created_count = 0
+        if ingest:
+            batch_size = self.app_settings.INDEXING_BATCH_SIZE
+            for batch_start in range(0, len(doc_ids), batch_size):
+                batch = [
+                    {
+                        "file_title": f"{doc_id}.txt",
+                        "file_content": content,
+                    }
+                    for doc_id, content in zip(doc_ids[batch_start:batch_start + batch_size],
+                                               contents[batch_start:batch_start + batch_size])
+                ]
+                created_count += len(await self.document_repository.create_many(batch))
+
+        return doc_id_by_key, created_count
+
+    def _variants(self, evaluation_request: EvaluationRequest) -> list[tuple[str, Optional[RocchioParameters]]]:
+        # the Rocchio parameter sets only apply to the backends with a dense search
+        available = {"main": isinstance(self.document_repository.indexing_service, DenseIndexingService)}
+        if self.document_repository.lexical_service is not None:
+            available["lexical"] = False
+            available["hybrid"] = True
+
+        backends = evaluation_request.backends or list(available)
+        unavailable = [backend for backend in backends if backend not in available]
+        if unavailable:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "message": ResponseEnum.EVALUATION_BACKEND_NOT_AVAILABLE.value,
+                    "backends": unavailable,
+                    "available_backends": list(available),
+                }
+            )
+
+        return [
+            (backend, rocchio)
+            for backend in backends
+            for rocchio in (evaluation_request.rocchio if available[backend] else [None])
+        ]
+
+    async def _search_many(self, backend: str, queries: list[str], retrieved_count: int,
+                           rocchio: Optional[RocchioParameters]) -> list[list]:
+        search_kwargs = rocchio.model_dump() if rocchio else {}
+
+        if backend == "hybrid":
+            return await self.document_repository.hybrid_search_many(queries, retrieved_count, **search_kwargs)
+
+        if backend == "lexical":
+            service = self.document_repository.lexical_service
+        else:
+            service = self.document_repository.indexing_service
+        return await service.search_many(queries, retrieved_count=retrieved_count, **search_kwargs)
+
+    async def _doc_id_rankings(self, rankings: dict[str, list[str]], dataset: EvaluationDataset,
+                               doc_id_by_key: dict[str, str]) -> dict[str, list[str]]:
+        """
+        Map the ranked documents to the doc_ids of the evaluation dataset.
+        A document stored from the cleaned corpus is found by its hashed_content, one parsed from a file
+        of the corpus does not hash the same and is found by its title, the doc_id followed by the extension.
+
+        :param rankings: The hashed_content of the ranked documents of each query.
+        :param dataset: The evaluation dataset.
+        :param doc_id_by_key: The doc_id of each cleaned document keyed by its hashed_content,
+                              completed with the documents found by their title.
+        :return: The ranked doc_ids of each query, the documents outside the evaluation corpus keep their key
+                 and count as not relevant.
+        """
+        unmapped = list({key for ranking in rankings.values() for key in ranking if key not in doc_id_by_key})
+        if unmapped:
+            for key, title in (await self.document_repository.titles(unmapped)).items():
+                doc_id = title.split('.')[0]
+                if doc_id in dataset.documents:
+                    doc_id_by_key[key] = doc_id
+
+        retrieved = [key for ranking in rankings.values() for key in ranking]
+        if retrieved and not any(key in doc_id_by_key for key in retrieved):
+            # the metrics would all be 0 without saying why
+            raise ValueError(
+                "None of the retrieved documents belongs to the evaluation corpus, "
+                "ingest it or index its files named by doc_id"
+            )
+
+        return {
+            query_id: [doc_id_by_key.get(key, key) for key in ranking]
+            for query_id, ranking in rankings.items()
+        }
+
+    async def _run_variant(self, backend: str, rocchio: Optional[RocchioParameters], queries: dict[str, str],
+                           dataset: EvaluationDataset, doc_id_by_key: dict[str, str],
+                           evaluation_request: EvaluationRequest) -> dict:
+        query_ids = list(queries)
+        batch_size = evaluation_request.concurrency
+        latencies = []
+        rankings = {}
+
+        start_time = time.perf_counter()
+        for batch_start in range(0, len(query_ids), batch_size):
+            batch_query_ids = query_ids[batch_start:batch_start + batch_size]
+            batch_start_time = time.perf_counter()
+            results_lists = await self._search_many(
+                backend,
+                [queries[query_id] for query_id in batch_query_ids],
+                evaluation_request.retrieved_count,
+                rocchio
+            )
+            # every query of a batch gets its results when the whole batch is searched
+            latencies += [time.perf_counter() - batch_start_time] * len(batch_query_ids)
+
+            for query_id, results in zip(batch_query_ids, results_lists):
+                rankings[query_id] = [result["file_id"] for result in results]
+        elapsed_time = time.perf_counter() - start_time
+
+        rankings = await self._doc_id_rankings(rankings, dataset, doc_id_by_key)
+
+        return {
+            "backend": backend,
+            "indexing_service": IndexingEnum.BM25.value if backend == "lexical" else self.app_settings.INDEXING_SERVICE,
+            "rocchio": rocchio.model_dump() if rocchio else None,
+            "queries_count": len(rankings),
+            **RetrievalMetrics.quality(rankings, dataset.relevant),
+            **RetrievalMetrics.latency(latencies, elapsed_time),
+        }
+
+    async def evaluate(self, evaluation_request: EvaluationRequest):
+        """
+        Start evaluating the retrieval quality and latency of every backend and Rocchio parameter set
+        over the evaluation dataset in a background job, see EvaluationJobRunner.
+        The backends and the dataset are checked first, an invalid request fails right away.
+
+        :param evaluation_request: The evaluation parameters.
+        :return: JSON response with the ID of the job, its metrics are read with job_progress.
+        """
+        variants = self._variants(evaluation_request)
+        dataset = self.load_dataset()
+
+        job = await self.evaluation_job_runner.submit(
+            evaluation_request.model_dump(),
+            lambda: self._evaluate(evaluation_request, variants, dataset)
+        )
+
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "message": ResponseEnum.EVALUATION_JOB_STARTED.value,
+                "job_id": str(job.id),
+                "progress": job.progress(),
+            }
+        )
+
+    async def job_progress(self, job_id: str):
+        """
+        :param job_id: The ID returned when the evaluation was started.
+        :return: JSON response with the status of the job, and the metrics of each run once it completed.
+        """
+        job = None
+        if PydanticObjectId.is_valid(job_id):
+            job = await EvaluationJob.get(job_id)
+
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "message": ResponseEnum.EVALUATION_JOB_NOT_FOUND.value
+                }
+            )
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=job.progress()
+        )
+
+    async def _evaluate(self, evaluation_request: EvaluationRequest,
+                        variants: list[tuple[str, Optional[RocchioParameters]]],
+                        dataset: EvaluationDataset) -> dict:
+        doc_id_by_key, created_count = await self.ingest(dataset, evaluation_request.ingest)
+
+        judged_queries = dataset.judged_queries()
+        cleaned_queries = await self.data_controller.clean_texts(list(judged_queries.values()))
+        queries = dict(zip(judged_queries, cleaned_queries))
+
+        runs = []
+        for backend, rocchio in variants:
+            runs.append(await self._run_variant(backend, rocchio, queries, dataset, doc_id_by_key, evaluation_request))
+
+        return {
+            "message": ResponseEnum.EVALUATION_SUCCESS.value,
+            "documents_count": len(dataset.documents),
+            "ingested_count": created_count,
+            "queries_count": len(queries),
+            "retrieved_count": evaluation_request.retrieved_count,
+            "runs": runs,
+        }
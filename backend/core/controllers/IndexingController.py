@@ -1,52 +1,85 @@
-import os
+import time
 
-from fastapi import status, Depends
+from beanie import PydanticObjectId
+from fastapi import HTTPException, status, Depends
 from fastapi.responses import JSONResponse
 
 from .BaseController import BaseController
 from .DataController import DataController
 from ..models.enums import ResponseEnum
 from ..repositories import DocumentRepo
-from ..services import IndexingService, DirectoryService
-from ..models import File
+from ..services import IndexingService, IndexingJobRunner
+from ..models import IndexingJob
 
 
 class IndexingController(BaseController):
     def __init__(self,
                  indexing_service: IndexingService,
                  document_repository: DocumentRepo,
+                 indexing_job_runner: IndexingJobRunner,
                  data_controller: DataController = Depends()):
         super().__init__()
         self.indexing_service = indexing_service
+        self.indexing_job_runner = indexing_job_runner
         self.data_controller = data_controller
         self.document_repository = document_repository
 
     async def index_all(self):
         """
-        Index the documents in the assets folder and return the index reference.
-        
-        :return: JSON response with the index reference.
+        Start indexing the documents in the assets folder in a background job, see IndexingJobRunner.
+        Only one job runs at a time, while it runs the existing job is returned.
+
+        :return: JSON response with the ID and the progress of the job.
+        """
+        job, created = await self.indexing_job_runner.submit()
+
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED if created else status.HTTP_409_CONFLICT,
+            content={
+                "message": (ResponseEnum.INDEXING_JOB_STARTED if created
+                            else ResponseEnum.INDEXING_JOB_ALREADY_RUNNING).value,
+                "job_id": str(job.id),
+                "progress": job.progress(),
+            }
+        )
+
+    async def job_progress(self, job_id: str):
         """
-        corpus = os.listdir(DirectoryService.files_dir)
-        index_success_count = 0
+        :param job_id: The ID returned when the job was started.
+        :return: JSON response with the counters, the rate and the status of the job.
+        """
+        job = None
+        if PydanticObjectId.is_valid(job_id):
+            job = await IndexingJob.get(job_id)
+
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "message": ResponseEnum.INDEXING_JOB_NOT_FOUND.value
+                }
+            )
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=job.progress()
+        )
 
-        for file_name in corpus:
-            content = self.data_controller.parse_file(file_name)
-            processed_content = self.data_controller.clean_text(content)
+    async def reindex_all(self):
+        """
+        Rebuild the index from the documents stored in the database, reusing their stored embeddings.
 
-            if await self.document_repository.create(
-                    file=None,
-                    file_title=file_name,
-                    file_content=content,
-            ):
-                index_success_count += 1
+        :return: JSON response with the number of re-indexed documents.
+        """
+        start_time = time.perf_counter()
+        reindexed_count = await self.document_repository.reindex(self.app_settings.INDEXING_BATCH_SIZE)
+        elapsed_time = time.perf_counter() - start_time
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "message": ResponseEnum.INDEXING_SUCCESS.value,
-                "total_files": len(corpus),
-                "successfully_indexed_files": index_success_count,
-                "already_indexed_count": len(corpus) - index_success_count,
+                "reindexed_count": reindexed_count,
+                "elapsed_seconds": round(elapsed_time, 3),
             }
         )
@@ -1,25 +1,102 @@
-from fastapi import Depends
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
 
 from ..controllers import BaseController, DataController
+from ..models.enums import ResponseEnum
 from ..repositories import DocumentRepo
+from ..services import SearchResultCache
+from ..services.Metrics import metrics
 
 
 class QueryController(BaseController):
     def __init__(
             self,
             document_repository: DocumentRepo,
+            result_cache: SearchResultCache,
             data_controller: DataController = Depends()
     ):
         super().__init__()
         self.data_controller = data_controller
         self.document_repository = document_repository
+        self.result_cache = result_cache
 
-    async def query(self, query: str) -> list:
+    async def query(self, query: str, hybrid: Optional[bool] = None, include_content: bool = False,
+                    snippets: bool = False, retrieved_count: int = 10) -> list:
         """
-        Search for documents in the index.
+        Search for documents in the index, the results of a query seen since the last change of the corpus
+        come from the search result cache.
 
         :param query: The search query.
+        :param hybrid: Whether to fuse dense and lexical retrieval, defaults to HYBRID_SEARCH_ENABLED.
+        :param include_content: Whether to return the full parsed text of each document.
+        :param snippets: Whether to return the passages of each document matching the query.
+        :param retrieved_count: The number of documents to retrieve.
         :return: A list of document titles matching the search query.
         """
-        query = self.data_controller.clean_text(query)
-        return await self.document_repository.search(query)
+        if hybrid is None:
+            hybrid = self.app_settings.HYBRID_SEARCH_ENABLED
+
+        cache_key = generation = None
+        if self.result_cache is not None:
+            with metrics.span("query.cache_lookup"):
+                # the results depend on the Rocchio parameters the repository searches with
+                cache_key = self.result_cache.key(
+                    query,
+                    hybrid=hybrid,
+                    include_content=include_content,
+                    snippets=snippets,
+                    retrieved_count=retrieved_count,
+                    rocchio=self.document_repository.rocchio.model_dump()
+                )
+                generation = await self.result_cache.generation()
+                cached_results = await self.result_cache.get(cache_key, generation)
+            if cached_results is not None:
+                return cached_results
+
+        with metrics.span("query.clean_text"):
+            cleaned_query = self.data_controller.clean_text(query)
+        results = await self.document_repository.search(
+            cleaned_query,
+            retrieved_count=retrieved_count,
+            hybrid=hybrid,
+            include_content=include_content,
+            snippets=snippets,
+            snippet_query=query
+        )
+
+        if cache_key is not None:
+            await self.result_cache.put(cache_key, generation, results)
+
+        return results
+
+    async def query_batch(self, queries: list[str], hybrid: Optional[bool] = None,
+                          include_content: bool = False, snippets: bool = False) -> list[list]:
+        """
+        Search for several queries at once: they are cleaned in one processing pool call,
+        encoded in the same embedding batches and searched together by the indexing service.
+
+        :param queries: The search queries, at most QUERY_BATCH_MAX_SIZE.
+        :param hybrid: Whether to fuse dense and lexical retrieval, defaults to HYBRID_SEARCH_ENABLED.
+        :param include_content: Whether to return the full parsed text of each document.
+        :param snippets: Whether to return the passages of each document matching its query.
+        :return: The results of each query, in the same order.
+        """
+        if len(queries) > self.app_settings.QUERY_BATCH_MAX_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "message": ResponseEnum.QUERY_BATCH_TOO_LARGE.value,
+                    "max_queries": self.app_settings.QUERY_BATCH_MAX_SIZE,
+                }
+            )
+
+        with metrics.span("query_batch.clean_text"):
+            cleaned_queries = await self.data_controller.clean_texts(queries)
+        return await self.document_repository.search_many(
+            cleaned_queries,
+            hybrid=hybrid,
+            include_content=include_content,
+            snippets=snippets,
+            snippet_queries=queries
+        )
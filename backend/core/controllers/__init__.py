@@ -1,4 +1,5 @@
 from .BaseController import BaseController
 from .DataController import DataController
+from .EvaluationController import EvaluationController
 from .IndexingController import IndexingController
 from .QueryController import QueryController
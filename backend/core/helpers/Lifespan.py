@@ -1,15 +1,138 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
 from contextlib import asynccontextmanager
+from typing import Callable, Optional
 
 from beanie import init_beanie
-from elasticsearch import AsyncElasticsearch
 from fastapi import FastAPI
 from motor.motor_asyncio import AsyncIOMotorClient
-from sentence_transformers import SentenceTransformer
-import torch
 
 from ..helpers.config import get_settings
-from ..models import Document
+from ..models import Document, EvaluationJob, FileManifestEntry, IndexGeneration, IndexingJob, SearchCacheEntry
 from ..models.enums import IndexingEnum
+from ..services.Directory import DirectoryService
+from ..services.Embedding import EmbeddingCache, EmbeddingWorker
+from ..services.Indexing import BM25Index, ElasticSearchService, NumpyVectorStore
+from ..services.Metrics import metrics
+from ..services.Processing import ProcessingPool
+from ..services.NLP import LanguageProcessingService
+from ..services.Search import SearchResultCache
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class Startup:
+    """
+    Loads the heavy components (embedding model, NLP resources, processing workers) in the background,
+    so the app starts serving health checks right away, and tracks when each of them is ready.
+    The load balancer should only route traffic to the worker once `ready` is True.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.ready_after: Optional[float] = None
+        self.components: dict[str, dict] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def ready(self) -> bool:
+        return all(component["status"] == "ready" for component in self.components.values())
+
+    def launch(self, name: str, load: Callable, on_ready: Optional[Callable] = None,
+               on_failed: Optional[Callable] = None) -> None:
+        """
+        Run a blocking loader in a background thread.
+
+        :param name: The name of the component, as reported by the readiness probe.
+        :param load: A function returning a (result, timings) tuple, timings being a dict of durations in seconds.
+                     Coroutine functions are awaited on the event loop instead.
+        :param on_ready: Called on the event loop with the result once the loader is done.
+        :param on_failed: Called on the event loop with the error if the loader failed.
+        """
+        self.components[name] = {"status": "loading"}
+        self._tasks.append(asyncio.create_task(self._run(name, load, on_ready, on_failed)))
+
+    async def _run(self, name: str, load: Callable, on_ready: Optional[Callable],
+                   on_failed: Optional[Callable]) -> None:
+        start_time = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(load):
+                result, timings = await load()
+            else:
+                result, timings = await asyncio.to_thread(load)
+            if on_ready is not None:
+                on_ready(result)
+        except Exception as e:
+            logger.error(f"Startup: loading {name} failed: {str(e)}")
+            self.components[name] = {"status": "failed", "error": str(e)}
+            if on_failed is not None:
+                on_failed(e)
+            return
+
+        self.components[name] = {
+            "status": "ready",
+            **{key: round(value, 3) for key, value in timings.items()},
+            "total_seconds": round(time.perf_counter() - start_time, 3),
+        }
+        logger.info(f"Startup: {name} ready in {self.components[name]['total_seconds']}s")
+
+        if self.ready and self.ready_after is None:
+            self.ready_after = time.perf_counter() - self.started_at
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "ready_after_seconds": round(self.ready_after, 3) if self.ready_after is not None else None,
+            "components": self.components,
+        }
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def load_embedding_model(model_name: str):
+    """
+    Import torch and sentence_transformers, load the model and run a first encode, the first call is the slow one.
+    """
+    start_time = time.perf_counter()
+    import torch
+    from sentence_transformers import SentenceTransformer
+    imported_at = time.perf_counter()
+
+    embedding_model = SentenceTransformer(model_name)
+    embedding_device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    embedding_model = embedding_model.to(embedding_device)
+    loaded_at = time.perf_counter()
+
+    embedding_model.encode(["warm up"])
+
+    return embedding_model, {
+        "import_seconds": imported_at - start_time,
+        "load_seconds": loaded_at - imported_at,
+        "warm_up_seconds": time.perf_counter() - loaded_at,
+    }
+
+
+def warm_up_language_processing(language_processing_service: LanguageProcessingService):
+    """
+    Load the language processor's resources (tokenizer, tagger, lemmatizer) in this process.
+    """
+    start_time = time.perf_counter()
+    language_processing_service.warm_up()
+    return None, {"warm_up_seconds": time.perf_counter() - start_time}
+
+
+def settings_fingerprint(settings) -> str:
+    """
+    Hash the settings, the search results cached by a differently configured deployment (model, index, fusion,
+    snippets...) are not shared with this one.
+    """
+    return hashlib.sha256(settings.model_dump_json().encode()).hexdigest()
 
 
 @asynccontextmanager
@@ -22,40 +145,127 @@ async def lifespan(app: FastAPI):
     :param app: FastAPI application instance.
     """
     _settings_ = get_settings()
+    app.startup = Startup()
 
     # database connection
     app.mongodb_client = AsyncIOMotorClient(_settings_.DB_URL)
     app.db = app.mongodb_client.al_baheth
-    await init_beanie(database=app.db, document_models=[Document])
+    await init_beanie(
+        database=app.db,
+        document_models=[Document, FileManifestEntry, IndexingJob, IndexGeneration, SearchCacheEntry, EvaluationJob]
+    )
 
-    # initialize the embedding model
-    app.embedding_model = SentenceTransformer(_settings_.EMBEDDING_MODEL)
-    embedding_device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-    app.embedding_model = app.embedding_model.to(embedding_device)
+    # micro-batching queue, all the encode calls go through it, they wait until the model is loaded
+    app.embedding_model = None
+    app.embedding_worker = EmbeddingWorker(
+        max_batch_size=_settings_.EMBEDDING_MAX_BATCH_SIZE,
+        batch_window_ms=_settings_.EMBEDDING_BATCH_WINDOW_MS,
+        encode_batch_size=_settings_.EMBEDDING_BATCH_SIZE
+    )
+    app.embedding_worker.start()
+
+    def on_embedding_model_ready(embedding_model):
+        app.embedding_model = embedding_model
+        app.embedding_worker.set_model(embedding_model)
+
+    # the encode calls fail with a 503 instead of waiting forever for a model that will not come
+    app.startup.launch(
+        "embedding_model",
+        lambda: load_embedding_model(_settings_.EMBEDDING_MODEL),
+        on_embedding_model_ready,
+        app.embedding_worker.set_failed
+    )
+
+    # vectors of the recent queries, shared by all the requests
+    app.query_embedding_cache = EmbeddingCache(
+        max_size=_settings_.QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds=_settings_.QUERY_EMBEDDING_CACHE_TTL or None
+    )
+
+    # results of the recent searches, invalidated by the index generation
+    app.search_result_cache = None
+    if _settings_.SEARCH_CACHE_SIZE > 0 or _settings_.SEARCH_CACHE_SHARED:
+        app.search_result_cache = SearchResultCache(
+            max_size=_settings_.SEARCH_CACHE_SIZE,
+            namespace=settings_fingerprint(_settings_),
+            cache_path=os.path.join(DirectoryService.index_dir, _settings_.SEARCH_CACHE_FILE)
+            if _settings_.SEARCH_CACHE_FILE else None,
+            shared=_settings_.SEARCH_CACHE_SHARED,
+            generation_ttl=_settings_.SEARCH_CACHE_GENERATION_TTL
+        )
+        await asyncio.to_thread(app.search_result_cache.load)
+
+    # worker processes for parsing and text cleaning
+    app.processing_pool = ProcessingPool(
+        max_workers=_settings_.PROCESSING_WORKERS,
+        max_pending=_settings_.PROCESSING_MAX_PENDING
+    )
+    app.startup.launch("processing_pool", app.processing_pool.warm_up)
 
     if _settings_.INDEXING_SERVICE == IndexingEnum.ElasticSearch.value:
+        from elasticsearch import AsyncElasticsearch
+
         app.es_client = AsyncElasticsearch(_settings_.ES_URL)
         if not await app.es_client.indices.exists(index=_settings_.ES_INDEXING):
             await app.es_client.indices.create(
                 index=_settings_.ES_INDEXING,
-                mappings={
-                    "properties": {
-                        "file_id" : {
-                            "type": "text"
-                        },
-                        "embedding": {
-                            "type": "dense_vector",
-                            "similarity": "cosine",
-                            "dims": 768,
-                            "index": True
-                        }
-                    }
-                }
+                mappings=ElasticSearchService.index_mappings(_settings_.ES_VECTOR_INDEX_TYPE)
             )
 
+    if _settings_.INDEXING_SERVICE == IndexingEnum.BM25.value or _settings_.HYBRID_SEARCH_ENABLED:
+        app.lexical_index = BM25Index(os.path.join(DirectoryService.index_dir, "bm25"))
+
+    if _settings_.INDEXING_SERVICE == IndexingEnum.Numpy.value:
+        app.vector_store = NumpyVectorStore(
+            os.path.join(DirectoryService.index_dir, "numpy"),
+            ivf_lists=_settings_.NUMPY_IVF_LISTS,
+            ivf_probes=_settings_.NUMPY_IVF_PROBES
+        )
+
+    # the settings, services and repositories shared by all the requests,
+    # built in a thread since the language processor loads its stopwords and caches from disk
+    from .ServiceContainer import ServiceContainer  # not at the top, the repositories import the helpers package
+
+    app.services = await asyncio.to_thread(ServiceContainer, app, _settings_)
+    app.startup.launch(
+        "language_processing",
+        lambda: warm_up_language_processing(app.services.language_processing_service)
+    )
+
+    # resumes the index_all jobs interrupted by a crash or a restart
+    app.services.indexing_job_runner.start()
+
+    app.assets_watcher = None
+    if _settings_.WATCHER_ENABLED:
+        from ..services.Ingest import AssetsWatcher  # not at the top, the watcher is optional
+
+        app.assets_watcher = AssetsWatcher(
+            file_ingest_service=app.services.file_ingest_service,
+            indexing_job_runner=app.services.indexing_job_runner,
+            batch_size=_settings_.INDEXING_BATCH_SIZE,
+            debounce_ms=_settings_.WATCHER_DEBOUNCE_MS,
+            poll_interval=_settings_.WATCHER_POLL_INTERVAL,
+            polling=_settings_.WATCHER_POLLING
+        )
+        app.assets_watcher.start()
+
     yield
 
+    await app.startup.stop()
+    if app.assets_watcher is not None:
+        await app.assets_watcher.stop()
+    await app.services.indexing_job_runner.stop()
+    await app.services.evaluation_job_runner.stop()
+    await app.embedding_worker.stop()
+    app.services.language_processing_service.save_caches()
+    if app.search_result_cache is not None:
+        app.search_result_cache.save()
+    app.processing_pool.shutdown()
+    metrics.mark_process_dead()
     app.mongodb_client.close()
 
     if _settings_.INDEXING_SERVICE == IndexingEnum.ElasticSearch.value:
         await app.es_client.close()
+
+    if _settings_.INDEXING_SERVICE == IndexingEnum.Numpy.value:
+        app.vector_store.flush()
@@ -0,0 +1,55 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.Metrics import ServerTiming, metrics
+
+
+class MetricsMiddleware:
+    """
+    Observes the duration of every HTTP request, labelled by its route template rather than its path
+    so the number of series stays bounded, and optionally reports the stage durations of the request
+    in a Server-Timing header, which the browser's developer tools display.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        """
+        :param app: The wrapped ASGI application.
+        :param server_timing: Whether to add the Server-Timing header to the responses.
+        """
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        token = ServerTiming.start()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", ServerTiming.header(time.perf_counter() - start_time)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # the router stores the matched route in the scope
+            route = scope.get("route")
+            metrics.request_seconds.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status_code
+            ).observe(time.perf_counter() - start_time)
+            # the workers not scraped keep their cache counters current for the aggregated metrics
+            metrics.refresh(scope["app"], min_interval=1)
+            ServerTiming.stop(token)
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from fastapi import FastAPI
+
+from .config import Settings
+from ..repositories import DocumentRepository
+from ..services.Indexing import IndexingService
+from ..services.Ingest import FileIngestService
+from ..services.Jobs import EvaluationJobRunner, IndexingJobRunner
+from ..services.NLP import LanguageProcessingService
+from ..services.Parsing import ParsingService
+from ..services.Snippet import SnippetService
+from ..services.dependencies import getParsingService, getLanguageProcessingService, getIndexingService, \
+    getLexicalIndexingService
+
+
+class ServiceContainer:
+    """
+    The app-scoped registry of the settings, services and repositories.
+    It is created once in the lifespan, after the clients and indices it wires together,
+    and the FastAPI dependencies resolve from it instead of building new instances on every request.
+    """
+
+    def __init__(self, app: FastAPI, settings: Settings):
+        """
+        :param app: The FastAPI application holding the clients, indices and embedding worker.
+        :param settings: The application settings.
+        """
+        self.settings = settings
+        self.parsing_service: ParsingService = getParsingService(settings)
+        self.language_processing_service: LanguageProcessingService = getLanguageProcessingService(settings)
+        self.indexing_service: IndexingService = getIndexingService(settings, app)
+        self.lexical_indexing_service: Optional[IndexingService] = getLexicalIndexingService(settings, app)
+        self.snippet_service = SnippetService(
+            self.language_processing_service,
+            passage_size=settings.SNIPPET_PASSAGE_SIZE,
+            snippet_count=settings.SNIPPET_COUNT
+        )
+        self.document_repository = DocumentRepository(
+            indexing_service=self.indexing_service,
+            lexical_service=self.lexical_indexing_service,
+            embedding_worker=app.embedding_worker,
+            settings=settings,
+            snippet_service=self.snippet_service,
+            result_cache=app.search_result_cache
+        )
+        self.file_ingest_service = FileIngestService(app.processing_pool, self.document_repository)
+        self.indexing_job_runner = IndexingJobRunner(
+            file_ingest_service=self.file_ingest_service,
+            batch_size=settings.INDEXING_BATCH_SIZE,
+            heartbeat_interval=settings.INDEXING_JOB_HEARTBEAT_INTERVAL,
+            max_reported_failures=settings.INDEXING_JOB_MAX_REPORTED_FAILURES
+        )
+        self.evaluation_job_runner = EvaluationJobRunner()
@@ -1,7 +1,8 @@
 from fastapi import Depends
 from typing_extensions import Annotated
 
-from .Lifespan import lifespan
 from .config import Settings as SettingsClass, get_settings
 
 Settings = Annotated[SettingsClass, Depends(get_settings)]
+
+from .Lifespan import lifespan
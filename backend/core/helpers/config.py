@@ -1,5 +1,7 @@
 import os
+from functools import lru_cache
 
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -18,6 +20,69 @@ class Settings(BaseSettings):
     ES_INDEXING: str
     EMBEDDING_MODEL: str
 
+    INDEXING_BATCH_SIZE: int = 64  # files parsed and written per bulk request
+    INDEXING_JOB_HEARTBEAT_INTERVAL: float = 10  # seconds, a job missing three heartbeats is resumed by another worker
+    INDEXING_JOB_MAX_REPORTED_FAILURES: int = 100  # failed files listed in the progress of an index_all job
+
+    WATCHER_ENABLED: bool = False  # ingest the files changed in the assets folder as they change
+    WATCHER_DEBOUNCE_MS: float = 1000  # quiet time before the pending changes are ingested
+    WATCHER_POLLING: bool = False  # poll even if watchfiles (inotify) is installed, e.g. network filesystems
+    WATCHER_POLL_INTERVAL: float = 2  # seconds between two scans of the assets folder when polling
+    EMBEDDING_BATCH_SIZE: int = 32  # texts per forward pass of the embedding model
+    EMBEDDING_MAX_BATCH_SIZE: int = 64  # concurrent encode requests gathered into one model call
+    EMBEDDING_BATCH_WINDOW_MS: float = 5  # how long a request waits for others to join its batch
+    QUERY_EMBEDDING_CACHE_SIZE: int = 2048  # query vectors kept in memory, keyed by model and cleaned query
+    QUERY_EMBEDDING_CACHE_TTL: float = 3600  # seconds before a cached query vector expires, 0 disables expiry
+
+    NUMPY_IVF_LISTS: int = 0  # k-means partitions of the Numpy index, 0 keeps the search exact
+    NUMPY_IVF_PROBES: int = 8  # partitions scored per Numpy search
+
+    HYBRID_SEARCH_ENABLED: bool = False  # also keep a BM25 index and fuse it with the dense results
+    HYBRID_FUSION: str = "rrf"  # "rrf" (reciprocal rank fusion) or "weighted" (normalized score fusion)
+    HYBRID_RRF_K: int = 60
+    HYBRID_DENSE_WEIGHT: float = 0.5  # weight of the dense branch in weighted fusion, the lexical one gets the rest
+    HYBRID_BRANCH_TIMEOUT_MS: float = 1000  # a slower branch is dropped from the fusion
+
+    QUERY_BATCH_MAX_SIZE: int = 1000  # queries accepted by one call to the batch query endpoint
+    SEARCH_CACHE_SIZE: int = 1000  # search results kept in memory per process, 0 disables the memory tier
+    SEARCH_CACHE_FILE: str = ""  # saved under the index directory on shutdown, empty disables persistence
+    SEARCH_CACHE_SHARED: bool = False  # also share the cached results between the workers through Mongo
+    SEARCH_CACHE_GENERATION_TTL: float = 1  # seconds a worker reuses the index generation it read, 0 reads it per lookup
+
+    METADATA_CACHE_SIZE: int = 10000  # titles of the search results kept in memory, 0 disables the cache
+    SNIPPET_PASSAGE_SIZE: int = 300  # characters per snippet passage, cut at the next sentence end
+    SNIPPET_COUNT: int = 2  # passages returned per search result
+
+    CHUNKING_ENABLED: bool = False  # index overlapping passages instead of whole documents, reindex after switching
+    CHUNK_SIZE: int = 200  # words per passage, below the embedding model's maximum sequence length
+    CHUNK_OVERLAP: int = 50  # words shared by consecutive passages
+    CHUNK_BATCH_SIZE: int = 64  # passages embedded and written together
+    CHUNK_OVERSAMPLE: int = 4  # passages retrieved per requested document, before pooling them by document
+
+    EMBEDDING_STORAGE: str = "float32"  # format of the vectors stored in Mongo: "float32", "float16" or "int8"
+    ES_VECTOR_INDEX_TYPE: str = "hnsw"  # index_options type of the Elasticsearch dense_vector, e.g. "int8_hnsw"
+    ES_NUM_CANDIDATES: int = 500  # HNSW candidates per shard of an Elasticsearch kNN search, raised to k if below it
+    RESCORE_ENABLED: bool = False  # re-rank the kNN candidates with the full precision vectors
+    RESCORE_OVERSAMPLE: int = 2  # candidates retrieved per result when rescoring
+
+    EVALUATION_DATA_DIR: str = ""  # directory of the CISI evaluation CSVs, defaults to the repository's evaluation_data
+
+    SERVER_TIMING_ENABLED: bool = False  # report the stage durations of each request in a Server-Timing header
+
+    NLP_PROFILE: str = "accurate"  # "accurate" or "fast" (regex tokenizer, no POS tagging), non-semantic cleaning only
+    NLP_CACHE_SIZE: int = 200000  # memoized stems and lemmas per process, each
+    NLP_CACHE_FILE: str = "nlp_cache.json"  # saved under the index directory, empty disables persistence
+    NLP_CACHE_SAVE_INTERVAL: float = 300  # seconds between saves from the processing workers
+
+    PROCESSING_WORKERS: int = 2  # processes used for parsing and cleaning, 0 runs them in a thread instead
+    PROCESSING_MAX_PENDING: int = 16  # parsing tasks in flight per uvicorn worker
+
+    @field_validator("INDEXING_SERVICE")
+    @classmethod
+    def rename_pyterrier(cls, value: str) -> str:
+        # the "PyTerrier" indexing service was renamed "BM25", the index it selects and its files are the same
+        return "BM25" if value == "PyTerrier" else value
+
     model_config = {
         "env_file": os.path.join(os.path.dirname(__file__), "../.env"),
         "env_file_encoding": "utf-8",
@@ -25,5 +90,6 @@ class Settings(BaseSettings):
     }
 
 
+@lru_cache
 def get_settings():
     return Settings()
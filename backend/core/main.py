@@ -2,7 +2,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .helpers.Lifespan import lifespan
-from .routes import base_router, data_router, indexing_router, query_router
+from .helpers.MetricsMiddleware import MetricsMiddleware
+from .helpers.config import get_settings
+from .routes import (
+    base_router, data_router, evaluation_router, health_router, indexing_router, metrics_router, query_router
+)
 
 app = FastAPI(lifespan=lifespan)
 
@@ -13,9 +17,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# request durations for /metrics, and the stage durations in a Server-Timing header when enabled
+app.add_middleware(MetricsMiddleware, server_timing=get_settings().SERVER_TIMING_ENABLED)
+
 app.include_router(base_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
 app.include_router(data_router)
 app.include_router(query_router)
 app.include_router(indexing_router)
+app.include_router(evaluation_router)
@@ -1,2 +1,9 @@
-from .document import Document
+# the models used by the Lifespan come before .file, which imports the helpers and so the Lifespan
+from .document import Document, DocumentMetadata, DocumentPreview
+from .file_manifest_entry import FileManifestEntry
+from .indexing_job import IndexingJob
+from .evaluation_job import EvaluationJob
+from .search_cache import IndexGeneration, SearchCacheEntry
 from .file import File
+from .evaluation import EvaluationRequest, RocchioParameters
+from .query import QueryBatchRequest
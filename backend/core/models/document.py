@@ -1,4 +1,7 @@
+from typing import Optional
+
 from beanie import Document as BeanieDocument, Indexed
+from pydantic import BaseModel
 from typing_extensions import Annotated
 
 
@@ -6,8 +9,25 @@ class Document(BeanieDocument):
     hashed_content: Annotated[str, Indexed(unique=True)]
     title: str
     parsed_text: str
-    embeddings: list[float]
+    embeddings: list[float] | bytes  # see VectorCodec for the binary formats
     bytes_content: bytes | None
+    raw_hash: Annotated[Optional[str], Indexed()] = None  # sha256 of the uploaded bytes, checked before parsing
+    passage_offsets: Optional[list[tuple[int, int]]] = None  # (start, end) of the snippet passages in parsed_text
+    # False from the insert until the main index accepted the document, the next ingest indexes it again
+    # if it stays False, after a crash or a rejected write
+    indexed: bool = True
 
     class Settings:
         collection = "corpus"
+
+
+class DocumentMetadata(BaseModel):
+    """Projection used to hydrate search results, without the stored bytes, text and embeddings."""
+    hashed_content: str
+    title: str
+
+
+class DocumentPreview(DocumentMetadata):
+    """Projection used to hydrate search results with their text and snippets."""
+    parsed_text: str
+    passage_offsets: Optional[list[tuple[int, int]]] = None
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class FusionEnum(Enum):
+    RRF = "rrf"
+    Weighted = "weighted"
@@ -2,5 +2,6 @@ from enum import Enum
 
 
 class IndexingEnum(Enum):
-    PyTerrier = "PyTerrier"
+    BM25 = "BM25"  # formerly "PyTerrier", still accepted by the settings
     ElasticSearch = "ElasticSearch"
+    Numpy = "Numpy"
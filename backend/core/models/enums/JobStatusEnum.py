@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class JobStatusEnum(Enum):
+    Running = "running"
+    Completed = "completed"
+    Failed = "failed"
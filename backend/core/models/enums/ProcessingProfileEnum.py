@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ProcessingProfileEnum(Enum):
+    Accurate = "accurate"  # tokenizer and POS-aware lemmatization of the language processor
+    Fast = "fast"  # regex tokenizer and lemmatization without POS tagging
@@ -12,6 +12,10 @@ class ResponseEnum(Enum):
     PROCESSING_SUCCESS = "processing_success"
     PROCESSING_FAILED = "processing_failed"
     INDEXING_SUCCESS = "indexing_success"
+    INDEXING_FAILED = "indexing_failed"
+    INDEXING_JOB_STARTED = "indexing_job_started"
+    INDEXING_JOB_ALREADY_RUNNING = "indexing_job_already_running"
+    INDEXING_JOB_NOT_FOUND = "indexing_job_not_found"
     FILE_NOT_FOUND = "file_not_found"
 
     INVALID_ID = "invalid_file_id"
@@ -19,3 +23,11 @@ class ResponseEnum(Enum):
     INVALID_QUERY = "invalid_query"
     SEARCH_ERROR = "search_error"
     SEARCH_SUCCESS = "search_success"
+    QUERY_BATCH_TOO_LARGE = "query_batch_too_large"
+    EMBEDDING_MODEL_NOT_AVAILABLE = "embedding_model_not_available"
+
+    EVALUATION_SUCCESS = "evaluation_success"
+    EVALUATION_JOB_STARTED = "evaluation_job_started"
+    EVALUATION_JOB_NOT_FOUND = "evaluation_job_not_found"
+    EVALUATION_DATA_NOT_FOUND = "evaluation_data_not_found"
+    EVALUATION_BACKEND_NOT_AVAILABLE = "evaluation_backend_not_available"
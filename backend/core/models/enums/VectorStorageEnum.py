@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class VectorStorageEnum(Enum):
+    Float32 = "float32"
+    Float16 = "float16"
+    Int8 = "int8"
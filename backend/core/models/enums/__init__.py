@@ -1,5 +1,9 @@
 from .FileEnum import FileEnum
+from .FusionEnum import FusionEnum
 from .IndexingEnum import IndexingEnum
+from .JobStatusEnum import JobStatusEnum
 from .LanguageProcessingEnum import LanguageProcessingEnum
 from .ProcessingEnum import ProcessingEnum
+from .ProcessingProfileEnum import ProcessingProfileEnum
 from .ResponseEnum import ResponseEnum
+from .VectorStorageEnum import VectorStorageEnum
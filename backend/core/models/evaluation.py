@@ -0,0 +1,21 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class RocchioParameters(BaseModel):
+    """The pseudo relevance feedback parameters of DenseIndexingService.search, with the same defaults."""
+    feedback_docs: int = 20
+    alpha: float = 1
+    beta: float = 0.75
+    gamma: float = 0.15
+    relevance_threshold: float = 0.25
+    min_score_threshold: float = 0.3
+
+
+class EvaluationRequest(BaseModel):
+    ingest: bool = False  # store and index the evaluation corpus first, otherwise its files must be named by doc_id
+    retrieved_count: int = Field(10, gt=0, le=1000)
+    concurrency: int = Field(16, gt=0)  # queries searched together, with one search_many call per batch
+    backends: Optional[list[str]] = None  # "main", "lexical" and "hybrid", defaults to all the available ones
+    rocchio: list[RocchioParameters] = [RocchioParameters()]  # parameter sets compared on the dense backends
@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from beanie import Document as BeanieDocument
+from pydantic import Field
+
+from .enums import JobStatusEnum
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class EvaluationJob(BeanieDocument):
+    """
+    A background evaluation run, with its parameters and, once it finished, its metrics or its error.
+    """
+    status: str = JobStatusEnum.Running.value
+    parameters: dict = {}  # the EvaluationRequest of the run
+    result: Optional[dict] = None  # the metrics of every backend and Rocchio parameter set
+    worker_id: Optional[str] = None  # the process running the job
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=_now)
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        collection = "evaluation_jobs"
+
+    def progress(self) -> dict:
+        """
+        :return: The status of the job, and its result once it completed.
+        """
+        return {
+            "job_id": str(self.id),
+            "status": self.status,
+            "parameters": self.parameters,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+            "result": self.result,
+        }
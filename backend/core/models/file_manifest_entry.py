@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from beanie import Document as BeanieDocument, Indexed
+from pydantic import Field
+from typing_extensions import Annotated
+
+
+class FileManifestEntry(BeanieDocument):
+    """
+    The state of a file of the assets folder when it was last ingested.
+    A file whose size and modification time did not change is not read again, one whose bytes did not change
+    is not parsed again.
+    """
+    file_name: Annotated[str, Indexed(unique=True)]
+    size: int
+    mtime_ns: int
+    raw_hash: str  # sha256 of the file's bytes
+    hashed_content: Annotated[Optional[str], Indexed()] = None  # key of the document the file was indexed as
+    ingested_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        collection = "file_manifest"
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from beanie import Document as BeanieDocument
+from pydantic import Field
+from pymongo import IndexModel
+
+from .enums import JobStatusEnum
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class IndexingJob(BeanieDocument):
+    """
+    The progress of a background index_all run, saved after every batch so an interrupted job resumes from it.
+    The files are processed in name order, the cursor is the last file of the last saved batch.
+    """
+    status: str = JobStatusEnum.Running.value
+    total_files: int = 0
+    processed_count: int = 0  # files handled so far, whatever their outcome
+    indexed_count: int = 0
+    already_indexed_count: int = 0  # parsed, but with the same content as a stored document
+    unchanged_count: int = 0  # skipped, unchanged since they were last ingested
+    replaced_count: int = 0  # documents of the previous versions of changed files, deleted
+    removed_count: int = 0  # files gone from the assets folder, removed with their documents
+    failed_count: int = 0
+    failures: list[dict] = []  # {"file_name", "error"} of the first failed files
+    cursor: Optional[str] = None
+    elapsed_seconds: float = 0  # processing time, summed over the runs of the job
+    resumed_count: int = 0
+    worker_id: Optional[str] = None  # the process running the job, only it may save the progress
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=_now)
+    heartbeat_at: datetime = Field(default_factory=_now)  # a job whose heartbeat is stale was interrupted
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        collection = "indexing_jobs"
+        # at most one running job, a second insert fails even when two workers submit at the same time
+        indexes = [
+            IndexModel(
+                "status",
+                name="one_running_job",
+                unique=True,
+                partialFilterExpression={"status": JobStatusEnum.Running.value}
+            ),
+        ]
+
+    def progress(self) -> dict:
+        """
+        :return: The counters of the job, its processing rate and its estimated remaining time.
+        """
+        files_per_second = self.processed_count / self.elapsed_seconds if self.elapsed_seconds > 0 else 0
+        remaining_files = self.total_files - self.processed_count
+        running = self.status == JobStatusEnum.Running.value
+
+        return {
+            "job_id": str(self.id),
+            "status": self.status,
+            "total_files": self.total_files,
+            "processed_count": self.processed_count,
+            "indexed_count": self.indexed_count,
+            "already_indexed_count": self.already_indexed_count,
+            "unchanged_count": self.unchanged_count,
+            "replaced_count": self.replaced_count,
+            "removed_count": self.removed_count,
+            "failed_count": self.failed_count,
+            "failures": self.failures,
+            "files_per_second": round(files_per_second, 2),
+            "eta_seconds": round(remaining_files / files_per_second, 1) if running and files_per_second else None,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "resumed_count": self.resumed_count,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
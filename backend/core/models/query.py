@@ -0,0 +1,10 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class QueryBatchRequest(BaseModel):
+    queries: list[str] = Field(min_length=1)  # the results come back in the same order
+    hybrid: Optional[bool] = None  # defaults to HYBRID_SEARCH_ENABLED
+    include_content: bool = False
+    snippets: bool = False  # the passages matching the query, loading them reads the full texts
@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+
+from beanie import Document as BeanieDocument, Indexed
+from pydantic import Field
+from typing_extensions import Annotated
+
+
+class IndexGeneration(BeanieDocument):
+    """
+    A counter incremented after every change of the corpus, the search results cached under an older value are stale.
+    """
+    name: Annotated[str, Indexed(unique=True)]
+    generation: int = 0
+
+    class Settings:
+        collection = "index_generation"
+
+
+class SearchCacheEntry(BeanieDocument):
+    """
+    The hydrated results of a search, shared by the workers, valid while the index generation is unchanged.
+    """
+    key: Annotated[str, Indexed(unique=True)]
+    generation: Annotated[int, Indexed()]
+    results: list[dict]
+    cached_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        collection = "search_cache"
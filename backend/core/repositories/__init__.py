@@ -1,6 +1,11 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from typing_extensions import Annotated
 
 from .document_repository import DocumentRepository
 
-DocumentRepo = Annotated[DocumentRepository, Depends(DocumentRepository)]
+
+def get_document_repository(request: Request) -> DocumentRepository:
+    return request.app.services.document_repository
+
+
+DocumentRepo = Annotated[DocumentRepository, Depends(get_document_repository)]
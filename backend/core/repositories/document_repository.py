@@ -1,77 +1,530 @@
+import asyncio
 import hashlib
+import logging
 from typing import Optional, Dict, Any
 
 from beanie import PydanticObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
-from ..models import Document, File
-from ..services import IndexingService
+from ..helpers.config import Settings
+from ..models import Document, DocumentMetadata, DocumentPreview, RocchioParameters
+from ..models.enums import FusionEnum
+from ..services.Embedding import EmbeddingWorker, VectorCodec
+from ..services.Indexing import IndexingService, RankFusion
+from ..services.Metrics import metrics
+from ..services.NLP import TokenCache
+from ..services.Search import SearchResultCache
+from ..services.Snippet import SnippetService
+
+logger = logging.getLogger("uvicorn.error")
 
 
 class DocumentRepository:
 
-    def __init__(self, indexing_service: IndexingService):
+    def __init__(
+            self,
+            indexing_service: IndexingService,
+            lexical_service: Optional[IndexingService],
+            embedding_worker: EmbeddingWorker,
+            settings: Settings,
+            snippet_service: Optional[SnippetService] = None,
+            result_cache: Optional[SearchResultCache] = None,
+            rocchio: Optional[RocchioParameters] = None
+    ):
         """
         Initialize the DocumentRepository with an indexing service.
         
         :param indexing_service: An instance of IndexingService for indexing documents.
+        :param lexical_service: The lexical IndexingService used for hybrid search, None if hybrid search is disabled.
+        :param embedding_worker: The app-scoped embedding worker.
+        :param settings: The application settings.
+        :param snippet_service: Computes the passages at ingest and the snippets of the search results,
+                                without it the results have no snippets.
+        :param result_cache: The app-scoped cache of the search results, its generation is incremented
+                             after every change of the corpus.
+        :param rocchio: The Rocchio parameters of the dense searches, defaults to RocchioParameters().
         """
         self.indexing_service = indexing_service
-        self.embedding_model = indexing_service.embedding_model
+        self.lexical_service = lexical_service
+        self.embedding_worker = embedding_worker
+        self.settings = settings
+        self.snippet_service = snippet_service
+        self.result_cache = result_cache
+        self.rocchio = rocchio or RocchioParameters()
+        self.vector_codec = VectorCodec(settings.EMBEDDING_STORAGE)
+        # titles of the documents keyed by hashed_content, they only change through update
+        self.metadata_cache = TokenCache(settings.METADATA_CACHE_SIZE)
+
+    def _indexing_services(self) -> list:
+        if self.lexical_service is None:
+            return [self.indexing_service]
+        return [self.indexing_service, self.lexical_service]
+
+    async def _index_many(self, documents: list[dict]) -> list[str]:
+        # the lexical index is kept in sync, the documents count as indexed once the main indexing service has them
+        indexed_ids = await asyncio.gather(*[
+            service.index_many(documents) for service in self._indexing_services()
+        ])
+        await self._mark_indexed(indexed_ids[0])
+        return indexed_ids[0]
+
+    @staticmethod
+    async def _mark_indexed(hashed_contents: list[str]) -> None:
+        if hashed_contents:
+            await Document.get_motor_collection().update_many(
+                {"hashed_content": {"$in": hashed_contents}, "indexed": False},
+                {"$set": {"indexed": True}}
+            )
+
+    async def _corpus_changed(self) -> None:
+        # the generation changes once the writes are searchable, a search that reads the new generation
+        # cannot see the previous corpus, and the results of the searches that read the old one are ignored
+        if self.result_cache is not None:
+            await asyncio.gather(*[service.refresh() for service in self._indexing_services()])
+            await self.result_cache.bump()
+
+    async def embed(self, contents: list[str]) -> list[list[float]]:
+        """
+        Encode the contents of new documents. The contents already stored are never embedded again,
+        create and create_many reuse their stored vectors, so there is no cache in front of the model here.
+
+        :param contents: The contents to embed.
+        :return: The embedding of each content, in the same order.
+        """
+        vectors = await self.embedding_worker.encode_many(contents)
+        return [vector.tolist() for vector in vectors]
+
+    @staticmethod
+    def hash_content(content: str) -> str:
+        """
+        :param content: The cleaned content of a document.
+        :return: Its sha256, the hashed_content key of the document and its ID in the indices.
+        """
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def _passage_offsets(self, content: str) -> Optional[list[tuple[int, int]]]:
+        if self.snippet_service is None:
+            return None
+        return self.snippet_service.passage_offsets(content)
 
-    async def create(self, file: File, file_title: str, file_content: str) -> Optional[Document]:
+    async def create(
+            self,
+            file_title: str,
+            file_content: str,
+            bytes_content: Optional[bytes] = None,
+            raw_hash: Optional[str] = None
+    ) -> Optional[Document]:
         """
         Create a new document in the database from the file.
 
-        :param file: The file object containing the content.
         :param file_title: The title of the file.
         :param file_content: The content of the file to be hashed and embedded.
+        :param bytes_content: The raw bytes of the file, kept from the upload stream.
+        :param raw_hash: The sha256 of the raw bytes, used to reject duplicate uploads before parsing them.
         :return: Document object created from the file.
         """
-        hashed_content = hashlib.sha256(file_content.encode()).hexdigest()
+        hashed_content = self.hash_content(file_content)
 
-        found = await self.get_by_key(hashed_content)
-        if found:
+        with metrics.span("create.lookup"):
+            found = await self.get_by_key(hashed_content)
+        if found and found.indexed:
             return None
+        if found:
+            # stored by an ingest that did not get to index it
+            with metrics.span("create.index"):
+                indexed_ids = await self._index_many([{
+                    "file_id": hashed_content,
+                    "content": found.parsed_text,
+                    "embedding": VectorCodec.decode(found.embeddings).tolist(),
+                }])
+            if not indexed_ids:
+                raise RuntimeError(f"The document {hashed_content} was not indexed")
+            await self._corpus_changed()
+            return found
 
+        with metrics.span("create.embed"):
+            embedding = (await self.embed([file_content]))[0]
 
         document = Document(
             hashed_content=hashed_content,
             parsed_text=file_content,
-            embeddings=self.embedding_model.encode(file_content),
+            embeddings=self.vector_codec.encode(embedding),
             title=file_title,
-            bytes_content=await file.read() if file else None,
+            bytes_content=bytes_content,
+            raw_hash=raw_hash,
+            passage_offsets=self._passage_offsets(file_content),
+            indexed=False,
         )
 
-        await document.insert()
+        with metrics.span("create.insert"):
+            try:
+                await document.insert()
+            except DuplicateKeyError:
+                return None  # stored meanwhile by a concurrent ingest of the same content
+
+        with metrics.span("create.index"):
+            indexed = await asyncio.gather(*[
+                service.index(file_id=hashed_content, file_content=file_content, embedding=embedding)
+                for service in self._indexing_services()
+            ])
+            if not indexed[0]:
+                raise RuntimeError(f"The document {hashed_content} was not indexed")
+            await self._mark_indexed([hashed_content])
+            document.indexed = True
+
+        await self._corpus_changed()
 
-        await self.indexing_service.index(file_id=hashed_content, file_content=file_content)
+        metrics.ingested_documents.labels(source="upload").inc()
+        if bytes_content is not None:
+            metrics.ingested_bytes.inc(len(bytes_content))
 
         return document
 
-    # for testing purposes only
-    async def search(self, query: str) -> list:
+    async def create_many(self, files: list[dict]) -> list[Document]:
+        """
+        Create a batch of new documents, skipping the ones that are already stored and indexed.
+        The contents are embedded together by the embedding worker, then written with a single
+        Mongo insert_many and a single bulk request to the indexing service.
+        The stored documents that were never indexed, because a crash or a rejected write happened between
+        the insert and the index write, are sent to the indexing service again with their stored vectors.
+
+        :param files: A list of dicts with the keys "file_title", "file_content", and optionally "raw_hash",
+                      the sha256 of the file's bytes, checked before parsing an upload of the same file.
+        :return: The list of Document objects that were created or indexed again, and accepted by the index.
+        """
+        unique_files = {}
+        for file in files:
+            hashed_content = self.hash_content(file["file_content"])
+            unique_files.setdefault(hashed_content, file)
+
+        existing_keys = set(await Document.distinct(
+            "hashed_content",
+            {"hashed_content": {"$in": list(unique_files.keys())}}
+        ))
+        unindexed_documents = await Document.find(
+            {"hashed_content": {"$in": list(existing_keys)}, "indexed": False}
+        ).to_list() if existing_keys else []
+        new_files = {
+            hashed_content: file
+            for hashed_content, file in unique_files.items()
+            if hashed_content not in existing_keys
+        }
+        if not new_files and not unindexed_documents:
+            return []
+
+        documents = []
+        embeddings = []
+        if new_files:
+            with metrics.span("create_many.embed"):
+                embeddings = await self.embed([file["file_content"] for file in new_files.values()])
+
+            documents = [
+                Document(
+                    hashed_content=hashed_content,
+                    parsed_text=file["file_content"],
+                    embeddings=self.vector_codec.encode(embedding),
+                    title=file["file_title"],
+                    bytes_content=None,
+                    raw_hash=file.get("raw_hash"),
+                    passage_offsets=self._passage_offsets(file["file_content"]),
+                    indexed=False,
+                )
+                for (hashed_content, file), embedding in zip(new_files.items(), embeddings)
+            ]
+
+            with metrics.span("create_many.insert"):
+                try:
+                    await Document.insert_many(documents, ordered=False)
+                except BulkWriteError as e:
+                    # the contents stored meanwhile by a concurrent upload are left to it
+                    if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                        raise
+                    duplicates = {error["index"] for error in e.details["writeErrors"]}
+                    documents = [document for i, document in enumerate(documents) if i not in duplicates]
+                    embeddings = [embedding for i, embedding in enumerate(embeddings) if i not in duplicates]
+
+        documents += unindexed_documents
+        embeddings += [VectorCodec.decode(document.embeddings).tolist() for document in unindexed_documents]
+
+        # the index gets the full precision vectors, whatever the storage format
+        with metrics.span("create_many.index"):
+            indexed_ids = set(await self._index_many([
+                {
+                    "file_id": document.hashed_content,
+                    "content": document.parsed_text,
+                    "embedding": embedding,
+                }
+                for document, embedding in zip(documents, embeddings)
+            ]))
+
+        await self._corpus_changed()
+
+        indexed_documents = [document for document in documents if document.hashed_content in indexed_ids]
+        for document in indexed_documents:
+            document.indexed = True
+        metrics.ingested_documents.labels(source="index_all").inc(len(indexed_documents))
+
+        return indexed_documents
+
+    async def reindex(self, batch_size: int) -> int:
+        """
+        Push every stored document to the indexing service again, using the vectors stored
+        in the database instead of running the embedding model.
+        With CHUNKING_ENABLED only the document vectors are stored, so the dense services chunk the documents
+        and embed their passages again.
+        Used to rebuild a lost index or to migrate to another indexing service.
+
+        :param batch_size: The number of documents sent to the indexing service per bulk request.
+        :return: The number of documents indexed successfully.
+        """
+        indexed_count = 0
+        batch = []
+        cursor = Document.get_motor_collection().find(
+            {},
+            {"hashed_content": 1, "parsed_text": 1, "embeddings": 1}
+        )
+
+        async for stored in cursor:
+            embedding = VectorCodec.decode(stored["embeddings"])
+            batch.append({
+                "file_id": stored["hashed_content"],
+                "content": stored["parsed_text"],
+                "embedding": embedding.tolist(),
+            })
+
+            if len(batch) >= batch_size:
+                indexed_count += len(await self._index_many(batch))
+                batch = []
+
+        if batch:
+            indexed_count += len(await self._index_many(batch))
+
+        await self._corpus_changed()
+
+        return indexed_count
+
+    async def _search_branch(self, name: str, service: IndexingService, query: str, retrieved_count: int,
+                             **search_kwargs) -> list:
+        """
+        Run one branch of the hybrid search, a branch that fails or exceeds its timeout returns no results
+        so the other one can still answer.
+        """
+        try:
+            return await asyncio.wait_for(
+                service.search(query, retrieved_count=retrieved_count, **search_kwargs),
+                timeout=self.settings.HYBRID_BRANCH_TIMEOUT_MS / 1000
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Hybrid search: the {name} branch timed out")
+        except Exception as e:
+            logger.error(f"Hybrid search: the {name} branch failed: {str(e)}")
+        return []
+
+    async def hybrid_search(self, query: str, retrieved_count: int = 10, **dense_kwargs) -> list:
+        """
+        Run the dense and the lexical searches concurrently and fuse their rankings.
+
+        :param query: The cleaned search query.
+        :param retrieved_count: The number of documents to retrieve.
+        :param dense_kwargs: Extra parameters of the dense search, such as the Rocchio weights.
+        :return: A list of dicts with the keys "file_id" and "score", sorted by descending fused score.
+        """
+        # each branch retrieves more candidates than needed, documents found by both rise to the top
+        dense_results, lexical_results = await asyncio.gather(
+            self._search_branch("dense", self.indexing_service, query, retrieved_count * 2, **dense_kwargs),
+            self._search_branch("lexical", self.lexical_service, query, retrieved_count * 2),
+        )
+
+        if self.settings.HYBRID_FUSION == FusionEnum.Weighted.value:
+            dense_weight = self.settings.HYBRID_DENSE_WEIGHT
+            fused = RankFusion.weighted_score([dense_results, lexical_results], [dense_weight, 1 - dense_weight])
+        else:
+            fused = RankFusion.reciprocal_rank([dense_results, lexical_results], k=self.settings.HYBRID_RRF_K)
+
+        return fused[:retrieved_count]
+
+    async def _search_many_branch(self, name: str, service: IndexingService, queries: list[str],
+                                  retrieved_count: int, **search_kwargs) -> list[list]:
+        """
+        Run one branch of a batch hybrid search, a branch that fails returns no results so the other one
+        can still answer. The batch is not bounded by HYBRID_BRANCH_TIMEOUT_MS, which is set for a single query.
+        """
+        try:
+            return await service.search_many(queries, retrieved_count=retrieved_count, **search_kwargs)
+        except Exception as e:
+            logger.error(f"Hybrid search: the {name} branch failed: {str(e)}")
+        return [[] for _ in queries]
+
+    async def hybrid_search_many(self, queries: list[str], retrieved_count: int = 10, **dense_kwargs) -> list[list]:
+        """
+        Run the dense and the lexical searches of several queries, each branch searching the whole batch at once,
+        and fuse the rankings of each query.
+
+        :param queries: The cleaned search queries.
+        :param retrieved_count: The number of documents to retrieve per query.
+        :param dense_kwargs: Extra parameters of the dense search, such as the Rocchio weights.
+        :return: The fused results of each query, in the same order, see hybrid_search.
+        """
+        dense_results, lexical_results = await asyncio.gather(
+            self._search_many_branch("dense", self.indexing_service, queries, retrieved_count * 2, **dense_kwargs),
+            self._search_many_branch("lexical", self.lexical_service, queries, retrieved_count * 2),
+        )
+
+        fused_results = []
+        for dense, lexical in zip(dense_results, lexical_results):
+            if self.settings.HYBRID_FUSION == FusionEnum.Weighted.value:
+                dense_weight = self.settings.HYBRID_DENSE_WEIGHT
+                fused = RankFusion.weighted_score([dense, lexical], [dense_weight, 1 - dense_weight])
+            else:
+                fused = RankFusion.reciprocal_rank([dense, lexical], k=self.settings.HYBRID_RRF_K)
+            fused_results.append(fused[:retrieved_count])
+
+        return fused_results
+
+    async def hydrate(self, results: list[dict], query: Optional[str] = None,
+                      include_content: bool = False) -> list[dict]:
+        """
+        Attach the stored titles, snippets and texts to ranked search results, keeping the retrieval order.
+        Only the projected fields are loaded from the database, never the bytes or the embeddings,
+        and when neither the snippets nor the texts are needed the titles come from the metadata cache.
+
+        :param results: A list of dicts with the keys "file_id" and "score", in rank order.
+        :param query: The search query, the results get the snippets matching it when given.
+        :param include_content: Whether to return the full parsed text of each document.
+        :return: A list of dicts with the keys "title", "score", and if requested "snippets" and "content".
+                 Results whose document is no longer stored are dropped.
+        """
+        return (await self.hydrate_many([results], [query] if query is not None else None, include_content))[0]
+
+    async def hydrate_many(self, results_lists: list[list[dict]], queries: Optional[list[str]] = None,
+                           include_content: bool = False) -> list[list[dict]]:
+        """
+        Hydrate the results of several queries, the documents of all of them are loaded with a single query,
+        see hydrate.
+
+        :param results_lists: The ranked results of each query.
+        :param queries: The search queries, in the same order, the results get the snippets matching them when given.
+        :param include_content: Whether to return the full parsed text of each document.
+        :return: The hydrated results of each query, in the same order.
+        """
+        with_snippets = queries is not None and self.snippet_service is not None
+        with_text = include_content or with_snippets
+
+        file_ids = list(dict.fromkeys(result['file_id'] for results in results_lists for result in results))
+        titles = {}
+        if not with_text:
+            for file_id in file_ids:
+                title = self.metadata_cache.get(file_id)
+                if title is not None:
+                    titles[file_id] = title
+
+        projected = {}
+        missing = [file_id for file_id in file_ids if file_id not in titles]
+        if missing:
+            projection = DocumentPreview if with_text else DocumentMetadata
+            documents = await Document.find({"hashed_content": {"$in": missing}}).project(projection).to_list()
+            for document in documents:
+                projected[document.hashed_content] = document
+                titles[document.hashed_content] = document.title
+                self.metadata_cache.put(document.hashed_content, document.title)
+
+        snippets = [{} for _ in results_lists]
+        if with_snippets and projected:
+            # scanning long texts is CPU bound, it runs off the event loop
+            snippets = await asyncio.to_thread(lambda: [
+                {
+                    result['file_id']: self.snippet_service.snippets(
+                        projected[result['file_id']].parsed_text, query, projected[result['file_id']].passage_offsets
+                    )
+                    for result in results if result['file_id'] in projected
+                }
+                for results, query in zip(results_lists, queries)
+            ])
+
+        hydrated_lists = []
+        for results, query_snippets in zip(results_lists, snippets):
+            hydrated = []
+            for result in results:
+                file_id = result['file_id']
+                if file_id not in titles:
+                    continue
+
+                hydrated_result = {"title": titles[file_id], "score": result['score']}
+                if with_snippets:
+                    hydrated_result["snippets"] = query_snippets[file_id]
+                if include_content:
+                    hydrated_result["content"] = projected[file_id].parsed_text
+                hydrated.append(hydrated_result)
+            hydrated_lists.append(hydrated)
+
+        return hydrated_lists
+
+    async def search(
+            self,
+            query: str,
+            retrieved_count: int = 10,
+            hybrid: Optional[bool] = None,
+            include_content: bool = False,
+            snippets: bool = False,
+            snippet_query: Optional[str] = None
+    ) -> list:
         """
         Search for documents in the index.
         
         :param query: The cleaned search query.
-        :return: A list of document titles matching the search query.
+        :param retrieved_count: The number of documents to retrieve.
+        :param hybrid: Whether to fuse the dense and lexical results, defaults to HYBRID_SEARCH_ENABLED.
+        :param include_content: Whether to return the full parsed text of each document.
+        :param snippets: Whether to return the passages matching the query, they need the full parsed texts,
+                         without them and the content the titles come from the metadata cache.
+        :param snippet_query: The query the snippets are matched against, defaults to the cleaned query.
+        :return: A list of dicts with the title, score, snippets and content of the matching documents,
+                 in rank order.
         """
-        results = await self.indexing_service.search(query)
-        scores = {
-            result['file_id']: result['score'] for result in results
-        }
-        IDs = [result['file_id'] for result in results]
-        docs = await Document.find({"hashed_content": {"$in": IDs}}).to_list()
-        final_results = [
-            {
-                "title": doc.title,
-                "score": scores[doc.hashed_content],
-                "content": doc.parsed_text,
-            }
-            for doc in docs
-        ]
-
-        return final_results
+        if hybrid is None:
+            hybrid = self.settings.HYBRID_SEARCH_ENABLED
+
+        with metrics.span("query.retrieve"):
+            if hybrid and self.lexical_service is not None:
+                results = await self.hybrid_search(query, retrieved_count, **self.rocchio.model_dump())
+            else:
+                results = await self.indexing_service.search(query, retrieved_count=retrieved_count,
+                                                             **self.rocchio.model_dump())
+
+        with metrics.span("query.hydrate"):
+            return await self.hydrate(results, (snippet_query or query) if snippets else None, include_content)
+
+    async def search_many(
+            self,
+            queries: list[str],
+            retrieved_count: int = 10,
+            hybrid: Optional[bool] = None,
+            include_content: bool = False,
+            snippets: bool = False,
+            snippet_queries: Optional[list[str]] = None
+    ) -> list[list]:
+        """
+        Search for several queries at once, the indexing services search the whole batch together
+        and the results of all the queries are hydrated with a single database query.
+
+        :param queries: The cleaned search queries.
+        :param snippet_queries: The queries the snippets are matched against, defaults to the cleaned queries.
+        :return: The results of each query, in the same order, see search for the other parameters.
+        """
+        if hybrid is None:
+            hybrid = self.settings.HYBRID_SEARCH_ENABLED
+
+        with metrics.span("query_batch.retrieve"):
+            if hybrid and self.lexical_service is not None:
+                results_lists = await self.hybrid_search_many(queries, retrieved_count, **self.rocchio.model_dump())
+            else:
+                results_lists = await self.indexing_service.search_many(queries, retrieved_count=retrieved_count,
+                                                                        **self.rocchio.model_dump())
+
+        with metrics.span("query_batch.hydrate"):
+            return await self.hydrate_many(
+                results_lists, (snippet_queries or queries) if snippets else None, include_content
+            )
 
     async def get_by_key(self, hashing_key: str) -> Optional[Document]:
         """
@@ -83,6 +536,42 @@ class DocumentRepository:
         document = await Document.find_one(Document.hashed_content == hashing_key)
         return document
 
+    async def titles(self, hashing_keys: list[str]) -> dict[str, str]:
+        """
+        Get the titles of documents, through the metadata cache.
+
+        :param hashing_keys: The hashed contents of the documents.
+        :return: The title of each stored document keyed by its hashed content, the unknown keys are left out.
+        """
+        titles = {}
+        for hashing_key in hashing_keys:
+            title = self.metadata_cache.get(hashing_key)
+            if title is not None:
+                titles[hashing_key] = title
+
+        missing = [hashing_key for hashing_key in hashing_keys if hashing_key not in titles]
+        if missing:
+            documents = await Document.find({"hashed_content": {"$in": missing}}).project(DocumentMetadata).to_list()
+            for document in documents:
+                titles[document.hashed_content] = document.title
+                self.metadata_cache.put(document.hashed_content, document.title)
+
+        return titles
+
+    async def exists_by_raw_hash(self, raw_hash: str) -> bool:
+        """
+        Check if a file with the same raw bytes was already uploaded.
+
+        :param raw_hash: The sha256 of the raw bytes of the file.
+        :return: True if a document with this raw hash exists, False otherwise.
+        """
+        # only the _id is fetched, the stored bytes can be large
+        found = await Document.get_motor_collection().find_one(
+            {"raw_hash": raw_hash, "indexed": {"$ne": False}},
+            {"_id": 1}
+        )
+        return found is not None
+
     async def get_by_id(self, document_id: str) -> Optional[Document]:
         """
         Get a document by its ID.
@@ -117,6 +606,8 @@ class DocumentRepository:
                     setattr(document, field, update_data[field])
 
             await document.save()
+            self.metadata_cache.discard(document.hashed_content)
+            await self._corpus_changed()
             return document
         except Exception as e:
             print(f"Error updating document: {e}")
@@ -135,7 +626,27 @@ class DocumentRepository:
                 return False
 
             await document.delete()
+            self.metadata_cache.discard(document.hashed_content)
+            await self._corpus_changed()
             return True
         except Exception as e:
             print(f"Error deleting document: {e}")
             return False
+
+    async def delete_by_key(self, hashing_key: str) -> bool:
+        """
+        Delete a document by its hashed content, from the database and from the indices.
+
+        :param hashing_key: The hashed content of the document.
+        :return: True if the document was stored, False otherwise.
+        """
+        result = await Document.find(Document.hashed_content == hashing_key).delete()
+        self.metadata_cache.discard(hashing_key)
+
+        index_deletions = await asyncio.gather(*[service.delete(hashing_key) for service in self._indexing_services()])
+
+        deleted = bool(result and result.deleted_count)
+        if deleted or any(index_deletions):
+            await self._corpus_changed()
+
+        return deleted
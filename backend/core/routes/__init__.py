@@ -1,4 +1,7 @@
 from .base import base_router
 from .data import data_router
+from .evaluation import evaluation_router
+from .health import health_router
 from .index import indexing_router
+from .metrics import metrics_router
 from .query import query_router
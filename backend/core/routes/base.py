@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 
 from ..helpers.config import get_settings, Settings
+from ..services import LanguageProcessingService
 
 base_router = APIRouter(
     prefix='/api/v1',
@@ -29,3 +30,13 @@ async def welcome(app_settings: Settings = Depends(get_settings)):
             "indexing_service": indexing_service
         }
     }
+
+
+@base_router.get('/stats')
+async def stats(request: Request, language_processing_service: LanguageProcessingService):
+    return {
+        "language_processing_caches": language_processing_service.cache_stats(),
+        "embedding_worker": request.app.embedding_worker.stats(),
+        "query_embedding_cache": request.app.query_embedding_cache.stats(),
+        "metadata_cache": request.app.services.document_repository.metadata_cache.stats(),
+    }
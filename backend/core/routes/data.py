@@ -30,8 +30,7 @@ async def upload(file: File, data_controller: DataController = Depends()):
 
 @data_router.put("/{file_id}/process")
 async def process_file(file_id: str, data_controller: DataController = Depends()):
-    content = data_controller.parse_file(file_id)
-    content = data_controller.clean_text(content)
+    content = await data_controller.process_file(file_id)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+
+from ..controllers import EvaluationController
+from ..models import EvaluationRequest
+
+evaluation_router = APIRouter(
+    prefix="/api/v1/evaluation",
+    tags=["api_v1", "evaluation"]
+)
+
+
+@evaluation_router.post('/run')
+async def run(evaluation_request: EvaluationRequest, controller: EvaluationController = Depends()):
+    return await controller.evaluate(evaluation_request)
+
+
+@evaluation_router.get('/jobs/{job_id}')
+async def job_progress(job_id: str, controller: EvaluationController = Depends()):
+    return await controller.job_progress(job_id)
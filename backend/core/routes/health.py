@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request, status
+from starlette.responses import JSONResponse
+
+health_router = APIRouter(
+    prefix="/api/v1/health",
+    tags=["api_v1", "health"]
+)
+
+
+@health_router.get("/live")
+async def live():
+    return {"status": "alive"}
+
+
+@health_router.get("/ready")
+async def ready(request: Request):
+    report = request.app.startup.report()
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if report["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=report
+    )
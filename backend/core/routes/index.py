@@ -11,3 +11,13 @@ indexing_router = APIRouter(
 @indexing_router.put('/index_all')
 async def index_all(controller: IndexingController = Depends()):
     return await controller.index_all()
+
+
+@indexing_router.get('/jobs/{job_id}')
+async def job_progress(job_id: str, controller: IndexingController = Depends()):
+    return await controller.job_progress(job_id)
+
+
+@indexing_router.put('/reindex')
+async def reindex(controller: IndexingController = Depends()):
+    return await controller.reindex_all()
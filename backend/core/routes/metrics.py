@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+
+from ..services.Metrics import metrics
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get("/metrics")
+async def prometheus_metrics(request: Request):
+    metrics.refresh(request.app)
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,50 @@
+import re
+from collections import deque
+from typing import Iterator
+
+WORD_PATTERN = re.compile(r"\S+")
+
+
+class PassageChunker:
+    """
+    Splits a text into overlapping passages of a fixed number of words, short enough for the embedding model
+    to read them whole instead of truncating the document at its maximum sequence length.
+    The passages are produced lazily while the words are scanned, only the offsets of the current window are held.
+    """
+
+    def __init__(self, passage_words: int, overlap_words: int):
+        """
+        :param passage_words: The number of words per passage.
+        :param overlap_words: The number of words shared by two consecutive passages.
+        """
+        if passage_words <= 0 or not 0 <= overlap_words < passage_words:
+            raise ValueError("The overlap must be smaller than the passage, and the passage not empty")
+
+        self.passage_words = passage_words
+        self.overlap_words = overlap_words
+
+    def passages(self, text: str) -> Iterator[str]:
+        """
+        Iterate over the passages of a text.
+
+        :param text: The text to split.
+        :return: An iterator over the passages, in order. A text shorter than a passage gives a single passage.
+        """
+        step = self.passage_words - self.overlap_words
+        window = deque()  # start offsets of the words of the current passage
+        window_end = 0
+        yielded = False
+
+        for match in WORD_PATTERN.finditer(text):
+            window.append(match.start())
+            window_end = match.end()
+
+            if len(window) == self.passage_words:
+                yield text[window[0]:window_end]
+                yielded = True
+                for _ in range(step):
+                    window.popleft()
+
+        # the last words, unless they are all part of the previous passage already
+        if window and (not yielded or len(window) > self.overlap_words):
+            yield text[window[0]:window_end]
@@ -0,0 +1 @@
+from .PassageChunker import PassageChunker
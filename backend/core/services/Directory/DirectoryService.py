@@ -6,6 +6,7 @@ class DirectoryService:
     base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     files_dir = os.path.join(base_dir, "assets")
     index_dir = os.path.join(base_dir, "index")
+    evaluation_dir = os.path.normpath(os.path.join(base_dir, "..", "..", "evaluation_data"))
 
     @classmethod
     def get_file_path(cls, file_name):
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    A bounded, thread-safe LRU cache of the query embedding vectors with an optional time to live,
+    keyed by the model name and the cleaned query text.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float] = None):
+        """
+        :param max_size: The maximum number of vectors kept in memory, the least recently used are evicted first.
+        :param ttl_seconds: How long an entry stays valid after it is added, None keeps entries until evicted.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[np.ndarray, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, count=False) is not None
+
+    def _lookup(self, key: Hashable) -> Optional[np.ndarray]:
+        # must be called with the lock held
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        vector, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return vector
+
+    def get(self, key: Hashable, count: bool = True) -> Optional[np.ndarray]:
+        """
+        Get a cached vector and mark it as recently used.
+
+        :param key: The cache key.
+        :param count: Whether the lookup is counted in the hit and miss statistics.
+        :return: The cached vector, or None if it is not cached or expired.
+        """
+        with self._lock:
+            vector = self._lookup(key)
+            if count:
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            return vector
+
+    def put(self, key: Hashable, vector) -> None:
+        """
+        Add a vector to the cache, evicting the least recently used entries if the cache is full.
+
+        :param key: The cache key.
+        :param vector: The embedding vector, stored as a read-only float32 numpy array.
+        """
+        if self.max_size <= 0:
+            return
+
+        vector = np.array(vector, dtype=np.float32)
+        vector.flags.writeable = False
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            self._entries[key] = (vector, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        :return: The size and the hit and miss counters of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+        }
@@ -0,0 +1,182 @@
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+from fastapi import HTTPException, status
+
+from ..Metrics import metrics
+from ...models.enums import ResponseEnum
+
+
+class EmbeddingWorker:
+    """
+    An app-scoped micro-batching queue in front of the embedding model.
+    Concurrent encode requests are gathered for a short time window, up to a maximum batch size,
+    encoded with one call to the model in a background thread, and each caller gets its own vector back.
+    """
+
+    def __init__(self, max_batch_size: int, batch_window_ms: float, encode_batch_size: int, embedding_model=None):
+        """
+        :param max_batch_size: The maximum number of texts encoded together.
+        :param batch_window_ms: How long the first request of a batch waits for others to join it.
+        :param encode_batch_size: The batch size of each forward pass inside the model.
+        :param embedding_model: The SentenceTransformer model, it can also be set later with set_model,
+                                requests queued before that wait for it, or fail if set_failed is called instead.
+        """
+        self.embedding_model = None
+        self._model_ready = asyncio.Event()
+        self._load_error: Optional[Exception] = None
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self.encode_batch_size = encode_batch_size
+
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future]] = asyncio.Queue()
+        # the model is used by one thread at a time, batching is what brings the throughput
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._task: Optional[asyncio.Task] = None
+
+        # metrics
+        self.requests_count = 0
+        self.batches_count = 0
+        self.last_batch_size = 0
+        self.batch_sizes = Counter()
+
+        if embedding_model is not None:
+            self.set_model(embedding_model)
+
+    @property
+    def ready(self) -> bool:
+        return self.embedding_model is not None
+
+    def set_model(self, embedding_model) -> None:
+        self.embedding_model = embedding_model
+        self._model_ready.set()
+
+    def set_failed(self, error: Exception) -> None:
+        """
+        Fail the queued and the next encode requests, the model could not be loaded.
+
+        :param error: The error raised by the model loader.
+        """
+        self._load_error = error
+        self._model_ready.set()
+
+    def _unavailable(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "message": ResponseEnum.EMBEDDING_MODEL_NOT_AVAILABLE.value
+            }
+        )
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+
+        self._executor.shutdown(wait=True)
+
+    async def encode(self, text: str) -> np.ndarray:
+        """
+        Queue a text for encoding and wait for its vector.
+
+        :param text: The text to encode.
+        :return: The embedding of the text.
+        """
+        if self._load_error is not None:
+            raise self._unavailable()
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        self.requests_count += 1
+        return await future
+
+    async def encode_many(self, texts: list[str]) -> list[np.ndarray]:
+        """
+        Queue several texts for encoding, they are batched together with the other pending requests.
+
+        :param texts: The texts to encode.
+        :return: The embedding of each text, in the same order.
+        """
+        return list(await asyncio.gather(*[self.encode(text) for text in texts]))
+
+    def stats(self) -> dict:
+        """
+        :return: The queue depth and the batch size metrics of the worker.
+        """
+        return {
+            "ready": self.ready,
+            "queue_depth": self._queue.qsize(),
+            "requests_count": self.requests_count,
+            "batches_count": self.batches_count,
+            "last_batch_size": self.last_batch_size,
+            "average_batch_size": round(sum(size * count for size, count in self.batch_sizes.items())
+                                        / self.batches_count, 2) if self.batches_count else 0,
+            "max_batch_size": self.max_batch_size,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+        }
+
+    async def _collect_batch(self) -> list[tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+
+        # give concurrent requests the time window to join, unless a full batch is already waiting
+        if self.batch_window > 0 and self._queue.qsize() < self.max_batch_size - 1:
+            await asyncio.sleep(self.batch_window)
+
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        # callers that gave up while waiting do not need to be encoded
+        return [(text, future) for text, future in batch if not future.done()]
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        return self.embedding_model.encode(texts, batch_size=self.encode_batch_size)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        await self._model_ready.wait()
+
+        if self._load_error is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(self._unavailable())
+            return
+
+        while True:
+            batch = await self._collect_batch()
+            if not batch:
+                continue
+
+            self.batches_count += 1
+            self.last_batch_size = len(batch)
+            self.batch_sizes[len(batch)] += 1
+            metrics.embedding_batch_size.observe(len(batch))
+
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._encode, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
@@ -0,0 +1,64 @@
+import struct
+from typing import Union
+
+import numpy as np
+
+from ...models.enums import VectorStorageEnum
+
+
+class VectorCodec:
+    """
+    Encodes the document embeddings stored in Mongo in the configured VectorStorageEnum format.
+
+    float32 keeps the plain array of numbers. float16 and int8 store a binary blob of 2 and 1 bytes per dimension
+    behind an 8 byte header: the format tag, padding, and for int8 the float32 scale of the vector.
+    The header makes the stored vectors self-describing, so documents written in different formats decode side by side.
+    int8 is a symmetric scalar quantization with one scale per vector: value = int8 * scale.
+    """
+
+    HEADER = struct.Struct("<B3xf")
+    FORMAT_TAGS = {VectorStorageEnum.Float16.value: 1, VectorStorageEnum.Int8.value: 2}
+
+    def __init__(self, storage: str):
+        """
+        :param storage: The VectorStorageEnum value new vectors are encoded with.
+        """
+        self.storage = VectorStorageEnum(storage).value
+
+    def encode(self, vector) -> Union[list[float], bytes]:
+        """
+        :param vector: The embedding to store.
+        :return: A list of floats for float32, a binary blob otherwise.
+        """
+        if self.storage == VectorStorageEnum.Float32.value:
+            return vector.tolist() if isinstance(vector, np.ndarray) else list(vector)
+
+        vector = np.asarray(vector, dtype=np.float32)
+        tag = self.FORMAT_TAGS[self.storage]
+
+        if self.storage == VectorStorageEnum.Float16.value:
+            return self.HEADER.pack(tag, 0.0) + vector.astype(np.float16).tobytes()
+
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+        return self.HEADER.pack(tag, scale) + quantized.tobytes()
+
+    @classmethod
+    def decode(cls, stored: Union[list[float], bytes]) -> np.ndarray:
+        """
+        Decode a stored embedding, whatever format it was written in.
+        A float16 blob is viewed in place without copying it, the returned array is then read-only.
+        An int8 blob is viewed in place too and dequantized to a new float32 array.
+
+        :param stored: The stored embedding.
+        :return: The embedding as a NumPy array.
+        """
+        if not isinstance(stored, (bytes, bytearray, memoryview)):
+            return np.asarray(stored, dtype=np.float32)
+
+        tag, scale = cls.HEADER.unpack_from(stored)
+        if tag == cls.FORMAT_TAGS[VectorStorageEnum.Float16.value]:
+            return np.frombuffer(stored, dtype=np.float16, offset=cls.HEADER.size)
+
+        quantized = np.frombuffer(stored, dtype=np.int8, offset=cls.HEADER.size)
+        return np.multiply(quantized, scale, dtype=np.float32)
@@ -0,0 +1,3 @@
+from .EmbeddingCache import EmbeddingCache
+from .EmbeddingWorker import EmbeddingWorker
+from .VectorCodec import VectorCodec
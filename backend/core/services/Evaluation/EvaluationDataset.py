@@ -0,0 +1,58 @@
+import csv
+import os
+
+
+class EvaluationDataset:
+    """
+    A test collection in the format of the CISI files in evaluation_data:
+        cisi_all.csv    doc_id, content
+        cisi_qry.csv    query_id, content
+        cisi_rel.csv    query_id, doc_id     one row per relevant document
+    """
+
+    DOCUMENTS_FILE = "cisi_all.csv"
+    QUERIES_FILE = "cisi_qry.csv"
+    RELEVANCE_FILE = "cisi_rel.csv"
+
+    def __init__(self, documents: dict[str, str], queries: dict[str, str], relevant: dict[str, set[str]]):
+        """
+        :param documents: The content of each document, keyed by doc_id.
+        :param queries: The text of each query, keyed by query_id.
+        :param relevant: The doc_ids of the relevant documents of each query, keyed by query_id.
+        """
+        self.documents = documents
+        self.queries = queries
+        self.relevant = relevant
+
+    @staticmethod
+    def _read(path: str) -> list[dict]:
+        with open(path, encoding="utf-8", newline="") as f:
+            return list(csv.DictReader(f))
+
+    @classmethod
+    def load(cls, directory: str) -> "EvaluationDataset":
+        """
+        :param directory: The directory holding the three CSV files.
+        :return: The dataset.
+        """
+        documents = {
+            row["doc_id"].strip(): row["content"].strip()
+            for row in cls._read(os.path.join(directory, cls.DOCUMENTS_FILE))
+        }
+        queries = {
+            row["query_id"].strip(): row["content"].strip()
+            for row in cls._read(os.path.join(directory, cls.QUERIES_FILE))
+        }
+
+        relevant: dict[str, set[str]] = {}
+        for row in cls._read(os.path.join(directory, cls.RELEVANCE_FILE)):
+            if row["query_id"] and row["doc_id"]:
+                relevant.setdefault(row["query_id"].strip(), set()).add(row["doc_id"].strip())
+
+        return cls(documents, queries, relevant)
+
+    def judged_queries(self) -> dict[str, str]:
+        """
+        :return: The queries that have at least one relevant document, the others cannot be scored.
+        """
+        return {query_id: query for query_id, query in self.queries.items() if self.relevant.get(query_id)}
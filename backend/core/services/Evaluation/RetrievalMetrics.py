@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+
+
+class RetrievalMetrics:
+    """
+    Ranking quality and latency metrics of an evaluation run.
+    Every ranking is a list of doc_ids in rank order, the relevance judgements are binary.
+    """
+
+    @staticmethod
+    def precision_at(ranking: list[str], relevant: set[str], k: int) -> float:
+        return len(relevant.intersection(ranking[:k])) / k
+
+    @staticmethod
+    def recall(ranking: list[str], relevant: set[str]) -> float:
+        return len(relevant.intersection(ranking)) / len(relevant) if relevant else 0.0
+
+    @staticmethod
+    def average_precision(ranking: list[str], relevant: set[str]) -> float:
+        """
+        The mean of the precisions at the rank of each relevant document retrieved,
+        divided by the number of relevant documents, so the ones not retrieved count as 0.
+        """
+        if not relevant:
+            return 0.0
+
+        hits = 0
+        precisions_sum = 0.0
+        for rank, doc_id in enumerate(ranking, start=1):
+            if doc_id in relevant:
+                hits += 1
+                precisions_sum += hits / rank
+        return precisions_sum / len(relevant)
+
+    @staticmethod
+    def ndcg_at(ranking: list[str], relevant: set[str], k: int) -> float:
+        dcg = sum(1 / math.log2(rank + 1) for rank, doc_id in enumerate(ranking[:k], start=1) if doc_id in relevant)
+        ideal_dcg = sum(1 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+        return dcg / ideal_dcg if ideal_dcg else 0.0
+
+    @classmethod
+    def quality(cls, rankings: dict[str, list[str]], relevant: dict[str, set[str]]) -> dict:
+        """
+        :param rankings: The ranking of each query, keyed by query_id.
+        :param relevant: The relevant doc_ids of each query, keyed by query_id.
+        :return: The metrics averaged over the queries.
+        """
+        per_query = [
+            {
+                "map": cls.average_precision(ranking, relevant[query_id]),
+                "ndcg_at_10": cls.ndcg_at(ranking, relevant[query_id], 10),
+                "precision_at_1": cls.precision_at(ranking, relevant[query_id], 1),
+                "precision_at_5": cls.precision_at(ranking, relevant[query_id], 5),
+                "precision_at_10": cls.precision_at(ranking, relevant[query_id], 10),
+                "recall": cls.recall(ranking, relevant[query_id]),
+            }
+            for query_id, ranking in rankings.items()
+        ]
+        if not per_query:
+            return {}
+
+        return {metric: round(float(np.mean([scores[metric] for scores in per_query])), 4) for metric in per_query[0]}
+
+    @staticmethod
+    def latency(latencies: list[float], elapsed_seconds: float) -> dict:
+        """
+        :param latencies: The duration of each query, in seconds.
+        :param elapsed_seconds: The wall time of the whole run, the queries ran concurrently.
+        :return: The latency percentiles in milliseconds and the throughput in queries per second.
+        """
+        if not latencies:
+            return {}
+
+        p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+        return {
+            "latency_ms": {
+                "p50": round(float(p50), 2),
+                "p95": round(float(p95), 2),
+                "p99": round(float(p99), 2),
+                "mean": round(float(np.mean(latencies) * 1000), 2),
+            },
+            "throughput_qps": round(len(latencies) / elapsed_seconds, 2) if elapsed_seconds > 0 else None,
+        }
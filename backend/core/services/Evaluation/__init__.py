@@ -0,0 +1,2 @@
+from .EvaluationDataset import EvaluationDataset
+from .RetrievalMetrics import RetrievalMetrics
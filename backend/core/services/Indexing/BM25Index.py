@@ -0,0 +1,230 @@
+import json
+import math
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+
+from .IndexLock import IndexLock
+
+
+class BM25Index:
+    """
+    An in-process inverted index scored with BM25.
+
+    Documents are appended without rebuilding anything: their term frequencies are added to the posting
+    lists and written to an append-only log, which is replayed when the index is opened again.
+    Re-indexing a document replaces its previous version, the old one is masked out of the scores.
+
+    The uvicorn workers can share the index directory: the appends are serialized by a lock file,
+    and a process replays the entries appended by the others before its next read or write.
+    """
+
+    LOG_FILE = "documents.jsonl"
+
+    def __init__(self, index_dir: str, k1: float = 1.2, b: float = 0.75):
+        """
+        :param index_dir: The directory holding the index log, created if missing.
+        :param k1: BM25 term frequency saturation.
+        :param b: BM25 document length normalization.
+        """
+        self.index_dir = index_dir
+        self.k1 = k1
+        self.b = b
+        os.makedirs(index_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._writer_lock = IndexLock(os.path.join(index_dir, "writer.lock"))
+        self._log_size = 0  # bytes of the log replayed by this process
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._lengths: list[int] = []
+        self._deleted: list[bool] = []
+        self._deleted_count = 0
+        self._total_length = 0
+        self._postings: dict[str, tuple[list[int], list[int]]] = {}
+        self._arrays: dict[str, tuple[np.ndarray, np.ndarray]] = {}  # posting lists as arrays, built on demand
+        self._lengths_array = None
+        self._deleted_array = None
+
+        self._load()
+
+    def _log_path(self) -> str:
+        return os.path.join(self.index_dir, self.LOG_FILE)
+
+    def _refresh(self) -> None:
+        # must be called with the lock held, replays the entries appended by the other processes
+        try:
+            if os.path.getsize(self._log_path()) <= self._log_size:
+                return
+        except FileNotFoundError:
+            return
+
+        with open(self._log_path(), "rb") as f:
+            f.seek(self._log_size)
+            appended = f.read()
+
+        # a last line without its newline is still being written, or was interrupted
+        complete = appended[:appended.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "delete" in entry:
+                self._delete(entry["delete"])
+            else:
+                self._add(entry["file_id"], entry["terms"])
+        self._log_size += len(complete)
+
+    def _append(self, entries: list[dict]) -> None:
+        # must be called with both locks held, after the refresh
+        data = "".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8")
+        with open(self._log_path(), "r+b" if os.path.exists(self._log_path()) else "wb") as f:
+            f.seek(self._log_size)
+            f.truncate()  # drops the partial line of an interrupted append
+            f.write(data)
+        self._log_size += len(data)
+
+    def _load(self) -> None:
+        with self._lock:
+            self._refresh()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids) - self._deleted_count
+
+    def __contains__(self, file_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return file_id in self._rows
+
+    def _delete(self, file_id: str) -> bool:
+        # must be called with the lock held
+        row = self._rows.pop(file_id, None)
+        if row is None:
+            return False
+
+        self._deleted[row] = True
+        self._deleted_count += 1
+        self._total_length -= self._lengths[row]
+        self._deleted_array = None
+        return True
+
+    def _add(self, file_id: str, term_frequencies: dict[str, int]) -> None:
+        # must be called with the lock held
+        self._delete(file_id)
+
+        row = len(self._ids)
+        self._ids.append(file_id)
+        self._rows[file_id] = row
+        length = sum(term_frequencies.values())
+        self._lengths.append(length)
+        self._deleted.append(False)
+        self._total_length += length
+
+        for term, frequency in term_frequencies.items():
+            rows, frequencies = self._postings.setdefault(term, ([], []))
+            rows.append(row)
+            frequencies.append(frequency)
+            self._arrays.pop(term, None)
+
+        self._lengths_array = None
+        self._deleted_array = None
+
+    def add(self, documents: list[tuple[str, str]]) -> int:
+        """
+        Add or replace documents in the index.
+
+        :param documents: A list of (file_id, text) tuples, the text is tokenized on whitespace.
+        :return: The number of documents added.
+        """
+        entries = [
+            {"file_id": file_id, "terms": dict(Counter(text.split()))}
+            for file_id, text in documents
+        ]
+
+        with self._lock, self._writer_lock:
+            self._refresh()
+            self._append(entries)
+
+            for entry in entries:
+                self._add(entry["file_id"], entry["terms"])
+
+        return len(entries)
+
+    def delete(self, file_id: str) -> bool:
+        """
+        Remove a document from the index.
+
+        :param file_id: The ID of the document.
+        :return: True if the document was in the index, False otherwise.
+        """
+        with self._lock, self._writer_lock:
+            self._refresh()
+            if file_id not in self._rows:
+                return False
+
+            self._append([{"delete": file_id}])
+            return self._delete(file_id)
+
+    def _posting_arrays(self, term: str):
+        # must be called with the lock held
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            rows, frequencies = self._postings[term]
+            arrays = (np.asarray(rows, dtype=np.int64), np.asarray(frequencies, dtype=np.float32))
+            self._arrays[term] = arrays
+        return arrays
+
+    def search(self, query: str, k: int) -> list[tuple[str, float]]:
+        """
+        Score the documents containing the query terms with BM25 and keep the top k.
+
+        :param query: The query, tokenized on whitespace the same way as the indexed texts.
+        :param k: The number of results.
+        :return: A list of (file_id, score) tuples, sorted by descending score.
+        """
+        with self._lock:
+            self._refresh()
+            documents_count = len(self)
+            if documents_count == 0 or k <= 0:
+                return []
+
+            if self._lengths_array is None:
+                self._lengths_array = np.asarray(self._lengths, dtype=np.float32)
+            if self._deleted_array is None:
+                self._deleted_array = np.asarray(self._deleted, dtype=bool)
+            lengths = self._lengths_array
+            deleted = self._deleted_array
+            average_length = self._total_length / documents_count or 1
+            ids = self._ids
+
+            postings = [
+                (self._posting_arrays(term), count)
+                for term, count in Counter(query.split()).items()
+                if term in self._postings
+            ]
+
+        scores = np.zeros(len(lengths), dtype=np.float32)
+        for (rows, frequencies), query_frequency in postings:
+            alive = ~deleted[rows]
+            document_frequency = int(alive.sum())
+            if document_frequency == 0:
+                continue
+
+            idf = math.log(1 + (documents_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[rows] / average_length)
+            scores[rows] += query_frequency * idf * frequencies * (self.k1 + 1) / (frequencies + norm) * alive
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) == 0:
+            return []
+
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+
+        return [(ids[row], float(scores[row])) for row in top]
@@ -0,0 +1,84 @@
+import asyncio
+from typing import Optional
+
+from fastapi import FastAPI
+
+from .IndexingService import IndexingService
+from ..Processing import tasks
+
+
+class BM25Service(IndexingService):
+    """
+    Lexical retrieval with BM25 over the non-semantic clean_text output (stopwords removed, lemmatized, stemmed).
+
+    The service is served by the app-scoped BM25Index, an incremental inverted index using the BM25 weighting model
+    of Terrier (k1=1.2, b=0.75). It replaced the PyTerrier service, whose on-disk indices could not be appended to.
+    The index stays open across requests and each upload only appends its own postings.
+    """
+
+    def __init__(self, app: FastAPI):
+        super().__init__()
+        self.lexical_index = app.lexical_index
+        self.processing_pool = app.processing_pool
+
+    async def _clean(self, text: str) -> str:
+        return await self.processing_pool.run(tasks.clean_text, text, False)
+
+    async def index(self, file_id: str, file_content: str, embedding: Optional[list[float]] = None) -> bool:
+        """
+        Index the given corpus and return the index reference.
+        
+        :param file_id: The ID of the file to index.
+        :param file_content: The content of the document to index.
+        :param embedding: Unused, the lexical index does not store vectors.
+        :return: True if the document was indexed successfully, False otherwise.
+        """
+        terms = await self._clean(file_content)
+        await asyncio.to_thread(self.lexical_index.add, [(file_id, terms)])
+        return True
+
+    async def index_many(self, documents: list[dict]) -> list[str]:
+        """
+        Index a batch of documents, their contents are cleaned in batches spread over the processing pool.
+
+        :param documents: A list of dicts with the keys "file_id", "content" and "embedding".
+        :return: The file_ids of the documents indexed successfully.
+        """
+        terms = await self.processing_pool.run_batched(
+            tasks.clean_texts, [document["content"] for document in documents], False
+        )
+
+        await asyncio.to_thread(
+            self.lexical_index.add,
+            [(document["file_id"], document_terms) for document, document_terms in zip(documents, terms)]
+        )
+        return [document["file_id"] for document in documents]
+
+    async def delete(self, file_id: str) -> bool:
+        """
+        Remove a document from the BM25 index.
+
+        :param file_id: The ID of the document.
+        :return: True if the document was in the index, False otherwise.
+        """
+        return await asyncio.to_thread(self.lexical_index.delete, file_id)
+
+    async def search(self, query: str, retrieved_count: int = 10, **kwargs) -> list:
+        """
+        Search for documents with BM25.
+
+        :param query: The search query.
+        :param retrieved_count: The number of documents to retrieve.
+        :param kwargs: The dense retrieval parameters (Rocchio), ignored by the lexical search.
+        :return: A list of document IDs matching the search query.
+        """
+        terms = await self._clean(query)
+        hits = await asyncio.to_thread(self.lexical_index.search, terms, retrieved_count)
+
+        return [
+            {
+                "file_id": file_id,
+                "score": score,
+            }
+            for file_id, score in hits
+        ]
@@ -0,0 +1,374 @@
+import asyncio
+from abc import abstractmethod
+
+import numpy as np
+from fastapi import FastAPI
+
+from .IndexingService import IndexingService
+from ..Chunking import PassageChunker
+from ..Metrics import metrics
+from ...helpers.config import get_settings
+
+
+class DenseIndexingService(IndexingService):
+    """
+    Base class for the indexing services that retrieve documents by embedding similarity.
+    Subclasses provide the k nearest neighbours lookup, the query encoding and the Rocchio feedback are shared.
+
+    With CHUNKING_ENABLED the documents are indexed as overlapping passages, each passage is a child vector
+    whose stored file_id is its document's, and the passage hits are max-pooled into document scores.
+    """
+
+    def __init__(self, app: FastAPI):
+        settings = get_settings()
+        self.model_name = settings.EMBEDDING_MODEL
+        self.embedding_worker = app.embedding_worker
+        self.query_embedding_cache = app.query_embedding_cache
+
+        self.chunker = None
+        if settings.CHUNKING_ENABLED:
+            self.chunker = PassageChunker(settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
+            self.passage_batch_size = settings.CHUNK_BATCH_SIZE
+            self.passage_oversample = settings.CHUNK_OVERSAMPLE
+
+        self.rescore_oversample = settings.RESCORE_OVERSAMPLE if settings.RESCORE_ENABLED else 0
+
+    @staticmethod
+    def passage_id(file_id: str, passage_number: int) -> str:
+        return f"{file_id}#{passage_number}"
+
+    @staticmethod
+    def parent_id(stored_id: str) -> str:
+        """
+        :param stored_id: The ID of an indexed vector, a file_id or a passage ID.
+        :return: The file_id of the document the vector belongs to.
+        """
+        return stored_id.split("#", 1)[0]
+
+    @abstractmethod
+    async def add_passages(self, passages: list[dict]) -> list[str]:
+        """
+        Write a batch of passage vectors to the index.
+
+        :param passages: A list of dicts with the keys "passage_id", "file_id" and "embedding".
+        :return: The passage_ids written successfully.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_passages(self, file_ids: list[str]) -> None:
+        """
+        Remove every vector of the given documents, their passages and their whole document vector.
+
+        :param file_ids: The IDs of the documents, the unknown ones are ignored.
+        """
+        pass
+
+    async def _index_passage_batch(self, batch: list[tuple[str, int, str]]) -> set[str]:
+        """
+        :return: The file_ids of the passages that were not written.
+        """
+        vectors = await self.embedding_worker.encode_many([passage for _, _, passage in batch])
+        passages = [
+            {
+                "passage_id": self.passage_id(file_id, passage_number),
+                "file_id": file_id,
+                "embedding": vector,
+            }
+            for (file_id, passage_number, _), vector in zip(batch, vectors)
+        ]
+        written_ids = set(await self.add_passages(passages))
+        return {passage["file_id"] for passage in passages if passage["passage_id"] not in written_ids}
+
+    async def index_passages(self, documents: list[dict]) -> list[str]:
+        """
+        Split the documents into passages and index every passage as its own vector.
+        The passages are streamed from the texts and embedded and written CHUNK_BATCH_SIZE at a time,
+        so the memory held does not grow with the size of the documents.
+        The vectors of a document indexed again are deleted first, it may have fewer passages than before.
+
+        :param documents: A list of dicts with the keys "file_id" and "content".
+        :return: The file_ids of the documents whose passages were all indexed.
+        """
+        await self.delete_passages([document["file_id"] for document in documents])
+
+        chunked_file_ids = []
+        failed_file_ids = set()
+        batch = []
+
+        for document in documents:
+            for passage_number, passage in enumerate(self.chunker.passages(document["content"])):
+                if passage_number == 0:
+                    chunked_file_ids.append(document["file_id"])
+                batch.append((document["file_id"], passage_number, passage))
+                if len(batch) >= self.passage_batch_size:
+                    failed_file_ids |= await self._index_passage_batch(batch)
+                    batch = []
+
+        if batch:
+            failed_file_ids |= await self._index_passage_batch(batch)
+
+        return [file_id for file_id in chunked_file_ids if file_id not in failed_file_ids]
+
+    @staticmethod
+    def max_pool(hits: list[dict]) -> list[dict]:
+        """
+        Turn passage hits into document hits, a document scores its best passage.
+
+        :param hits: Passage hits with the keys "file_id", "score" and "embedding", sorted by descending score.
+        :return: One hit per document, the one of its best passage, sorted by descending score.
+        """
+        seen = set()
+        pooled = []
+        for hit in hits:
+            if hit["file_id"] not in seen:
+                seen.add(hit["file_id"])
+                pooled.append(hit)
+        return pooled
+
+    @staticmethod
+    def rescore(query_vector: np.ndarray, hits: list[dict]) -> list[dict]:
+        """
+        Re-rank kNN hits with the exact cosine similarity of their full precision vectors,
+        recovering the ordering lost by a quantized index.
+
+        :param query_vector: The query embedding.
+        :param hits: Hits with the keys "file_id", "score" and "embedding".
+        :return: The hits with their exact scores, scaled to [0, 1], sorted by descending score.
+        """
+        if not hits:
+            return hits
+
+        vectors = np.asarray([hit["embedding"] for hit in hits], dtype=np.float32)
+        query = np.asarray(query_vector, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1)
+        norms[norms == 0] = 1
+        similarities = vectors @ query / norms
+
+        rescored = [{**hit, "score": float((1 + similarity) / 2)} for hit, similarity in zip(hits, similarities)]
+        rescored.sort(key=lambda hit: hit["score"], reverse=True)
+        return rescored
+
+    def _candidates_count(self, k: int) -> int:
+        candidates_count = k
+        if self.chunker is not None:
+            candidates_count *= self.passage_oversample
+        if self.rescore_oversample:
+            candidates_count *= self.rescore_oversample
+        return candidates_count
+
+    def _top_documents(self, query_vector: np.ndarray, hits: list[dict], k: int) -> list[dict]:
+        if self.rescore_oversample:
+            hits = self.rescore(query_vector, hits)
+        if self.chunker is not None:
+            hits = self.max_pool(hits)
+        return hits[:k]
+
+    async def knn_documents(self, query_vector: np.ndarray, k: int) -> list[dict]:
+        """
+        Find the k most similar documents, rescoring the candidates with full precision when RESCORE_ENABLED,
+        and pooling the passage hits when the documents are chunked.
+
+        :param query_vector: The query embedding.
+        :param k: The number of documents to retrieve.
+        :return: A list of dicts with the keys "file_id", "score" and "embedding", sorted by descending score.
+        """
+        hits = await self.knn(query_vector, self._candidates_count(k))
+        return self._top_documents(query_vector, hits, k)
+
+    async def knn_documents_many(self, query_vectors: list[np.ndarray], k: int) -> list[list[dict]]:
+        """
+        Run knn_documents for several query vectors, with a single knn_many call.
+
+        :param query_vectors: The query embeddings.
+        :param k: The number of documents to retrieve per query.
+        :return: The documents found for each query vector, in the same order.
+        """
+        hits_lists = await self.knn_many(query_vectors, self._candidates_count(k))
+        return [
+            self._top_documents(query_vector, hits, k)
+            for query_vector, hits in zip(query_vectors, hits_lists)
+        ]
+
+    async def encode_query(self, query: str) -> np.ndarray:
+        """
+        Get the embedding of a cleaned query, from the shared query cache when it was seen recently.
+
+        :param query: The cleaned search query.
+        :return: The embedding of the query.
+        """
+        cache_key = (self.model_name, query)
+        query_vector = self.query_embedding_cache.get(cache_key)
+
+        if query_vector is None:
+            query_vector = await self.embedding_worker.encode(query)
+            self.query_embedding_cache.put(cache_key, query_vector)
+
+        return query_vector
+
+    async def encode_queries(self, queries: list[str]) -> list[np.ndarray]:
+        """
+        Get the embeddings of several cleaned queries, the ones missing from the query cache
+        are queued to the embedding worker together, so they are encoded in the same batches.
+
+        :param queries: The cleaned search queries.
+        :return: The embedding of each query, in the same order.
+        """
+        query_vectors = {}
+        for query in queries:
+            query_vector = self.query_embedding_cache.get((self.model_name, query))
+            if query_vector is not None:
+                query_vectors[query] = query_vector
+
+        missing = list(dict.fromkeys(query for query in queries if query not in query_vectors))
+        if missing:
+            for query, query_vector in zip(missing, await self.embedding_worker.encode_many(missing)):
+                self.query_embedding_cache.put((self.model_name, query), query_vector)
+                query_vectors[query] = query_vector
+
+        return [query_vectors[query] for query in queries]
+
+    @abstractmethod
+    async def knn(self, query_vector: np.ndarray, k: int) -> list[dict]:
+        """
+        Find the k documents whose embeddings are the most similar to the query vector.
+
+        :param query_vector: The query embedding.
+        :param k: The number of documents to retrieve.
+        :return: A list of dicts with the keys "file_id", "score" and "embedding", sorted by descending score.
+                 The score is the cosine similarity scaled to [0, 1], as Elasticsearch reports it.
+        """
+        pass
+
+    async def knn_many(self, query_vectors: list[np.ndarray], k: int) -> list[list[dict]]:
+        """
+        Run a kNN search for each query vector.
+        Services that support multi-search requests should override this; the default runs the searches concurrently.
+
+        :param query_vectors: The query embeddings.
+        :param k: The number of documents to retrieve per query.
+        :return: The hits of each query vector, in the same order, see knn.
+        """
+        return list(await asyncio.gather(*[self.knn(query_vector, k) for query_vector in query_vectors]))
+
+    @staticmethod
+    def rocchio(query_vector: np.ndarray, feedback_vectors: list, alpha: float, beta: float, gamma: float,
+                relevance_threshold: float) -> np.ndarray:
+        """
+        Move the query vector towards the top feedback documents and away from the others.
+
+        :param query_vector: The original query embedding.
+        :param feedback_vectors: The embeddings of the feedback documents, sorted by descending score.
+        :param alpha: Weight for the original query.
+        :param beta: Weight for the feedback documents.
+        :param gamma: Weight for the negative feedback documents.
+        :param relevance_threshold: Percentage of top documents to consider as relevant.
+        :return: The normalized modified query vector.
+        """
+        # split documents to relevant and non-relevant
+        feedback_docs_count = int(len(feedback_vectors) * relevance_threshold)
+        feedback_docs_count = max(feedback_docs_count, 1)
+
+        vectors = np.asarray(feedback_vectors, dtype=np.float32)
+        relevant_vectors = vectors[:feedback_docs_count]
+        non_relevant_vectors = vectors[feedback_docs_count:]
+
+        # Apply ROCCHIO formula with numpy for vectorized operations
+        modified_query = alpha * query_vector + beta * relevant_vectors.mean(axis=0)
+        if len(non_relevant_vectors):
+            modified_query = modified_query - gamma * non_relevant_vectors.mean(axis=0)
+
+        return modified_query / np.linalg.norm(modified_query)  # normalize
+
+    async def search(self, query: str, retrieved_count: int = 10, feedback_docs: int = 20,
+                     alpha: float = 1, beta: float = 0.75, gamma: float = 0.15,
+                     relevance_threshold: float = 0.25, min_score_threshold: float = 0.3) -> list:
+        '''
+        Search for documents using pseudo relevance feedback (Rocchio).
+
+        :param query: The search query.
+        :param retrieved_count: The number of documents to retrieve.
+        :param feedback_docs: The number of documents to use for feedback.
+        :param alpha: Weight for the original query.
+        :param beta: Weight for the feedback documents.
+        :param gamma: Weight for the negative feedback documents.
+        :param relevance_threshold: Percentage of top documents to consider as relevant
+        :param min_score_threshold: The minimum score threshold for a document to be considered a match.
+        :return: A list of document IDs matching the search query.
+        '''
+        with metrics.span("search.encode_query"):
+            query_vector = await self.encode_query(query)
+
+        # Initial search to get feedback documents
+        with metrics.span("search.knn_feedback"):
+            initial_hits = await self.knn_documents(query_vector, k=feedback_docs)
+        if not initial_hits:
+            return []
+
+        with metrics.span("search.rocchio"):
+            modified_query = self.rocchio(
+                query_vector,
+                [hit['embedding'] for hit in initial_hits],
+                alpha, beta, gamma, relevance_threshold
+            )
+
+        # Final search with modified query
+        with metrics.span("search.knn_final"):
+            final_hits = await self.knn_documents(modified_query, k=retrieved_count * 2)
+
+        return self._final_results(final_hits, retrieved_count, min_score_threshold)
+
+    @staticmethod
+    def _final_results(final_hits: list[dict], retrieved_count: int, min_score_threshold: float) -> list[dict]:
+        filtered_hits = [hit for hit in final_hits if hit['score'] >= min_score_threshold]
+        filtered_hits.sort(key=lambda x: x['score'], reverse=True)
+
+        final_result = [
+            {
+                "file_id": hit["file_id"],
+                "score": hit["score"],
+            }
+            for hit in filtered_hits
+        ]
+
+        return final_result[:retrieved_count]
+
+    async def search_many(self, queries: list[str], retrieved_count: int = 10, feedback_docs: int = 20,
+                          alpha: float = 1, beta: float = 0.75, gamma: float = 0.15,
+                          relevance_threshold: float = 0.25, min_score_threshold: float = 0.3) -> list[list]:
+        """
+        Run the Rocchio search of several queries together: the queries are encoded in the same batches,
+        then the feedback searches of all the queries go through one knn_many call,
+        and the searches with the modified queries through another.
+
+        :param queries: The search queries.
+        :return: The results of each query, in the same order, see search for the other parameters.
+        """
+        with metrics.span("search_many.encode_queries"):
+            query_vectors = await self.encode_queries(queries)
+
+        with metrics.span("search_many.knn_feedback"):
+            initial_hits = await self.knn_documents_many(query_vectors, k=feedback_docs)
+
+        # a query without feedback documents has no results, as in search
+        with_feedback = [position for position, hits in enumerate(initial_hits) if hits]
+        with metrics.span("search_many.rocchio"):
+            modified_queries = [
+                self.rocchio(
+                    query_vectors[position],
+                    [hit['embedding'] for hit in initial_hits[position]],
+                    alpha, beta, gamma, relevance_threshold
+                )
+                for position in with_feedback
+            ]
+
+        results = [[] for _ in queries]
+        if not modified_queries:
+            return results
+
+        with metrics.span("search_many.knn_final"):
+            final_hits = await self.knn_documents_many(modified_queries, k=retrieved_count * 2)
+        for position, hits in zip(with_feedback, final_hits):
+            results[position] = self._final_results(hits, retrieved_count, min_score_threshold)
+
+        return results
@@ -1,15 +1,50 @@
+import logging
+from typing import Optional
+
 import numpy as np
-from fastapi import Request
+from fastapi import FastAPI
 
-from .IndexingService import IndexingService
+from .DenseIndexingService import DenseIndexingService
+from ..Metrics import metrics
 from ...helpers.config import get_settings
 
+logger = logging.getLogger("uvicorn.error")
+
+
+class ElasticSearchService(DenseIndexingService):
+    # Elasticsearch rejects a kNN search whose k or num_candidates is above this
+    MAX_KNN_CANDIDATES = 10000
 
-class ElasticSearchService(IndexingService):
-    def __init__(self, request: Request):
-        self.es = request.app.es_client
-        self.index_name = get_settings().ES_INDEXING
-        self.embedding_model = request.app.embedding_model
+    def __init__(self, app: FastAPI):
+        super().__init__(app)
+        self.es = app.es_client
+        settings = get_settings()
+        self.index_name = settings.ES_INDEXING
+        self.num_candidates = settings.ES_NUM_CANDIDATES
+
+    @staticmethod
+    def index_mappings(vector_index_type: str) -> dict:
+        """
+        :param vector_index_type: The index_options type of the dense_vector field, "hnsw", "int8_hnsw", ...
+                                  A quantized HNSW graph still keeps the float vectors in _source, used for rescoring.
+        :return: The mappings of the index.
+        """
+        return {
+            "properties": {
+                "file_id": {
+                    "type": "text"
+                },
+                "embedding": {
+                    "type": "dense_vector",
+                    "similarity": "cosine",
+                    "dims": 768,
+                    "index": True,
+                    "index_options": {
+                        "type": vector_index_type
+                    }
+                }
+            }
+        }
 
     async def create_index_if_not_exists(self):
         """
@@ -23,116 +58,222 @@ class ElasticSearchService(IndexingService):
             # Create index with explicit mappings
             await self.es.indices.create(
                 index=self.index_name,
-                mappings={
-                    "properties": {
-                        "file_id": {
-                            "type": "text"
-                        },
-                        "embedding": {
-                            "type": "dense_vector",
-                            "similarity": "cosine",
-                            "dims": 768,
-                            "index": True
-                        }
-                    }
-                }
+                mappings=self.index_mappings(get_settings().ES_VECTOR_INDEX_TYPE)
             )
             return True
         return False
 
-    async def index(self, file_id: str, file_content: str) -> bool:
+    async def index(self, file_id: str, file_content: str, embedding: Optional[list[float]] = None) -> bool:
         """
         Index a document in Elasticsearch.
 
         :param file_id: The ID of the file to index.
         :param file_content: The content of the file.
+        :param embedding: A precomputed embedding of the content, the content is encoded only if it is missing.
         :return: True if the document was indexed successfully, False otherwise.
         """
         await self.create_index_if_not_exists()
 
+        if self.chunker is not None:
+            return len(await self.index_passages([{"file_id": file_id, "content": file_content}])) > 0
+
+        if embedding is None:
+            embedding = await self.embedding_worker.encode(file_content)
+
         res = await self.es.index(
             index=self.index_name,
             id=file_id,
             document={
                 "file_id": file_id,
-                "embedding": self.embedding_model.encode(file_content)
+                "embedding": embedding
             }
         )
 
         return res['result'] == 'created' or res['result'] == 'updated'
 
-    async def search(self, query: str, retrieved_count: int = 10, feedback_docs: int = 20,
-                     alpha: float = 1, beta: float = 0.75, gamma: float = 0.15,
-                     relevance_threshold: float = 0.25, min_score_threshold: float = 0.3) -> list:
-        '''
-        Search for documents in Elasticsearch.
+    async def _bulk(self, actions: list[dict]) -> list[str]:
+        # the actions rejected by Elasticsearch are reported, not raised, the others are still written
+        from elasticsearch.helpers import async_bulk
 
-        :param query: The search query.
-        :param retrieved_count: The number of documents to retrieve.
-        :param feedback_docs: The number of documents to use for feedback.
-        :param alpha: Weight for the original query.
-        :param beta: Weight for the feedback documents.
-        :param gamma: Weight for the negative feedback documents.
-        :param relevance_threshold: Percentage of top documents to consider as relevant
-        :param min_score_threshold: The minimum score threshold for a document to be considered a match.
-        :return: A list of document IDs matching the search query.
-        '''
+        _, errors = await async_bulk(self.es, actions, raise_on_error=False)
+        failed_ids = {item["_id"] for error in errors for item in error.values()}
+        if failed_ids:
+            logger.warning(f"Elasticsearch bulk: {len(failed_ids)} documents rejected")
+
+        return [action["_id"] for action in actions if action["_id"] not in failed_ids]
+
+    async def index_many(self, documents: list[dict]) -> list[str]:
+        """
+        Index a batch of documents in Elasticsearch with a single bulk request.
+
+        :param documents: A list of dicts with the keys "file_id", "content" and "embedding".
+        :return: The file_ids of the documents indexed successfully.
+        """
         await self.create_index_if_not_exists()
 
-        async def search_by_vector(embedding_vector: list[float], k: int = 10):
-            search_result = await self.es.knn_search(
-                index=self.index_name,
-                knn={
-                    "field": "embedding",
-                    "query_vector": embedding_vector,
-                    "num_candidates": 500,
-                    "k": k,
+        if self.chunker is not None:
+            return await self.index_passages(documents)
+
+        actions = [
+            {
+                "_index": self.index_name,
+                "_id": document["file_id"],
+                "_source": {
+                    "file_id": document["file_id"],
+                    "embedding": document["embedding"],
                 }
-            )
+            }
+            for document in documents
+        ]
+
+        return await self._bulk(actions)
+
+    async def add_passages(self, passages: list[dict]) -> list[str]:
+        """
+        Write a batch of passage vectors with a single bulk request, each passage is an Elasticsearch document
+        holding the file_id of its parent.
+
+        :param passages: A list of dicts with the keys "passage_id", "file_id" and "embedding".
+        :return: The passage_ids written successfully.
+        """
+        await self.create_index_if_not_exists()
+
+        actions = [
+            {
+                "_index": self.index_name,
+                "_id": passage["passage_id"],
+                "_source": {
+                    "file_id": passage["file_id"],
+                    "embedding": passage["embedding"],
+                }
+            }
+            for passage in passages
+        ]
 
-            return search_result['hits']['hits']
+        return await self._bulk(actions)
 
-        query_vector = self.embedding_model.encode(query)
+    async def delete_passages(self, file_ids: list[str]) -> None:
+        """
+        Delete the Elasticsearch documents holding the given file_ids, passages included, with a single request.
 
-        # hits = [
-        #     {
-        #         "file_id": hit["_source"]["file_id"],
-        #         "score": hit["_score"],
-        #     }
-        #     for hit in search_results
-        # ]
+        :param file_ids: The IDs of the documents.
+        """
+        if not file_ids:
+            return
 
-        # Initial search to get feedback documents
-        initial_hits = await search_by_vector(query_vector.tolist(), k=feedback_docs)
+        await self.es.delete_by_query(
+            index=self.index_name,
+            query={"terms": {"file_id": file_ids}},
+            conflicts="proceed",
+            ignore_unavailable=True
+        )
 
-        scores = [hit['_score'] for hit in initial_hits]
-        vectors = [np.array(hit['_source']['embedding']) for hit in initial_hits]
+    async def delete(self, file_id: str) -> bool:
+        """
+        Delete a document from Elasticsearch, with all its passages, which hold its file_id.
+
+        :param file_id: The ID of the document.
+        :return: True if Elasticsearch documents were deleted, False otherwise.
+        """
+        response = await self.es.delete_by_query(
+            index=self.index_name,
+            query={"match": {"file_id": file_id}},
+            refresh=True
+        )
+        return response["deleted"] > 0
 
-        # split documents to relevant and non-relevant
-        sorted_scores = sorted(scores, reverse=True)
-        feedback_docs_count = int(len(sorted_scores) * relevance_threshold)
-        feedback_docs_count = max(feedback_docs_count, 1)
+    async def refresh(self) -> None:
+        """
+        Refresh the index, the documents written since the last periodic refresh become searchable.
+        """
+        await self.es.indices.refresh(index=self.index_name)
 
-        relevant_vectors = vectors[:feedback_docs_count]
-        non_relevant_vectors = vectors[feedback_docs_count:]
+    def _knn_clause(self, query_vector: np.ndarray, k: int) -> dict:
+        # k is capped, and num_candidates is at least k, Elasticsearch rejects the search otherwise
+        k = min(k, self.MAX_KNN_CANDIDATES)
+        return {
+            "field": "embedding",
+            "query_vector": query_vector.tolist(),
+            "num_candidates": min(max(self.num_candidates, k), self.MAX_KNN_CANDIDATES),
+            "k": k,
+        }
 
-        # Apply ROCCHIO formula with numpy for vectorized operations
-        modified_query = (alpha * query_vector
-                          + beta * np.mean(relevant_vectors, axis=0)
-                          - gamma * np.mean(non_relevant_vectors, axis=0))
-        modified_query = modified_query / np.linalg.norm(modified_query)  # normalize
+    async def knn(self, query_vector: np.ndarray, k: int) -> list[dict]:
+        """
+        Run a kNN search against the dense_vector field of the index.
 
-        # Final search with modified query
-        final_hits = await search_by_vector(modified_query.tolist(), k=retrieved_count * 2)
-        filtered_hits = [hit for hit in final_hits if hit['_score'] >= min_score_threshold]
-        filtered_hits.sort(key=lambda x: x['_score'], reverse=True)
+        :param query_vector: The query embedding.
+        :param k: The number of documents to retrieve, at most MAX_KNN_CANDIDATES.
+        :return: A list of dicts with the keys "file_id", "score" and "embedding", sorted by descending score.
+        """
+        search_result = await self.es.knn_search(
+            index=self.index_name,
+            knn=self._knn_clause(query_vector, k)
+        )
 
-        final_result = [
+        return [
             {
                 "file_id": hit["_source"]["file_id"],
                 "score": hit["_score"],
+                "embedding": hit["_source"]["embedding"],
             }
-            for hit in filtered_hits
+            for hit in search_result['hits']['hits']
         ]
 
-        return final_result[:retrieved_count]
+    async def knn_many(self, query_vectors: list[np.ndarray], k: int) -> list[list[dict]]:
+        """
+        Run the kNN searches of several query vectors in a single msearch request.
+
+        :param query_vectors: The query embeddings.
+        :param k: The number of documents to retrieve per query, at most MAX_KNN_CANDIDATES.
+        :return: The hits of each query vector, in the same order, see knn.
+        """
+        if not query_vectors:
+            return []
+
+        searches = []
+        for query_vector in query_vectors:
+            searches.append({"index": self.index_name})
+            knn_clause = self._knn_clause(query_vector, k)
+            searches.append({"knn": knn_clause, "size": knn_clause["k"]})
+
+        search_results = await self.es.msearch(searches=searches)
+
+        hits_lists = []
+        for search_result in search_results["responses"]:
+            if "error" in search_result:
+                raise RuntimeError(f"Elasticsearch msearch failed: {search_result['error']}")
+            hits_lists.append([
+                {
+                    "file_id": hit["_source"]["file_id"],
+                    "score": hit["_score"],
+                    "embedding": hit["_source"]["embedding"],
+                }
+                for hit in search_result['hits']['hits']
+            ])
+
+        return hits_lists
+
+    async def search(self, query: str, **kwargs) -> list:
+        """
+        Search for documents in Elasticsearch, see DenseIndexingService.search for the parameters.
+
+        :param query: The search query.
+        :return: A list of document IDs matching the search query.
+        """
+        with metrics.span("search.index_check"):
+            await self.create_index_if_not_exists()
+
+        return await super().search(query, **kwargs)
+
+    async def search_many(self, queries: list[str], **kwargs) -> list[list]:
+        """
+        Search for several queries in Elasticsearch, see DenseIndexingService.search_many for the parameters.
+
+        :param queries: The search queries.
+        :return: The results of each query, in the same order.
+        """
+        with metrics.span("search_many.index_check"):
+            await self.create_index_if_not_exists()
+
+        return await super().search_many(queries, **kwargs)
@@ -0,0 +1,44 @@
+from typing import Optional, TextIO
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class IndexLock:
+    """
+    An exclusive lock on a file of an index directory, so the uvicorn workers sharing the index write to it in turn.
+    It is reentrant within a process, callers serialize their own threads before taking it.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: The lock file, created if missing.
+        """
+        self.path = path
+        self._file: Optional[TextIO] = None
+        self._depth = 0
+
+    def __enter__(self) -> "IndexLock":
+        if self._depth == 0:
+            lock_file = open(self.path, "a+")
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            except OSError:
+                lock_file.close()
+                raise
+            self._file = lock_file
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._file.close()  # releases the lock
+            self._file = None
@@ -1,4 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Optional
 
 
 class IndexingService(ABC):
@@ -7,22 +9,67 @@ class IndexingService(ABC):
     """
 
     @abstractmethod
-    async def index(self, file_id: str, content: str) -> bool:
+    async def index(self, file_id: str, file_content: str, embedding: Optional[list[float]] = None) -> bool:
         """
         Index the given corpus and return the index reference.
         
         :param file_id: The ID of the file to index.
-        :param content: The content of the document to index.
+        :param file_content: The content of the document to index.
+        :param embedding: A precomputed embedding of the content, used instead of encoding it again.
         :return: True if the document was indexed successfully, False otherwise.
         """
         pass
 
+    async def index_many(self, documents: list[dict]) -> list[str]:
+        """
+        Index a batch of documents.
+        Services that support bulk writes should override this; the default indexes one document at a time.
+
+        :param documents: A list of dicts with the keys "file_id", "content" and "embedding".
+        :return: The file_ids of the documents indexed successfully.
+        """
+        indexed_ids = []
+        for document in documents:
+            if await self.index(document["file_id"], document["content"], document.get("embedding")):
+                indexed_ids.append(document["file_id"])
+
+        return indexed_ids
+
+    async def delete(self, file_id: str) -> bool:
+        """
+        Remove a document, and its passages, from the index.
+        Services that cannot delete keep the document, its search results are dropped when they are hydrated.
+
+        :param file_id: The ID of the document.
+        :return: True if the document was removed, False otherwise.
+        """
+        return False
+
+    async def refresh(self) -> None:
+        """
+        Make the last writes visible to the searches.
+        Services whose writes are not searchable right away should override this; the default does nothing.
+        """
+        pass
+
     @abstractmethod
-    async def search(self, query: str) -> list:
+    async def search(self, query: str, retrieved_count: int = 10) -> list:
         """
         Search for documents in the index.
         
         :param query: The search query.
+        :param retrieved_count: The number of documents to retrieve.
         :return: A list of document IDs matching the search query.
         """
         pass
+
+    async def search_many(self, queries: list[str], retrieved_count: int = 10) -> list[list]:
+        """
+        Search for several queries.
+        Services that can batch the queries should override this; the default runs the searches concurrently.
+
+        :param queries: The search queries.
+        :param retrieved_count: The number of documents to retrieve per query.
+        :return: The results of each query, in the same order.
+        """
+        return list(await asyncio.gather(*[self.search(query, retrieved_count=retrieved_count) for query in queries]))
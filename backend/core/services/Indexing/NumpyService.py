@@ -0,0 +1,109 @@
+import asyncio
+from typing import Optional
+
+import numpy as np
+from fastapi import FastAPI
+
+from .DenseIndexingService import DenseIndexingService
+
+
+class NumpyService(DenseIndexingService):
+    """
+    Dense retrieval served in-process by the app-scoped NumpyVectorStore, without any external search engine.
+    """
+
+    def __init__(self, app: FastAPI):
+        super().__init__(app)
+        self.vector_store = app.vector_store
+
+    async def index(self, file_id: str, file_content: str, embedding: Optional[list[float]] = None) -> bool:
+        """
+        Add a document to the vector store.
+
+        :param file_id: The ID of the file to index.
+        :param file_content: The content of the file.
+        :param embedding: A precomputed embedding of the content, the content is encoded only if it is missing.
+        :return: True if the document was indexed successfully, False otherwise.
+        """
+        if self.chunker is not None:
+            return len(await self.index_passages([{"file_id": file_id, "content": file_content}])) > 0
+
+        if embedding is None:
+            embedding = await self.embedding_worker.encode(file_content)
+
+        await asyncio.to_thread(self.vector_store.add, [file_id], [embedding])
+        return True
+
+    async def index_many(self, documents: list[dict]) -> list[str]:
+        """
+        Add a batch of documents to the vector store with a single append.
+
+        :param documents: A list of dicts with the keys "file_id", "content" and "embedding".
+        :return: The file_ids of the documents indexed successfully.
+        """
+        if self.chunker is not None:
+            return await self.index_passages(documents)
+
+        missing = [document for document in documents if document.get("embedding") is None]
+        if missing:
+            vectors = await self.embedding_worker.encode_many([document["content"] for document in missing])
+            for document, vector in zip(missing, vectors):
+                document["embedding"] = vector
+
+        file_ids = [document["file_id"] for document in documents]
+        await asyncio.to_thread(self.vector_store.add, file_ids, [document["embedding"] for document in documents])
+        return file_ids
+
+    async def add_passages(self, passages: list[dict]) -> list[str]:
+        """
+        Append a batch of passage vectors to the vector store, stored under their passage IDs.
+
+        :param passages: A list of dicts with the keys "passage_id", "file_id" and "embedding".
+        :return: The passage_ids written successfully.
+        """
+        passage_ids = [passage["passage_id"] for passage in passages]
+        await asyncio.to_thread(self.vector_store.add, passage_ids, [passage["embedding"] for passage in passages])
+        return passage_ids
+
+    async def delete_passages(self, file_ids: list[str]) -> None:
+        """
+        Remove the vectors of the given documents, and of their passages, from the vector store.
+
+        :param file_ids: The IDs of the documents.
+        """
+        file_ids = set(file_ids)
+        stored_ids = self.vector_store.ids_where(lambda stored_id: self.parent_id(stored_id) in file_ids)
+        if stored_ids:
+            await asyncio.to_thread(self.vector_store.delete, stored_ids)
+
+    async def delete(self, file_id: str) -> bool:
+        """
+        Remove the vector of a document, or the vectors of its passages, from the vector store.
+
+        :param file_id: The ID of the document.
+        :return: True if vectors were removed, False otherwise.
+        """
+        stored_ids = [file_id]
+        if self.chunker is not None:
+            stored_ids += self.vector_store.ids_with_prefix(self.passage_id(file_id, ""))
+
+        return await asyncio.to_thread(self.vector_store.delete, stored_ids) > 0
+
+    async def knn(self, query_vector: np.ndarray, k: int) -> list[dict]:
+        """
+        Score the stored vectors with one matrix product and keep the top k.
+
+        :param query_vector: The query embedding.
+        :param k: The number of documents to retrieve.
+        :return: A list of dicts with the keys "file_id", "score" and "embedding", sorted by descending score.
+        """
+        hits = await asyncio.to_thread(self.vector_store.search, query_vector, k)
+
+        return [
+            {
+                "file_id": self.parent_id(stored_id),
+                "score": (1 + similarity) / 2,  # same scale as the Elasticsearch cosine score
+                "embedding": vector,
+            }
+            for stored_id, similarity, vector in hits
+        ]
@@ -0,0 +1,402 @@
+import json
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+from .IndexLock import IndexLock
+
+
+class NumpyVectorStore:
+    """
+    An in-process vector index kept in a memory-mapped float32 matrix on disk.
+
+    The vectors are L2 normalized on insert, so a single matrix product gives the cosine similarity
+    of the query with every document. Appends write new rows in place and grow the file geometrically,
+    the matrix is never rebuilt. With ivf_lists > 0 the rows are also partitioned by a coarse k-means
+    (IVF) once enough vectors are stored, and a search only scores the ivf_probes closest partitions.
+    Deleted vectors are zeroed in place and skipped by the searches, their rows are reused if the ID is added again.
+
+    The uvicorn workers can share the index directory: the writes are serialized by a lock file, and a process
+    reloads the changes committed by the others, signalled by a new meta.json, before its next read or write.
+
+    Files in the index directory:
+        vectors.f32      the matrix, capacity x dims float32 values
+        lists.i32        the IVF partition of each row, -1 for the deleted rows
+        ids.txt          the file_id of each row, one per line, append only
+        centroids.npy    the IVF centroids
+        meta.json        dims, count and capacity, replaced last by every write
+        writer.lock      held by the process writing to the index
+    """
+
+    INITIAL_CAPACITY = 1024
+    MIN_POINTS_PER_LIST = 39  # vectors needed per partition before the k-means is trained
+    KMEANS_ITERATIONS = 10
+    KMEANS_SAMPLE_PER_LIST = 256
+
+    def __init__(self, index_dir: str, ivf_lists: int = 0, ivf_probes: int = 8):
+        """
+        :param index_dir: The directory holding the index files, created if missing.
+        :param ivf_lists: The number of IVF partitions, 0 keeps the search exact.
+        :param ivf_probes: The number of partitions scored per search.
+        """
+        self.index_dir = index_dir
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        os.makedirs(index_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._writer_lock = IndexLock(self._path("writer.lock"))
+        self.dims: Optional[int] = None
+        self.count = 0
+        self.capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._lists: Optional[np.memmap] = None
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._members: list[list[int]] = []
+        self._deleted: set[int] = set()
+        self._ids_size = 0  # bytes of ids.txt holding the committed ids
+        self._meta_signature = None
+        self._centroids_signature = None
+
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _signature(self, name: str) -> Optional[tuple[int, int, int]]:
+        try:
+            stat = os.stat(self._path(name))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self) -> None:
+        # must be called with the lock held, reloads the changes committed by the other processes
+        signature = self._signature("meta.json")
+        if signature is None or signature == self._meta_signature:
+            return
+
+        with open(self._path("meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(self._path("ids.txt"), encoding="utf-8") as f:
+            ids = f.read().splitlines()
+
+        if meta["dims"] != self.dims or meta["capacity"] != self.capacity:
+            self.dims = meta["dims"]
+            self.capacity = meta["capacity"]
+            self._open_files()
+
+        # rows written after the last meta update are ignored, their ids were not committed
+        count = min(meta["count"], len(ids))
+        for row in range(self.count, count):
+            self._rows[ids[row]] = row
+        self._ids = ids[:count]
+        self._ids_size = sum(len(file_id.encode("utf-8")) + 1 for file_id in self._ids)
+        self.count = count
+        self._deleted = set(np.flatnonzero(np.asarray(self._lists[:count]) < 0).tolist())
+
+        centroids_signature = self._signature("centroids.npy")
+        if centroids_signature != self._centroids_signature:
+            self._centroids = np.load(self._path("centroids.npy")) if centroids_signature is not None else None
+            self._centroids_signature = centroids_signature
+        if self._centroids is not None:
+            self._rebuild_members()
+
+        self._meta_signature = signature
+
+    def _load(self) -> None:
+        with self._lock, self._writer_lock:
+            self._refresh()
+            if self.count == 0:
+                return
+
+            # the indexes written before the deleted rows were marked in lists.i32 only have them zeroed
+            zeroed = []
+            for start in range(0, self.count, 65536):
+                chunk = np.asarray(self._vectors[start:min(start + 65536, self.count)])
+                zeroed.extend((start + np.flatnonzero(~chunk.any(axis=1))).tolist())
+            unmarked = [row for row in zeroed if row not in self._deleted]
+            if unmarked:
+                self._mark_deleted(unmarked)
+                self._write_meta()
+
+    def _open_files(self) -> None:
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r+",
+                                  shape=(self.capacity, self.dims))
+        self._lists = np.memmap(self._path("lists.i32"), dtype=np.int32, mode="r+",
+                                shape=(self.capacity,))
+
+    def _grow(self, required: int) -> None:
+        new_capacity = max(self.capacity, self.INITIAL_CAPACITY)
+        while new_capacity < required:
+            new_capacity *= 2
+        if new_capacity == self.capacity:
+            return
+
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._lists.flush()
+
+        # extending the files keeps the existing rows in place
+        for name, row_bytes in (("vectors.f32", self.dims * 4), ("lists.i32", 4)):
+            with open(self._path(name), "ab") as f:
+                f.truncate(new_capacity * row_bytes)
+
+        self.capacity = new_capacity
+        self._open_files()
+
+    def _write_meta(self) -> None:
+        # must be called with both locks held, commits the write for the other processes
+        meta = {"dims": self.dims, "count": self.count, "capacity": self.capacity}
+        tmp_path = self._path("meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path("meta.json"))
+        self._meta_signature = self._signature("meta.json")
+
+    def _mark_deleted(self, rows: list[int]) -> None:
+        # must be called with both locks held
+        if self._centroids is not None:
+            for row in rows:
+                self._members[int(self._lists[row])].remove(row)
+        self._lists[np.asarray(rows)] = -1
+        self._lists.flush()
+        self._deleted.update(rows)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self.count - len(self._deleted)
+
+    def __contains__(self, file_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            row = self._rows.get(file_id)
+            return row is not None and row not in self._deleted
+
+    def add(self, file_ids: list[str], embeddings) -> int:
+        """
+        Add or replace the vectors of the given documents.
+
+        :param file_ids: The IDs of the documents.
+        :param embeddings: The embeddings of the documents, one row per ID.
+        :return: The number of vectors written.
+        """
+        if not file_ids:
+            return 0
+
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32).reshape(len(file_ids), -1))
+
+        with self._lock, self._writer_lock:
+            self._refresh()
+            if self.dims is None:
+                self.dims = vectors.shape[1]
+            elif vectors.shape[1] != self.dims:
+                raise ValueError(f"Expected vectors of {self.dims} dimensions, got {vectors.shape[1]}")
+
+            new_ids = []
+            rows = []
+            for file_id in file_ids:
+                row = self._rows.get(file_id)
+                if row is None:
+                    row = self.count + len(new_ids)
+                    self._rows[file_id] = row
+                    new_ids.append(file_id)
+                rows.append(row)
+
+            self._grow(self.count + len(new_ids))
+            self._deleted.difference_update(rows)
+            rows = np.asarray(rows)
+            self._vectors[rows] = vectors
+            self._vectors.flush()
+
+            if self._centroids is not None:
+                self._assign(rows, vectors)
+            else:
+                self._lists[rows] = 0
+                self._lists.flush()
+
+            # written after the committed ids, dropping the ones of an add interrupted before its meta update
+            ids_data = "".join(f"{file_id}\n" for file_id in new_ids).encode("utf-8")
+            with open(self._path("ids.txt"), "r+b" if os.path.exists(self._path("ids.txt")) else "wb") as f:
+                f.seek(self._ids_size)
+                f.truncate()
+                f.write(ids_data)
+            self._ids.extend(new_ids)
+            self._ids_size += len(ids_data)
+            self.count += len(new_ids)
+            self._write_meta()
+
+            if self._centroids is None and self.ivf_lists > 0 \
+                    and self.count >= self.ivf_lists * self.MIN_POINTS_PER_LIST:
+                self.train()
+
+        return len(file_ids)
+
+    def delete(self, file_ids: list[str]) -> int:
+        """
+        Remove the vectors of the given IDs.
+
+        :param file_ids: The IDs of the vectors, unknown IDs are ignored.
+        :return: The number of vectors removed.
+        """
+        with self._lock, self._writer_lock:
+            self._refresh()
+            rows = [self._rows[file_id] for file_id in file_ids
+                    if file_id in self._rows and self._rows[file_id] not in self._deleted]
+            if not rows:
+                return 0
+
+            self._vectors[np.asarray(rows)] = 0
+            self._vectors.flush()
+            self._mark_deleted(rows)
+            self._write_meta()
+            return len(rows)
+
+    def ids_with_prefix(self, prefix: str) -> list[str]:
+        """
+        :param prefix: The start of the IDs, such as a file_id followed by the passage separator.
+        :return: The stored IDs starting with it.
+        """
+        with self._lock:
+            self._refresh()
+            return [stored_id for stored_id in self._rows
+                    if stored_id.startswith(prefix) and self._rows[stored_id] not in self._deleted]
+
+    def ids_where(self, predicate) -> list[str]:
+        """
+        :param predicate: A function of a stored ID, such as a test of its parent file_id.
+        :return: The stored IDs for which it is true.
+        """
+        with self._lock:
+            self._refresh()
+            return [stored_id for stored_id in self._rows
+                    if self._rows[stored_id] not in self._deleted and predicate(stored_id)]
+
+    def _assign(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        # must be called with both locks held
+        new_lists = np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+        for row, list_id in zip(rows.tolist(), new_lists.tolist()):
+            old_list = int(self._lists[row]) if row < self.count else -1
+            if old_list >= 0:
+                if old_list != list_id:
+                    self._members[old_list].remove(row)
+                    self._members[list_id].append(row)
+            else:
+                self._members[list_id].append(row)
+        self._lists[rows] = new_lists
+        self._lists.flush()
+
+    def _rebuild_members(self) -> None:
+        # the deleted rows sort before partition 0 and belong to none
+        lists = np.asarray(self._lists[:self.count])
+        order = np.argsort(lists, kind="stable")
+        boundaries = np.searchsorted(lists[order], np.arange(len(self._centroids) + 1))
+        self._members = [order[boundaries[i]:boundaries[i + 1]].tolist() for i in range(len(self._centroids))]
+
+    def train(self) -> None:
+        """
+        Train the IVF partitions with a spherical k-means over a sample of the stored vectors,
+        then assign every vector to its closest partition.
+        """
+        with self._lock, self._writer_lock:
+            self._refresh()
+            n_lists = min(self.ivf_lists, self.count)
+            if n_lists <= 0:
+                return
+
+            vectors = self._vectors[:self.count]
+            rng = np.random.default_rng(0)
+            sample_size = min(self.count, n_lists * self.KMEANS_SAMPLE_PER_LIST)
+            sample = np.asarray(vectors[rng.choice(self.count, sample_size, replace=False)])
+
+            centroids = sample[rng.choice(sample_size, n_lists, replace=False)]
+            for _ in range(self.KMEANS_ITERATIONS):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                empty = ~sums.any(axis=1)
+                sums[empty] = centroids[empty]  # keep the previous centroid of an empty partition
+                centroids = self._normalize(sums)
+
+            for start in range(0, self.count, 65536):
+                chunk = np.asarray(vectors[start:start + 65536])
+                self._lists[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+            if self._deleted:
+                self._lists[np.fromiter(self._deleted, dtype=np.int64)] = -1
+            self._lists.flush()
+
+            tmp_path = self._path("centroids.npy.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, centroids)
+            os.replace(tmp_path, self._path("centroids.npy"))
+            self._centroids = centroids
+            self._centroids_signature = self._signature("centroids.npy")
+            self._rebuild_members()
+            self._write_meta()
+
+    def search(self, query_vector, k: int) -> list[tuple[str, float, np.ndarray]]:
+        """
+        Find the k stored vectors with the highest cosine similarity to the query.
+
+        :param query_vector: The query embedding.
+        :param k: The number of results.
+        :return: A list of (file_id, cosine similarity, vector) tuples, sorted by descending similarity.
+        """
+        with self._lock:
+            self._refresh()
+            count = self.count
+            if count == 0 or k <= 0:
+                return []
+            vectors = self._vectors
+            ids = self._ids
+            deleted = np.fromiter(self._deleted, dtype=np.int64) if self._deleted else None
+            candidates = None
+            if self._centroids is not None:
+                probes = min(self.ivf_probes, len(self._centroids))
+                query = np.asarray(query_vector, dtype=np.float32)
+                closest_lists = np.argpartition(-(self._centroids @ query), probes - 1)[:probes]
+                candidates = np.fromiter(
+                    (row for list_id in closest_lists for row in self._members[list_id]),
+                    dtype=np.int64
+                )
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+
+        if candidates is None:
+            scores = vectors[:count] @ query
+            rows = np.arange(count)
+        else:
+            candidates.sort()  # sequential reads from the memory map
+            scores = vectors[candidates] @ query
+            rows = candidates
+
+        if deleted is not None:
+            alive = ~np.isin(rows, deleted)
+            scores = scores[alive]
+            rows = rows[alive]
+
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(ids[rows[i]], float(scores[i]), np.asarray(vectors[rows[i]])) for i in top]
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._lists.flush()
@@ -0,0 +1,51 @@
+class RankFusion:
+    """
+    Merge the ranked result lists of several retrieval branches into a single ranking.
+    Every result list holds dicts with the keys "file_id" and "score", sorted by descending score.
+    """
+
+    @staticmethod
+    def reciprocal_rank(result_lists: list[list[dict]], k: int = 60) -> list[dict]:
+        """
+        Reciprocal rank fusion: each document scores the sum of 1 / (k + rank) over the lists it appears in.
+        Only the ranks are used, so the branches do not need comparable scores.
+
+        :param result_lists: The ranked results of each branch.
+        :param k: Dampens the weight of the top ranks.
+        :return: The fused results, sorted by descending fused score.
+        """
+        scores = {}
+        for results in result_lists:
+            for rank, result in enumerate(results, start=1):
+                scores[result["file_id"]] = scores.get(result["file_id"], 0) + 1 / (k + rank)
+
+        return [
+            {"file_id": file_id, "score": score}
+            for file_id, score in sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        ]
+
+    @staticmethod
+    def weighted_score(result_lists: list[list[dict]], weights: list[float]) -> list[dict]:
+        """
+        Weighted score fusion: the scores of each list are min-max normalized to [0, 1],
+        then each document scores the weighted sum of its normalized scores.
+
+        :param result_lists: The ranked results of each branch.
+        :param weights: The weight of each branch.
+        :return: The fused results, sorted by descending fused score.
+        """
+        scores = {}
+        for results, weight in zip(result_lists, weights):
+            if not results:
+                continue
+
+            branch_scores = [result["score"] for result in results]
+            low, high = min(branch_scores), max(branch_scores)
+            for result in results:
+                normalized = (result["score"] - low) / (high - low) if high > low else 1.0
+                scores[result["file_id"]] = scores.get(result["file_id"], 0) + weight * normalized
+
+        return [
+            {"file_id": file_id, "score": score}
+            for file_id, score in sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        ]
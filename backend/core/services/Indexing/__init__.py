@@ -1,3 +1,8 @@
+from .BM25Index import BM25Index
+from .DenseIndexingService import DenseIndexingService
 from .ElasticSearchService import ElasticSearchService
 from .IndexingService import IndexingService
-from .PyTerrierService import PyTerrierService
+from .NumpyService import NumpyService
+from .NumpyVectorStore import NumpyVectorStore
+from .BM25Service import BM25Service
+from .RankFusion import RankFusion
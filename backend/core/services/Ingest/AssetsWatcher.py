@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .FileIngestService import FileIngestService
+from ..Directory import DirectoryService
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class AssetsWatcher:
+    """
+    Ingests the files created or modified in the assets folder, and removes the deleted ones, as they change.
+
+    The changes come from inotify through the watchfiles package when it is installed, otherwise the folder is
+    polled. They are debounced: a set of changes is ingested once no new change arrived for the debounce delay,
+    so a file still being copied is read once it is complete. The FileIngestService skips the files whose manifest
+    entry shows they did not change, such as the uploads, which claim their entry before the file gets its name.
+
+    Only one process per host watches the folder, the one holding the lock file, the other workers wait for it.
+    The watcher catches up with the changes made while it was not running by starting an index_all job,
+    and while an index_all job runs the changes are held until it ends.
+    """
+
+    LOCK_FILE = "assets_watcher.lock"
+    LOCK_RETRY_SECONDS = 10
+
+    def __init__(self, file_ingest_service: FileIngestService, indexing_job_runner, batch_size: int,
+                 debounce_ms: float, poll_interval: float, polling: bool = False):
+        """
+        :param file_ingest_service: The app-scoped service ingesting the files against the manifest.
+        :param indexing_job_runner: The app-scoped IndexingJobRunner.
+        :param batch_size: The number of files ingested together.
+        :param debounce_ms: How long the folder must stay quiet before the pending changes are ingested.
+        :param poll_interval: Seconds between two scans of the folder when it is polled.
+        :param polling: Poll the folder even if watchfiles is installed, inotify misses the changes made
+                        through network filesystems and some container volume mounts.
+        """
+        self.file_ingest_service = file_ingest_service
+        self.indexing_job_runner = indexing_job_runner
+        self.batch_size = batch_size
+        self.debounce_seconds = debounce_ms / 1000
+        self.poll_interval = poll_interval
+        self.polling = polling
+        self._lock_file = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Start watching in the background, must be called from the event loop.
+        """
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._lock_file is not None:
+            self._lock_file.close()  # releases the lock
+            self._lock_file = None
+
+    def _acquire_lock(self) -> bool:
+        os.makedirs(DirectoryService.index_dir, exist_ok=True)
+        lock_file = open(os.path.join(DirectoryService.index_dir, self.LOCK_FILE), "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    @staticmethod
+    def _snapshot() -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        with os.scandir(DirectoryService.files_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    async def _poll(self, queue: asyncio.Queue) -> None:
+        snapshot = await asyncio.to_thread(self._snapshot)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = await asyncio.to_thread(self._snapshot)
+            changed = {name for name in current.keys() | snapshot.keys() if current.get(name) != snapshot.get(name)}
+            snapshot = current
+            if changed:
+                queue.put_nowait(changed)
+
+    async def _watch(self, queue: asyncio.Queue) -> None:
+        from watchfiles import awatch
+
+        async for changes in awatch(DirectoryService.files_dir, recursive=False, debounce=50):
+            queue.put_nowait({os.path.basename(path) for _, path in changes})
+
+    def _produce(self, queue: asyncio.Queue) -> asyncio.Task:
+        if not self.polling:
+            try:
+                import watchfiles  # noqa: F401
+                logger.info("Assets watcher: watching with inotify")
+                return asyncio.create_task(self._watch(queue))
+            except ImportError:
+                pass
+
+        logger.info(f"Assets watcher: polling every {self.poll_interval}s")
+        return asyncio.create_task(self._poll(queue))
+
+    async def _flush(self, file_names: set[str]) -> set[str]:
+        """
+        Ingest the changed files and remove the deleted ones.
+
+        :return: The file names to retry later.
+        """
+        try:
+            if await self.indexing_job_runner.running_job() is not None:
+                return file_names
+
+            present = sorted(file_name for file_name in file_names
+                             if os.path.isfile(DirectoryService.get_file_path(file_name)))
+            missing = sorted(file_names.difference(present))
+
+            for batch_start in range(0, len(present), self.batch_size):
+                ingested = await self.file_ingest_service.ingest(present[batch_start:batch_start + self.batch_size])
+                for failure in ingested["failures"]:
+                    logger.warning(f"Assets watcher: {failure['file_name']} failed: {failure['error']}")
+                if ingested["indexed"] or ingested["replaced"]:
+                    logger.info(f"Assets watcher: {ingested['indexed']} files indexed, "
+                                f"{ingested['replaced']} previous versions replaced")
+
+            if missing:
+                removed_count = await self.file_ingest_service.remove(missing)
+                if removed_count:
+                    logger.info(f"Assets watcher: {removed_count} deleted files removed")
+        except Exception as e:
+            logger.error(f"Assets watcher: ingesting the changes failed, they will be retried: {str(e)}")
+            return file_names
+
+        return set()
+
+    async def _run(self) -> None:
+        while not self._acquire_lock():
+            await asyncio.sleep(self.LOCK_RETRY_SECONDS)
+
+        try:
+            await self.indexing_job_runner.submit()
+        except Exception as e:
+            logger.error(f"Assets watcher: starting the catch-up index_all failed: {str(e)}")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        producer = self._produce(queue)
+        pending: set[str] = set()
+        try:
+            while True:
+                try:
+                    file_names = await asyncio.wait_for(
+                        queue.get(), timeout=self.debounce_seconds if pending else None
+                    )
+                    # the uploads being streamed are ingested by their own request
+                    pending.update(file_name for file_name in file_names if not file_name.endswith(".part"))
+                except asyncio.TimeoutError:
+                    pending = await self._flush(pending)
+        finally:
+            producer.cancel()
@@ -0,0 +1,255 @@
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from pymongo import UpdateOne
+
+from ..Directory import DirectoryService
+from ..Processing import ProcessingPool, tasks
+from ...models import Document, FileManifestEntry
+from ...models.enums import ResponseEnum
+
+
+class FileIngestService:
+    """
+    Ingests the files of the assets folder incrementally, against a manifest of their size, modification time
+    and raw hash saved in the database:
+        - a file whose size and modification time match its entry is skipped without being read,
+        - a file whose bytes hash to its entry's raw hash is skipped without being parsed,
+        - the other files are parsed, cleaned, stored and indexed, and the document of a changed file's previous
+          version is deleted once no other file produces it. A file whose document the index did not accept
+          gets no entry, so the next ingest tries it again,
+        - the entries of the files that disappeared are removed along with their documents.
+    """
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, processing_pool: ProcessingPool, document_repository):
+        """
+        :param processing_pool: The app-scoped pool parsing and cleaning the files.
+        :param document_repository: The app-scoped DocumentRepository storing and indexing the documents.
+        """
+        self.processing_pool = processing_pool
+        self.document_repository = document_repository
+
+    @staticmethod
+    def _stat(file_name: str) -> Optional[os.stat_result]:
+        try:
+            return os.stat(DirectoryService.get_file_path(file_name))
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def raw_hash(cls, file_name: str) -> str:
+        """
+        :param file_name: The name of a file of the assets folder.
+        :return: The sha256 of its bytes, the same as the raw_hash of its upload.
+        """
+        file_hash = hashlib.sha256()
+        with open(DirectoryService.get_file_path(file_name), "rb") as f:
+            while chunk := f.read(cls.HASH_CHUNK_SIZE):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def _describe(error: Exception) -> str:
+        if isinstance(error, HTTPException) and isinstance(error.detail, dict):
+            return error.detail.get("message", str(error.detail))
+        return str(error) or type(error).__name__
+
+    @staticmethod
+    def _entry_update(file_name: str, stat: os.stat_result, raw_hash: str,
+                      hashed_content: Optional[str]) -> UpdateOne:
+        return UpdateOne(
+            {"file_name": file_name},
+            {"$set": {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "raw_hash": raw_hash,
+                "hashed_content": hashed_content,
+                "ingested_at": datetime.now(timezone.utc),
+            }},
+            upsert=True
+        )
+
+    async def _retire(self, hashed_contents: set[str]) -> int:
+        # a document is only deleted when no remaining file produces it
+        retired_count = 0
+        for hashed_content in hashed_contents:
+            if await FileManifestEntry.find_one({"hashed_content": hashed_content}) is None:
+                retired_count += await self.document_repository.delete_by_key(hashed_content)
+        return retired_count
+
+    async def claim(self, file_name: str, stat: os.stat_result, raw_hash: str) -> None:
+        """
+        Mark a file about to be ingested outside of this service, such as an upload, as unchanged,
+        so the assets watcher and index_all do not parse it at the same time.
+        Must be called before the file appears under its name, followed by record or release.
+
+        :param file_name: The name the file gets in the assets folder.
+        :param stat: The stat of the file, kept by the rename that gives it its name.
+        :param raw_hash: The sha256 of its bytes.
+        """
+        await FileManifestEntry.get_motor_collection().update_one(
+            {"file_name": file_name},
+            {
+                "$set": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "raw_hash": raw_hash},
+                "$setOnInsert": {"hashed_content": None, "ingested_at": datetime.now(timezone.utc)},
+            },
+            upsert=True
+        )
+
+    async def release(self, file_name: str) -> None:
+        """
+        Give up the claim of a file that could not be ingested, the next ingest parses it.
+
+        :param file_name: The name of the file in the assets folder.
+        """
+        await FileManifestEntry.get_motor_collection().update_one(
+            {"file_name": file_name},
+            {"$set": {"size": -1, "raw_hash": ""}}
+        )
+
+    async def record(self, file_name: str, raw_hash: str, hashed_content: str) -> None:
+        """
+        Save the manifest entry of a file ingested outside of this service, such as an upload,
+        the document of the file's previous version is deleted once no other file produces it.
+
+        :param file_name: The name of the file in the assets folder.
+        :param raw_hash: The sha256 of its bytes.
+        :param hashed_content: The key of the document it was indexed as.
+        """
+        stat = self._stat(file_name)
+        if stat is None:
+            return
+
+        entry = await FileManifestEntry.find_one({"file_name": file_name})
+        await FileManifestEntry.get_motor_collection().bulk_write(
+            [self._entry_update(file_name, stat, raw_hash, hashed_content)]
+        )
+        if entry is not None and entry.hashed_content and entry.hashed_content != hashed_content:
+            await self._retire({entry.hashed_content})
+
+    async def ingest(self, file_names: list[str]) -> dict:
+        """
+        Ingest the new and changed files among the given ones.
+
+        :param file_names: The names of the files in the assets folder, processed together.
+        :return: The counts of "indexed", "already_indexed" (same content as a stored document), "unchanged"
+                 and "replaced" files, and the "failures" as {"file_name", "error"} dicts.
+        """
+        entries = {
+            entry.file_name: entry
+            for entry in await FileManifestEntry.find({"file_name": {"$in": file_names}}).to_list()
+        }
+
+        updates = []
+        changed = []
+        unchanged_count = 0
+        for file_name in file_names:
+            stat = self._stat(file_name)
+            if stat is None:
+                continue  # deleted since it was listed, its entry is removed with the missing files
+
+            entry = entries.get(file_name)
+            if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                unchanged_count += 1
+                continue
+
+            raw_hash = await asyncio.to_thread(self.raw_hash, file_name)
+            if entry is not None and entry.raw_hash == raw_hash:
+                # touched or copied over without changes, the entry gets the new modification time
+                unchanged_count += 1
+                updates.append(self._entry_update(file_name, stat, raw_hash, entry.hashed_content))
+                continue
+
+            changed.append((file_name, stat, raw_hash))
+
+        # a file that fails is reported, the others are still indexed
+        processed_contents = await asyncio.gather(*[
+            self.processing_pool.run(tasks.parse_and_clean, file_name, True) for file_name, _, _ in changed
+        ], return_exceptions=True)
+
+        failures = []
+        batch = []
+        parsed = []
+        for (file_name, stat, raw_hash), processed_content in zip(changed, processed_contents):
+            if isinstance(processed_content, Exception):
+                failures.append({"file_name": file_name, "error": self._describe(processed_content)})
+                continue
+
+            hashed_content = self.document_repository.hash_content(processed_content)
+            batch.append({"file_title": file_name, "file_content": processed_content, "raw_hash": raw_hash})
+            parsed.append((file_name, stat, raw_hash, hashed_content))
+
+        created_documents = await self.document_repository.create_many(batch) if batch else []
+
+        # a file gets its manifest entry once its document is in the main index, the others are parsed again
+        # by the next ingest, a document stored but not indexed is then indexed again by create_many
+        indexed_contents = set(await Document.distinct(
+            "hashed_content",
+            {
+                "hashed_content": {"$in": [hashed_content for _, _, _, hashed_content in parsed]},
+                "indexed": {"$ne": False},
+            }
+        )) if parsed else set()
+
+        previous_contents = set()
+        indexed_files_count = 0
+        for file_name, stat, raw_hash, hashed_content in parsed:
+            if hashed_content not in indexed_contents:
+                failures.append({"file_name": file_name, "error": ResponseEnum.INDEXING_FAILED.value})
+                continue
+
+            indexed_files_count += 1
+            updates.append(self._entry_update(file_name, stat, raw_hash, hashed_content))
+            entry = entries.get(file_name)
+            if entry is not None and entry.hashed_content and entry.hashed_content != hashed_content:
+                previous_contents.add(entry.hashed_content)
+
+        if updates:
+            await FileManifestEntry.get_motor_collection().bulk_write(updates, ordered=False)
+
+        return {
+            "indexed": len(created_documents),
+            "already_indexed": indexed_files_count - len(created_documents),
+            "unchanged": unchanged_count,
+            "replaced": await self._retire(previous_contents),
+            "failures": failures,
+        }
+
+    async def remove(self, file_names: list[str]) -> int:
+        """
+        Forget deleted files, their documents are deleted unless another file produces them.
+
+        :param file_names: The names of the deleted files.
+        :return: The number of manifest entries removed.
+        """
+        entries = await FileManifestEntry.find({"file_name": {"$in": file_names}}).to_list()
+        if not entries:
+            return 0
+
+        await FileManifestEntry.find({"file_name": {"$in": [entry.file_name for entry in entries]}}).delete()
+        await self._retire({entry.hashed_content for entry in entries if entry.hashed_content})
+        return len(entries)
+
+    async def remove_missing(self, file_names: list[str], since: Optional[datetime] = None) -> int:
+        """
+        Forget the files of the manifest that are no longer in the assets folder.
+        The listing can be older than the manifest, so a file is only forgotten if it is still missing now
+        and its entry was not written after the listing, such as the claim of an upload not yet renamed.
+
+        :param file_names: The names of the files in the assets folder when they were listed.
+        :param since: When the files were listed, None if the listing is current.
+        :return: The number of manifest entries removed.
+        """
+        known_files = await FileManifestEntry.distinct(
+            "file_name",
+            {"ingested_at": {"$lt": since}} if since is not None else None
+        )
+        present = set(file_names)
+        return await self.remove([file_name for file_name in known_files
+                                  if file_name not in present and self._stat(file_name) is None])
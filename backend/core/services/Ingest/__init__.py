@@ -0,0 +1,2 @@
+from .AssetsWatcher import AssetsWatcher
+from .FileIngestService import FileIngestService
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from ...models import EvaluationJob
+from ...models.enums import JobStatusEnum
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class EvaluationJobRunner:
+    """
+    Runs the evaluations as background jobs, so a run over the whole dataset does not hold an HTTP request open.
+
+    The job document is saved when the job starts and when it ends, with the metrics or the error.
+    An evaluation is not resumed: the jobs of a process that stops are marked failed, and submitted again.
+    """
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._jobs: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    async def submit(self, parameters: dict, evaluate: Callable[[], Awaitable[dict]]) -> EvaluationJob:
+        """
+        Start an evaluation job, must be called from the event loop.
+
+        :param parameters: The parameters of the evaluation, saved with the job.
+        :param evaluate: Runs the evaluation and returns its result, JSON serializable.
+        :return: The job.
+        """
+        job = EvaluationJob(parameters=parameters, worker_id=self.worker_id)
+        await job.insert()
+
+        job_id = str(job.id)
+        self._jobs[job_id] = asyncio.create_task(self._run(job, evaluate))
+        self._jobs[job_id].add_done_callback(lambda _: self._jobs.pop(job_id, None))
+        return job
+
+    async def _run(self, job: EvaluationJob, evaluate: Callable[[], Awaitable[dict]]) -> None:
+        try:
+            job.result = await evaluate()
+            job.status = JobStatusEnum.Completed.value
+        except asyncio.CancelledError:
+            job.status = JobStatusEnum.Failed.value
+            job.error = "interrupted"
+        except Exception as e:
+            logger.error(f"Evaluation job {job.id} failed: {str(e)}")
+            job.status = JobStatusEnum.Failed.value
+            job.error = str(e)
+
+        job.finished_at = self._now()
+        try:
+            await job.save()
+        except Exception as e:
+            logger.error(f"Evaluation job {job.id}: saving the result failed: {str(e)}")
+
+    async def stop(self) -> None:
+        """
+        Cancel the jobs of this process, they are saved as failed.
+        """
+        tasks_to_cancel = list(self._jobs.values())
+        for task in tasks_to_cancel:
+            task.cancel()
+        await asyncio.gather(*tasks_to_cancel, return_exceptions=True)
+
+        # a job cancelled before its task started was not saved
+        await EvaluationJob.get_motor_collection().update_many(
+            {"status": JobStatusEnum.Running.value, "worker_id": self.worker_id},
+            {"$set": {"status": JobStatusEnum.Failed.value, "error": "interrupted", "finished_at": self._now()}}
+        )
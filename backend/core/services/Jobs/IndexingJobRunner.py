@@ -0,0 +1,213 @@
+import asyncio
+import bisect
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..Directory import DirectoryService
+from ..Ingest import FileIngestService
+from ...models import IndexingJob
+from ...models.enums import JobStatusEnum
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class JobOwnershipLost(Exception):
+    """Raised when another process took the job over, after this one missed its heartbeats."""
+
+
+class IndexingJobRunner:
+    """
+    Runs index_all as a background job, one at a time across the uvicorn workers.
+
+    The files of the assets folder are processed in name order, in batches of INDEXING_BATCH_SIZE,
+    by the FileIngestService, which skips the files that did not change since they were last ingested,
+    and the job document is saved after every batch. The files that disappeared are removed at the end.
+
+    While a job runs its process refreshes the job's heartbeat, a job whose heartbeat went stale was interrupted
+    (crash, restart, deploy) and is claimed by the first worker to notice, which resumes it after the last saved
+    batch. A batch interrupted halfway is processed again, its files already ingested are skipped by the manifest.
+    """
+
+    def __init__(self, file_ingest_service: FileIngestService, batch_size: int,
+                 heartbeat_interval: float, max_reported_failures: int):
+        """
+        :param file_ingest_service: The app-scoped service ingesting the files against the manifest.
+        :param batch_size: The number of files processed and saved per batch.
+        :param heartbeat_interval: Seconds between the heartbeats of a running job,
+                                   a job is resumed by another process after three missed heartbeats.
+        :param max_reported_failures: The number of failed files listed in the job's progress.
+        """
+        self.file_ingest_service = file_ingest_service
+        self.batch_size = batch_size
+        self.heartbeat_interval = heartbeat_interval
+        self.max_reported_failures = max_reported_failures
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._jobs: dict[str, asyncio.Task] = {}
+        self._recovery_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def start(self) -> None:
+        """
+        Start looking for interrupted jobs to resume, must be called from the event loop.
+        """
+        self._recovery_task = asyncio.create_task(self._recover())
+
+    async def stop(self) -> None:
+        """
+        Cancel the jobs of this process, they are marked stale so the next worker to start resumes them right away.
+        """
+        tasks_to_cancel = [task for task in [self._recovery_task, *self._jobs.values()] if task is not None]
+        for task in tasks_to_cancel:
+            task.cancel()
+        await asyncio.gather(*tasks_to_cancel, return_exceptions=True)
+
+        await IndexingJob.get_motor_collection().update_many(
+            {"status": JobStatusEnum.Running.value, "worker_id": self.worker_id},
+            {"$set": {"heartbeat_at": datetime.fromtimestamp(0, timezone.utc)}}
+        )
+
+    @staticmethod
+    async def running_job() -> Optional[IndexingJob]:
+        """
+        :return: The index_all job running in any worker, None if there is none.
+        """
+        return await IndexingJob.find_one({"status": JobStatusEnum.Running.value})
+
+    async def submit(self) -> tuple[IndexingJob, bool]:
+        """
+        Start an index_all job, unless one is already running.
+
+        :return: The job, and whether it was created by this call.
+        """
+        while True:
+            running_job = await self.running_job()
+            if running_job is not None:
+                return running_job, False
+
+            job = IndexingJob(worker_id=self.worker_id)
+            try:
+                # the unique index on the running jobs makes the insert fail if another worker started one meanwhile
+                await job.insert()
+            except DuplicateKeyError:
+                continue
+            self._launch(job)
+            return job, True
+
+    def _launch(self, job: IndexingJob) -> None:
+        job_id = str(job.id)
+        self._jobs[job_id] = asyncio.create_task(self._run(job))
+        self._jobs[job_id].add_done_callback(lambda _: self._jobs.pop(job_id, None))
+
+    async def _claim_stale_job(self) -> Optional[IndexingJob]:
+        # atomic, when several workers notice the same stale job only one of them gets it
+        stored = await IndexingJob.get_motor_collection().find_one_and_update(
+            {
+                "status": JobStatusEnum.Running.value,
+                "heartbeat_at": {"$lt": self._now() - timedelta(seconds=3 * self.heartbeat_interval)},
+            },
+            {
+                "$set": {"worker_id": self.worker_id, "heartbeat_at": self._now()},
+                "$inc": {"resumed_count": 1},
+            },
+            return_document=ReturnDocument.AFTER
+        )
+        if stored is None:
+            return None
+        return await IndexingJob.get(stored["_id"])
+
+    async def _recover(self) -> None:
+        while True:
+            try:
+                job = await self._claim_stale_job()
+                if job is not None:
+                    logger.info(f"Indexing job {job.id}: resuming after {job.cursor or 'the start'}")
+                    self._launch(job)
+            except Exception as e:
+                logger.error(f"Indexing jobs: looking for interrupted jobs failed: {str(e)}")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _heartbeat(self, job: IndexingJob) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await IndexingJob.get_motor_collection().update_one(
+                {"_id": job.id, "worker_id": self.worker_id},
+                {"$set": {"heartbeat_at": self._now()}}
+            )
+
+    async def _save(self, job: IndexingJob) -> None:
+        # only written while this process still owns the job
+        job.heartbeat_at = self._now()
+        result = await IndexingJob.get_motor_collection().update_one(
+            {"_id": job.id, "worker_id": self.worker_id},
+            {"$set": job.model_dump(exclude={"id", "revision_id"})}
+        )
+        if result.matched_count == 0:
+            raise JobOwnershipLost()
+
+    async def _run(self, job: IndexingJob) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await self._process(job)
+        except JobOwnershipLost:
+            logger.warning(f"Indexing job {job.id}: taken over by another worker")
+        except Exception as e:
+            logger.error(f"Indexing job {job.id} failed: {str(e)}")
+            job.status = JobStatusEnum.Failed.value
+            job.error = str(e)
+            job.finished_at = self._now()
+            try:
+                await self._save(job)
+            except Exception as save_error:
+                logger.error(f"Indexing job {job.id}: saving the failure failed: {str(save_error)}")
+        finally:
+            heartbeat.cancel()
+
+    def list_files(self) -> list[str]:
+        """
+        :return: The files of the assets folder in name order, without the uploads still being streamed.
+        """
+        return sorted(file_name for file_name in os.listdir(DirectoryService.files_dir)
+                      if not file_name.endswith(".part"))
+
+    async def _process(self, job: IndexingJob) -> None:
+        listed_at = self._now()
+        corpus = self.list_files()
+        remaining = corpus[bisect.bisect_right(corpus, job.cursor):] if job.cursor is not None else corpus
+        job.total_files = job.processed_count + len(remaining)
+        await self._save(job)
+
+        for batch_start in range(0, len(remaining), self.batch_size):
+            start_time = time.perf_counter()
+            batch_files = remaining[batch_start:batch_start + self.batch_size]
+
+            ingested = await self.file_ingest_service.ingest(batch_files)
+
+            job.indexed_count += ingested["indexed"]
+            job.already_indexed_count += ingested["already_indexed"]
+            job.unchanged_count += ingested["unchanged"]
+            job.replaced_count += ingested["replaced"]
+            job.failed_count += len(ingested["failures"])
+            job.failures += ingested["failures"][:self.max_reported_failures - len(job.failures)]
+            job.processed_count += len(batch_files)
+            job.cursor = batch_files[-1]
+            job.elapsed_seconds += time.perf_counter() - start_time
+            await self._save(job)
+
+        # the files uploaded while the job ran are not in the listing, but are kept
+        job.removed_count = await self.file_ingest_service.remove_missing(corpus, since=listed_at)
+
+        job.status = JobStatusEnum.Completed.value
+        job.finished_at = self._now()
+        await self._save(job)
+        logger.info(f"Indexing job {job.id}: {job.indexed_count} files indexed, {job.unchanged_count} unchanged, "
+                    f"{job.removed_count} removed, {job.failed_count} failed")
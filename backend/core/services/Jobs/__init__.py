@@ -0,0 +1,2 @@
+from .EvaluationJobRunner import EvaluationJobRunner
+from .IndexingJobRunner import IndexingJobRunner
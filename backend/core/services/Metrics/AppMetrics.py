@@ -0,0 +1,134 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+from .ServerTiming import ServerTiming
+
+
+class AppMetrics:
+    """
+    The metrics of the application, kept with prometheus_client: the duration of the requests and of their stages,
+    the ingest totals, and the counters of the app-scoped caches and of the embedding worker.
+
+    With several uvicorn workers, the environment variable PROMETHEUS_MULTIPROC_DIR must name an empty directory,
+    emptied before every start of the server: each worker writes its values there and a scrape of any worker
+    reports the sum over all of them. Without it, a scrape reports the worker that answers it.
+    """
+
+    PREFIX = "albaheth"
+    CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+    def __init__(self):
+        self.registry = CollectorRegistry()
+        self.request_seconds = self._metric(
+            Histogram, "http_request_duration_seconds", "Duration of the HTTP requests.", ["method", "route", "status"]
+        )
+        self.stage_seconds = self._metric(
+            Histogram, "stage_duration_seconds", "Duration of the stages of the queries and the uploads.", ["stage"]
+        )
+        self.ingested_documents = self._metric(
+            Counter, "ingested_documents_total", "Documents stored and indexed.", ["source"]
+        )
+        self.ingested_bytes = self._metric(
+            Counter, "ingested_bytes_total", "Bytes of the uploaded files that were stored."
+        )
+        self.cache_hits = self._metric(Counter, "cache_hits_total", "Lookups found in the cache.", ["cache"])
+        self.cache_misses = self._metric(Counter, "cache_misses_total", "Lookups missing from the cache.", ["cache"])
+        self.cache_entries = self._metric(
+            Gauge, "cache_entries", "Entries held by the cache.", ["cache"], multiprocess_mode="livesum"
+        )
+        self.embedding_queue_depth = self._metric(
+            Gauge, "embedding_queue_depth", "Texts waiting for the embedding model.", multiprocess_mode="livesum"
+        )
+        self.embedding_batch_size = self._metric(
+            Histogram, "embedding_batch_size", "Texts encoded per call of the embedding model.",
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+        )
+
+        # the totals of the components already added to the cache counters, the next refresh adds the difference
+        self._mirrored_totals: dict[tuple, int] = {}
+        self._refreshed_at = 0.0
+
+    def _metric(self, metric_class, name: str, documentation: str, label_names=(), **kwargs):
+        return metric_class(f"{self.PREFIX}_{name}", documentation, label_names, registry=self.registry, **kwargs)
+
+    @staticmethod
+    def multiprocess_mode() -> bool:
+        return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+    @contextmanager
+    def span(self, stage: str):
+        """
+        Time a stage, the duration is observed in the stage histogram and added to the Server-Timing header.
+
+        :param stage: The name of the stage, "<operation>.<step>".
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self.stage_seconds.labels(stage=stage).observe(elapsed)
+            ServerTiming.record(stage, elapsed)
+
+    def _mirror_total(self, counter: Counter, cache: str, total: int) -> None:
+        key = (counter, cache)
+        increment = total - self._mirrored_totals.get(key, 0)
+        series = counter.labels(cache=cache)
+        if increment > 0:
+            series.inc(increment)
+        self._mirrored_totals[key] = max(total, self._mirrored_totals.get(key, 0))
+
+    def refresh(self, app, min_interval: float = 0) -> None:
+        """
+        Copy the counters kept by the app-scoped components of this process into the metrics.
+
+        :param app: The FastAPI application.
+        :param min_interval: Seconds since the last refresh under which the refresh is skipped.
+        """
+        now = time.monotonic()
+        if now - self._refreshed_at < min_interval or getattr(app, "services", None) is None:
+            return  # refreshed recently, or the lifespan did not create the components yet
+        self._refreshed_at = now
+
+        cache_stats = {
+            "query_embedding": app.query_embedding_cache.stats(),
+            "metadata": app.services.document_repository.metadata_cache.stats(),
+            **{
+                f"nlp_{name}": stats
+                for name, stats in app.services.language_processing_service.cache_stats().items()
+            },
+        }
+        if app.search_result_cache is not None:
+            cache_stats["search_result"] = app.search_result_cache.stats()
+
+        for name, stats in cache_stats.items():
+            self._mirror_total(self.cache_hits, name, stats["hits"])
+            self._mirror_total(self.cache_misses, name, stats["misses"])
+            self.cache_entries.labels(cache=name).set(stats["size"])
+
+        self.embedding_queue_depth.set(app.embedding_worker.stats()["queue_depth"])
+
+    def render(self) -> bytes:
+        """
+        :return: The metrics in the Prometheus text exposition format, of every worker in multiprocess mode.
+        """
+        if not self.multiprocess_mode():
+            return generate_latest(self.registry)
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+
+    def mark_process_dead(self) -> None:
+        """
+        Drop the gauges of this process from the aggregated metrics, on shutdown.
+        """
+        if self.multiprocess_mode():
+            multiprocess.mark_process_dead(os.getpid())
+
+
+metrics = AppMetrics()
@@ -0,0 +1,46 @@
+import contextvars
+from typing import Optional
+
+
+class ServerTiming:
+    """
+    Collects the durations of the stages run while serving the current request, for the Server-Timing header.
+    The entries live in a context variable, so the concurrent requests of the event loop do not mix,
+    and the stages run in threads by asyncio.to_thread still reach the request's entries.
+    """
+
+    _entries: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("server_timing", default=None)
+
+    @classmethod
+    def start(cls) -> contextvars.Token:
+        """
+        Start collecting for the current request.
+
+        :return: The token given back to stop.
+        """
+        return cls._entries.set({})
+
+    @classmethod
+    def stop(cls, token: contextvars.Token) -> None:
+        cls._entries.reset(token)
+
+    @classmethod
+    def record(cls, name: str, seconds: float) -> None:
+        """
+        Add a duration to the current request, the durations of a stage run several times are summed.
+        Does nothing outside a request.
+        """
+        entries = cls._entries.get()
+        if entries is not None:
+            entries[name] = entries.get(name, 0.0) + seconds
+
+    @classmethod
+    def header(cls, total_seconds: Optional[float] = None) -> str:
+        """
+        :param total_seconds: The time spent on the whole request, reported as "total".
+        :return: The value of the Server-Timing header, the durations are in milliseconds.
+        """
+        entries = dict(cls._entries.get() or {})
+        if total_seconds is not None:
+            entries["total"] = total_seconds
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in entries.items())
@@ -0,0 +1,2 @@
+from .AppMetrics import AppMetrics, metrics
+from .ServerTiming import ServerTiming
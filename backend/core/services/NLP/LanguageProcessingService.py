@@ -1,10 +1,19 @@
 import re
 import unicodedata
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
+
+from ...models.enums import ProcessingProfileEnum
+
+NON_ALPHABETIC_PATTERN = re.compile("[^a-z ]+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+TOKEN_PATTERN = re.compile("[a-z]+")
 
 
 class LanguageProcessingService(ABC):
+    # profile used by clean_text and clean_texts when none is given, see ProcessingProfileEnum
+    profile: str = ProcessingProfileEnum.Accurate.value
 
     def normalize(self, text: str) -> str:
         """
@@ -20,8 +29,8 @@ class LanguageProcessingService(ABC):
             no non-alphabetic characters, and single spaces.
         """
         text = text.lower()
-        text = re.sub("[^a-z ]+", " ", text).strip()
-        text = re.sub(r"\s+", " ", text).strip()
+        text = NON_ALPHABETIC_PATTERN.sub(" ", text).strip()
+        text = WHITESPACE_PATTERN.sub(" ", text).strip()
         return text
 
     def semantic_processing(self, text: str) -> str:
@@ -35,11 +44,83 @@ class LanguageProcessingService(ABC):
         :return: A semantically normalized string processed as per the specified operations.
         """
         text = unicodedata.normalize('NFKC', text)
-        text = re.sub(r'<[^>]+>', ' ', text)
+        text = HTML_TAG_PATTERN.sub(' ', text)
         text = text.lower()
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = WHITESPACE_PATTERN.sub(' ', text).strip()
         return text
 
+    def regex_tokenize(self, text: str) -> List[str]:
+        """
+        Split a normalized text into its alphabetic words, a fast alternative to the tokenizer.
+
+        :param text: The normalized text.
+        :return: A List of words extracted from the input text.
+        """
+        return TOKEN_PATTERN.findall(text)
+
+    def lemmatize_many(self, token_lists: List[List[str]], pos_aware: bool = True) -> List[List[str]]:
+        """
+        Lemmatize several token lists at once.
+        Services that can tag or lemmatize in batches should override this, the default handles one list at a time.
+
+        :param token_lists: The token lists, one per text.
+        :param pos_aware: Whether to tag the parts of speech before lemmatizing.
+        :return: The lemmatized token lists.
+        """
+        return [self.lemmatize(tokens) for tokens in token_lists]
+
+    def clean_texts(self, texts: List[str], semantic: bool = True, profile: Optional[str] = None) -> List[str]:
+        """
+        Clean a batch of extracted texts.
+
+        :param texts: Extracted texts.
+        :param semantic: Flag to indicate if semantic processing is needed.
+        :param profile: The ProcessingProfileEnum value of the non-semantic pipeline, defaults to the service profile.
+        :return: Cleaned texts, in the same order.
+        """
+        if semantic:
+            return [self.semantic_processing(text) for text in texts]
+
+        fast = (profile or self.profile) == ProcessingProfileEnum.Fast.value
+        tokenize = self.regex_tokenize if fast else self.tokenize
+
+        # Normalization, Tokenization and Stopwords removal
+        token_lists = [self.remove_stopwords(tokenize(self.normalize(text))) for text in texts]
+
+        token_lists = self.lemmatize_many(token_lists, pos_aware=not fast)
+
+        # Stemming
+        return [' '.join(self.stem(tokens)) for tokens in token_lists]
+
+    def clean_text(self, text: str, semantic: bool = True, profile: Optional[str] = None) -> str:
+        """
+        Clean the extracted text.
+
+        :param text: Extracted text from a file.
+        :param semantic: Flag to indicate if semantic processing is needed.
+        :param profile: The ProcessingProfileEnum value of the non-semantic pipeline, defaults to the service profile.
+        :return: Cleaned text.
+        """
+        return self.clean_texts([text], semantic, profile)[0]
+
+    def cache_stats(self) -> dict:
+        """
+        :return: The statistics of the service's memo caches, empty if it has none.
+        """
+        return {}
+
+    def save_caches(self) -> None:
+        """
+        Persist the service's memo caches, if it has any.
+        """
+        pass
+
+    def warm_up(self) -> None:
+        """
+        Load the service's lazy resources ahead of the first request, if it has any.
+        """
+        pass
+
     @abstractmethod
     def tokenize(self, text: str) -> List[str]:
         """
@@ -1,4 +1,7 @@
-from typing import Literal, List
+import json
+import logging
+import os
+from typing import Literal, List, Optional
 
 import nltk
 from nltk.corpus import stopwords
@@ -7,16 +10,36 @@ from nltk.stem import PorterStemmer, WordNetLemmatizer
 from nltk.tokenize import word_tokenize
 
 from .LanguageProcessingService import LanguageProcessingService
+from .TokenCache import TokenCache
+from ..Directory import DirectoryService
+from ...helpers.config import get_settings
+
+logger = logging.getLogger("uvicorn.error")
 
 
 class NLTKService(LanguageProcessingService):
     # Static Attributes
     lemmatizer = WordNetLemmatizer()
     stemmer = PorterStemmer()
-    stop_words = set(stopwords.words('english'))
+    stop_words: Optional[set] = None  # loaded with the first instance, reading the corpus is slow
+
+    # per process memo caches, created (and warmed from disk) with the first instance
+    stem_cache: Optional[TokenCache] = None
+    lemma_cache: Optional[TokenCache] = None
+    cache_path: Optional[str] = None
 
     def __init__(self):
         super().__init__()
+        if NLTKService.stop_words is None:
+            NLTKService.stop_words = set(stopwords.words('english'))
+        if NLTKService.stem_cache is None:
+            settings = get_settings()
+            NLTKService.stem_cache = TokenCache(settings.NLP_CACHE_SIZE)
+            NLTKService.lemma_cache = TokenCache(settings.NLP_CACHE_SIZE)
+            NLTKService.profile = settings.NLP_PROFILE
+            if settings.NLP_CACHE_FILE:
+                NLTKService.cache_path = os.path.join(DirectoryService.index_dir, settings.NLP_CACHE_FILE)
+                self.load_caches()
 
     def tokenize(self, text: str) -> List[str]:
         """
@@ -85,9 +108,36 @@ class NLTKService(LanguageProcessingService):
         Returns:
             List[str]: A List of lemmatized tokens.
         """
-        pos_tags = nltk.pos_tag(tokens)
-        processed_tokens = [self.lemmatizer.lemmatize(token, self.get_wordnet_pos(pos)) for token, pos in pos_tags]
-        return processed_tokens
+        return self.lemmatize_many([tokens])[0]
+
+    def _lemmatize_tagged(self, tagged_tokens) -> List[str]:
+        lemmas = []
+        for key in tagged_tokens:
+            lemma = self.lemma_cache.get(key)
+            if lemma is None:
+                lemma = self.lemmatizer.lemmatize(*key)
+                self.lemma_cache.put(key, lemma)
+            lemmas.append(lemma)
+        return lemmas
+
+    def lemmatize_many(self, token_lists: List[List[str]], pos_aware: bool = True) -> List[List[str]]:
+        """
+        Lemmatize several token lists, tagging all of them with a single pos_tag_sents call.
+
+        Args:
+            token_lists (List[List[str]]): The token lists, one per text.
+            pos_aware (bool): Whether to tag the parts of speech, without tagging every token is lemmatized as a noun.
+
+        Returns:
+            List[List[str]]: The lemmatized token lists.
+        """
+        if not pos_aware:
+            return [self._lemmatize_tagged([(token, wordnet.NOUN) for token in tokens]) for tokens in token_lists]
+
+        return [
+            self._lemmatize_tagged([(token, self.get_wordnet_pos(pos)) for token, pos in tagged_tokens])
+            for tagged_tokens in nltk.pos_tag_sents(token_lists)
+        ]
 
     def stem(self, tokens) -> List[str]:
         """
@@ -99,4 +149,82 @@ class NLTKService(LanguageProcessingService):
         Returns:
             List[str]: A List of stemmed words.
         """
-        return [self.stemmer.stem(word) for word in tokens]
+        stems = []
+        for word in tokens:
+            stem = self.stem_cache.get(word)
+            if stem is None:
+                stem = self.stemmer.stem(word)
+                self.stem_cache.put(word, stem)
+            stems.append(stem)
+        return stems
+
+    def warm_up(self) -> None:
+        """
+        Run every NLTK resource once, the tokenizer, tagger and WordNet models are only loaded on their first call.
+        """
+        tokens = self.tokenize("Warming up the language processing resources")
+        self.lemmatize(tokens)
+        self.stem(tokens)
+
+    def cache_stats(self) -> dict:
+        return {
+            "stem": self.stem_cache.stats(),
+            "lemmatize": self.lemma_cache.stats(),
+        }
+
+    def _read_caches(self) -> Optional[dict]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load the NLP caches from {self.cache_path}: {str(e)}")
+            return None
+
+    def load_caches(self) -> None:
+        """
+        Warm the stem and lemma caches from the file saved by a previous process, if there is one.
+        """
+        saved = self._read_caches()
+        if saved is None:
+            return
+
+        self.stem_cache.update((token, stem) for token, stem in saved.get("stem", []))
+        self.lemma_cache.update(((token, pos), lemma) for token, pos, lemma in saved.get("lemmatize", []))
+
+    @staticmethod
+    def _merge(cache: TokenCache, saved_items) -> list:
+        # the entries of this process first, then the saved ones it does not have, up to the size limit
+        merged = dict(cache.items())
+        for key, value in saved_items:
+            if len(merged) >= cache.max_size:
+                break
+            merged.setdefault(key, value)
+        return list(merged.items())
+
+    def save_caches(self) -> None:
+        """
+        Save the stem and lemma caches, so new workers start warm.
+        The entries already in the file are kept, so the processes saving in turn, such as the pool workers
+        and the main process on shutdown, do not overwrite each other's entries. The file is replaced atomically.
+        """
+        if not self.cache_path:
+            return
+
+        saved = self._read_caches() or {}
+        stems = self._merge(self.stem_cache, ((token, stem) for token, stem in saved.get("stem", [])))
+        lemmas = self._merge(
+            self.lemma_cache,
+            (((token, pos), lemma) for token, pos, lemma in saved.get("lemmatize", []))
+        )
+        saved = {
+            "stem": stems,
+            "lemmatize": [[token, pos, lemma] for (token, pos), lemma in lemmas],
+        }
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, self.cache_path)
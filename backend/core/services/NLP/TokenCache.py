@@ -0,0 +1,68 @@
+from typing import Hashable, Optional
+
+
+class TokenCache:
+    """
+    A bounded memo of per-token results (stems, lemmas).
+    Token frequencies are Zipfian, so a small cache answers most lookups. When the cache is full the
+    oldest entries are evicted first, which keeps lookups as cheap as a plain dict access.
+    The cache is per process and not locked, it relies on the atomicity of dict operations.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        :param max_size: The maximum number of entries, 0 disables the cache.
+        """
+        self.max_size = max_size
+        self._entries: dict = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: str) -> None:
+        if self.max_size <= 0:
+            return
+
+        if len(self._entries) >= self.max_size:
+            self._entries.pop(next(iter(self._entries)), None)
+        self._entries[key] = value
+
+    def discard(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def items(self) -> list:
+        return list(self._entries.items())
+
+    def update(self, items) -> None:
+        """
+        Add entries, up to the size limit, without counting them as lookups.
+
+        :param items: An iterable of (key, value) pairs.
+        """
+        for key, value in items:
+            if len(self._entries) >= self.max_size:
+                break
+            self._entries[key] = value
+
+    def stats(self) -> dict:
+        """
+        :return: The size and the hit and miss counters of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+        }
@@ -1,2 +1,3 @@
 from .LanguageProcessingService import LanguageProcessingService
 from .NLTKService import NLTKService
+from .TokenCache import TokenCache
@@ -1,8 +1,5 @@
 import os
-from http.client import responses
 
-from aiohttp.abc import HTTPException
-from langchain_community.document_loaders import TextLoader, PyMuPDFLoader, Docx2txtLoader, UnstructuredPowerPointLoader
 from fastapi import HTTPException, status
 
 from .ParsingService import ParsingService
@@ -29,6 +26,11 @@ class LangChainService(ParsingService):
                 }
             )
 
+        # imported on first use, the loaders pull in heavy dependencies
+        from langchain_community.document_loaders import (
+            TextLoader, PyMuPDFLoader, Docx2txtLoader, UnstructuredPowerPointLoader
+        )
+
         if file_extension == ProcessingEnum.TXT.value:
             return TextLoader(file_path, encoding="utf-8")
         elif file_extension == ProcessingEnum.PDF.value:
@@ -44,3 +46,7 @@ class LangChainService(ParsingService):
                 "message": ResponseEnum.FILE_TYPE_NOT_SUPPORTED.value
             }
         )
+
+    def parse(self, file_name) -> str:
+        content = self.load(file_name).load()
+        return "\n".join([doc.page_content for doc in content])
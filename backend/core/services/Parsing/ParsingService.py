@@ -15,3 +15,13 @@ class ParsingService(ABC):
         :return: Text content of the file.
         """
         pass
+
+    @abstractmethod
+    def parse(self, file_name: str) -> str:
+        """
+        Load a file and join the text of all its pages.
+
+        :param file_name: Path to the file.
+        :return: Text content of the file.
+        """
+        pass
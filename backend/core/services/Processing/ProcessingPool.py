@@ -0,0 +1,87 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+from fastapi import HTTPException
+
+from .tasks import ProcessingError, initialize_worker, warm_up
+
+
+class ProcessingPool:
+    """
+    Runs the CPU bound parsing and text cleaning off the event loop, in a pool of worker processes.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        """
+        :param max_workers: The number of worker processes. With 0 the tasks run in the event loop's default
+                            thread pool, which keeps the loop responsive but does not use more cores.
+        :param max_pending: The maximum number of tasks submitted by this uvicorn worker at the same time,
+                            the others wait for a free slot.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._semaphore = asyncio.Semaphore(max_pending)
+        self.executor = None
+
+        if max_workers > 0:
+            # spawn, since forking a process that already holds the embedding model and its threads is unsafe
+            self.executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initialize_worker,
+            )
+
+    async def run(self, func: Callable, *args):
+        """
+        Run a function from the tasks module in the pool and wait for its result.
+
+        :param func: A module level function, so it can be sent to the worker process.
+        :param args: The positional arguments of the function.
+        :return: The result of the function.
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self.executor, func, *args)
+            except ProcessingError as e:
+                raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    async def run_batched(self, func: Callable, items: list, *args) -> list:
+        """
+        Split a list into one chunk per worker process, run a batch function from the tasks module
+        on every chunk in parallel, and join the results.
+
+        :param func: A module level function taking a list as its first argument and returning a list.
+        :param items: The items to process.
+        :param args: The other positional arguments of the function.
+        :return: The results of all the chunks, in the order of the items.
+        """
+        if not items:
+            return []
+
+        chunks_count = max(1, min(self.max_workers, len(items)))
+        chunk_size = -(-len(items) // chunks_count)
+        chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+        results = await asyncio.gather(*[self.run(func, chunk, *args) for chunk in chunks])
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def warm_up(self) -> tuple[None, dict]:
+        """
+        Start every worker process and wait until their services are loaded,
+        instead of letting the first requests pay for the spawn and the imports.
+
+        :return: None and the warm-up time, in the format expected by the startup subsystem.
+        """
+        start_time = time.perf_counter()
+        if self.executor is not None:
+            # the tasks sleep a little so that each one is picked up by a different process
+            await asyncio.gather(*[self.run(warm_up) for _ in range(self.max_workers)])
+        return None, {"warm_up_seconds": time.perf_counter() - start_time}
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
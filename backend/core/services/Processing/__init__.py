@@ -0,0 +1,2 @@
+from .ProcessingPool import ProcessingPool
+from . import tasks
@@ -0,0 +1,94 @@
+"""
+Functions executed inside the processing pool workers.
+They must stay at module level so they can be pickled and sent to the worker processes.
+"""
+import time
+
+from fastapi import HTTPException
+
+from ..Parsing import ParsingService
+from ..NLP import LanguageProcessingService
+from ...helpers.config import get_settings
+
+# one instance of each service per worker process, created on first use
+_parsing_service: ParsingService | None = None
+_language_processing_service: LanguageProcessingService | None = None
+_cache_save_interval = 0.0
+_last_cache_save = time.monotonic()
+
+
+class ProcessingError(Exception):
+    """
+    A picklable stand-in for the HTTPException raised inside a worker,
+    FastAPI's HTTPException cannot be rebuilt from its pickled args.
+    """
+
+    def __init__(self, status_code: int, detail=None):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _get_services() -> tuple[ParsingService, LanguageProcessingService]:
+    global _parsing_service, _language_processing_service, _cache_save_interval
+
+    if _parsing_service is None:
+        from ..dependencies import getParsingService, getLanguageProcessingService
+
+        settings = get_settings()
+        _parsing_service = getParsingService(settings)
+        _language_processing_service = getLanguageProcessingService(settings)
+        _cache_save_interval = settings.NLP_CACHE_SAVE_INTERVAL
+
+    return _parsing_service, _language_processing_service
+
+
+def initialize_worker() -> None:
+    """
+    Create the services and load their resources as soon as the worker starts, so the first task does not pay for it.
+    """
+    _, language_processing_service = _get_services()
+    language_processing_service.warm_up()
+
+
+def warm_up() -> None:
+    # the initializer does the work, this only makes sure the process was started
+    time.sleep(0.05)
+
+
+def parse_file(file_name: str) -> str:
+    try:
+        parsing_service, _ = _get_services()
+        return parsing_service.parse(file_name)
+    except HTTPException as e:
+        raise ProcessingError(e.status_code, e.detail) from None
+
+
+def _save_caches_if_due(language_processing_service: LanguageProcessingService) -> None:
+    # workers have no shutdown hook, so they persist their warmed caches periodically
+    global _last_cache_save
+
+    if time.monotonic() - _last_cache_save >= _cache_save_interval:
+        _last_cache_save = time.monotonic()
+        language_processing_service.save_caches()
+
+
+def clean_texts(texts: list[str], semantic: bool = True, profile: str | None = None) -> list[str]:
+    try:
+        _, language_processing_service = _get_services()
+        cleaned_texts = language_processing_service.clean_texts(texts, semantic, profile)
+    except HTTPException as e:
+        raise ProcessingError(e.status_code, e.detail) from None
+
+    if not semantic:
+        _save_caches_if_due(language_processing_service)
+
+    return cleaned_texts
+
+
+def clean_text(text: str, semantic: bool = True, profile: str | None = None) -> str:
+    return clean_texts([text], semantic, profile)[0]
+
+
+def parse_and_clean(file_name: str, semantic: bool = True, profile: str | None = None) -> str:
+    return clean_text(parse_file(file_name), semantic, profile)
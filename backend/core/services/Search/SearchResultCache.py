@@ -0,0 +1,220 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from pymongo import ReturnDocument
+
+from ...models import IndexGeneration, SearchCacheEntry
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class SearchResultCache:
+    """
+    Caches the hydrated results of the searches, so a repeated query skips the whole pipeline:
+    cleaning, encoding, retrieval and hydration.
+
+    Every entry is tagged with the index generation, a counter stored in the database that the DocumentRepository
+    increments after each change of the corpus. A lookup reads the current generation and ignores the entries
+    of the older ones, so every process sees the changes made by the others and a cached result is never stale.
+
+    The entries are kept in three tiers:
+        - memory: an LRU of max_size entries per process,
+        - file: the memory entries are saved under the index directory on shutdown and loaded at startup,
+          the ones of an older generation are dropped on their first lookup,
+        - shared: a collection read by every worker on a memory miss, emptied of the older generations
+          when the generation changes.
+
+    The generation read from the database is reused for generation_ttl seconds, so a change of the corpus
+    made by another worker can take that long to invalidate the results cached by this one.
+    """
+
+    GENERATION_NAME = "corpus"
+
+    def __init__(self, max_size: int, namespace: str, cache_path: Optional[str] = None, shared: bool = False,
+                 generation_ttl: float = 0):
+        """
+        :param max_size: The maximum number of entries kept in memory, the least recently used are evicted first.
+        :param namespace: Mixed into every key, such as a fingerprint of the settings the results depend on.
+        :param cache_path: The file the memory entries are saved to, None disables persistence.
+        :param shared: Whether the entries are also stored in the database for the other workers.
+        :param generation_ttl: Seconds the generation read from the database is reused, 0 reads it on every lookup.
+        """
+        self.max_size = max_size
+        self.namespace = namespace
+        self.cache_path = cache_path
+        self.shared = shared
+        self.generation_ttl = generation_ttl
+        self._generation: Optional[tuple[int, float]] = None  # the last generation read and when it was read
+        self._entries: OrderedDict[str, tuple[int, list]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        :param query: A raw search query.
+        :return: The query lower-cased with its whitespace collapsed, the queries differing only by these
+                 are cleaned the same way and get the same snippets.
+        """
+        return " ".join(query.lower().split())
+
+    def key(self, query: str, **parameters) -> str:
+        """
+        :param query: The raw search query, normalized here.
+        :param parameters: The search parameters the results depend on, JSON serializable.
+        :return: The cache key of the search.
+        """
+        payload = json.dumps([self.namespace, self.normalize(query), parameters], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def generation(self) -> int:
+        """
+        :return: The current index generation, as read at most generation_ttl seconds ago.
+        """
+        if self._generation is not None and time.monotonic() - self._generation[1] < self.generation_ttl:
+            return self._generation[0]
+
+        stored = await IndexGeneration.get_motor_collection().find_one({"name": self.GENERATION_NAME})
+        generation = stored["generation"] if stored else 0
+        self._generation = (generation, time.monotonic())
+        return generation
+
+    async def bump(self) -> int:
+        """
+        Increment the index generation, after a change of the corpus is visible to the searches.
+
+        :return: The new generation.
+        """
+        stored = await IndexGeneration.get_motor_collection().find_one_and_update(
+            {"name": self.GENERATION_NAME},
+            {"$inc": {"generation": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        generation = stored["generation"]
+        self._generation = (generation, time.monotonic())
+
+        with self._lock:
+            self._entries.clear()
+        if self.shared:
+            await SearchCacheEntry.get_motor_collection().delete_many({"generation": {"$lt": generation}})
+
+        return generation
+
+    async def get(self, key: str, generation: int) -> Optional[list]:
+        """
+        :param key: The cache key of the search.
+        :param generation: The current index generation.
+        :return: The cached results, or None if they are not cached for this generation.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        if self.shared:
+            stored = await SearchCacheEntry.get_motor_collection().find_one(
+                {"key": key, "generation": generation},
+                {"results": 1}
+            )
+            if stored is not None:
+                self._put_memory(key, generation, stored["results"])
+                self.shared_hits += 1
+                return stored["results"]
+
+        self.misses += 1
+        return None
+
+    def _put_memory(self, key: str, generation: int, results: list) -> None:
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (generation, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def put(self, key: str, generation: int, results: list) -> None:
+        """
+        Cache the results of a search.
+
+        :param key: The cache key of the search.
+        :param generation: The index generation read before the search ran.
+        :param results: The hydrated results, JSON serializable.
+        """
+        self._put_memory(key, generation, results)
+
+        if self.shared:
+            # only a newer generation replaces an entry, a slow search cannot overwrite fresher results
+            try:
+                await SearchCacheEntry.get_motor_collection().update_one(
+                    {"key": key, "generation": {"$lte": generation}},
+                    {"$set": {"key": key, "generation": generation, "results": results}},
+                    upsert=True
+                )
+            except Exception as e:
+                # a duplicate key when a newer entry exists, or results too large for a document
+                logger.debug(f"Search result cache: the shared entry was not written: {str(e)}")
+
+    def load(self) -> None:
+        """
+        Warm the memory tier from the file saved by a previous process, if there is one.
+        """
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load the search result cache from {self.cache_path}: {str(e)}")
+            return
+
+        for key, generation, results in saved[-self.max_size:] if self.max_size > 0 else []:
+            self._put_memory(key, generation, results)
+
+    def save(self) -> None:
+        """
+        Save the memory tier, least recently used first, so new workers start warm.
+        The file is replaced atomically, the last process to save wins.
+        """
+        if not self.cache_path:
+            return
+
+        with self._lock:
+            saved = [[key, generation, results] for key, (generation, results) in self._entries.items()]
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def stats(self) -> dict:
+        """
+        :return: The size and the hit and miss counters of the cache, the shared hits are counted as hits.
+        """
+        hits = self.hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0,
+        }
@@ -0,0 +1 @@
+from .SearchResultCache import SearchResultCache
@@ -0,0 +1,129 @@
+import bisect
+import html
+import re
+from typing import Optional
+
+from ..NLP import LanguageProcessingService
+
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s")
+WORD_PATTERN = re.compile("[a-z]+")
+
+
+class SnippetService:
+    """
+    Builds the snippets returned with the search results instead of the full document texts.
+
+    The passage offsets of a text are computed once at ingest: the text is cut into passages of about
+    passage_size characters, ending on a sentence boundary when there is one close enough.
+    At query time the passages matching the most query terms are picked and the matched words are highlighted.
+    Query terms and document words are compared by their stems, so "indexing" matches "indexed".
+    """
+
+    HIGHLIGHT_START = "<mark>"
+    HIGHLIGHT_END = "</mark>"
+
+    def __init__(self, language_processing_service: LanguageProcessingService, passage_size: int = 300,
+                 snippet_count: int = 2):
+        """
+        :param language_processing_service: Used to drop the stopwords of the query and to stem the words.
+        :param passage_size: The minimum length of a passage in characters, a passage stops at the first
+                             sentence end after it, or at a word boundary if the sentence runs too long.
+        :param snippet_count: The number of passages returned per result.
+        """
+        self.language_processing_service = language_processing_service
+        self.passage_size = passage_size
+        self.snippet_count = snippet_count
+
+    def passage_offsets(self, text: str) -> list[tuple[int, int]]:
+        """
+        Cut a text into passages.
+
+        :param text: The parsed text of a document, with its whitespace collapsed.
+        :return: The (start, end) character offsets of each passage, in order.
+        """
+        offsets = []
+        start = 0
+        length = len(text)
+
+        while start < length:
+            end = min(start + self.passage_size, length)
+            if end < length:
+                sentence_end = SENTENCE_END_PATTERN.search(text, end, min(start + 2 * self.passage_size, length))
+                if sentence_end is not None:
+                    end = sentence_end.start()
+                else:
+                    space = text.rfind(" ", start, end)
+                    if space > start:
+                        end = space
+
+            offsets.append((start, end))
+            start = end
+            while start < length and text[start].isspace():
+                start += 1
+
+        return offsets
+
+    def _query_stems(self, query: str) -> set[str]:
+        words = self.language_processing_service.remove_stopwords(WORD_PATTERN.findall(query.lower()))
+        return set(self.language_processing_service.stem(words))
+
+    def _matches(self, text: str, stems: set[str]) -> list[tuple[int, int, str]]:
+        # a regex finds the words sharing the first letters of a query stem, only those are stemmed
+        prefixes = {stem[:min(3, max(1, len(stem) - 1))] for stem in stems}
+        candidates = re.compile(r"\b(?:" + "|".join(sorted(map(re.escape, prefixes))) + ")[a-z]*")
+
+        matches = []
+        for match in candidates.finditer(text):
+            stem = self.language_processing_service.stem([match.group()])[0]
+            if stem in stems:
+                matches.append((match.start(), match.end(), stem))
+        return matches
+
+    def _highlight(self, text: str, start: int, end: int, matches: list[tuple[int, int, str]]) -> str:
+        parts = []
+        position = start
+        for match_start, match_end, _ in matches:
+            parts.append(html.escape(text[position:match_start]))
+            parts.append(self.HIGHLIGHT_START + html.escape(text[match_start:match_end]) + self.HIGHLIGHT_END)
+            position = match_end
+        parts.append(html.escape(text[position:end]))
+        return "".join(parts)
+
+    def snippets(self, text: str, query: str, passage_offsets: Optional[list] = None) -> list[str]:
+        """
+        Pick the passages of a text that best match a query, with the matched words highlighted.
+
+        :param text: The parsed text of the document.
+        :param query: The search query.
+        :param passage_offsets: The offsets computed at ingest, computed now if the document has none.
+        :return: Up to snippet_count passages, HTML escaped, in the order they appear in the text.
+                 The first passage is returned when nothing matches.
+        """
+        if not passage_offsets:
+            passage_offsets = self.passage_offsets(text)
+        if not passage_offsets:
+            return []
+
+        stems = self._query_stems(query)
+        matches = self._matches(text, stems) if stems else []
+
+        starts = [start for start, _ in passage_offsets]
+        passage_matches: dict[int, list] = {}
+        for match in matches:
+            passage_matches.setdefault(bisect.bisect_right(starts, match[0]) - 1, []).append(match)
+
+        if not passage_matches:
+            start, end = passage_offsets[0]
+            return [html.escape(text[start:end])]
+
+        # the passages matching the most distinct terms first, then the most matches, then the earliest
+        best = sorted(
+            passage_matches,
+            key=lambda passage: (-len({stem for _, _, stem in passage_matches[passage]}),
+                                 -len(passage_matches[passage]), passage)
+        )[:self.snippet_count]
+
+        return [
+            self._highlight(text, *passage_offsets[passage], passage_matches[passage])
+            for passage in sorted(best)
+        ]
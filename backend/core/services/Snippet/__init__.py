@@ -0,0 +1 @@
+from .SnippetService import SnippetService
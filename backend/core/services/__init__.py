@@ -1,19 +1,63 @@
+from typing import Optional
+
 from fastapi import Depends, Request
 
 from .Directory import DirectoryService
+from .Embedding import EmbeddingCache
+from .Processing import ProcessingPool
 from .Indexing import IndexingService as IndexingServiceClass
+from .Jobs import EvaluationJobRunner as EvaluationJobRunnerClass, IndexingJobRunner as IndexingJobRunnerClass
 from .NLP import LanguageProcessingService as LanguageProcessingServiceClass
 from .Parsing import ParsingService as ParsingServiceClass
-from .dependencies import getParsingService, getLanguageProcessingService, getIndexingService
-from ..helpers import Annotated, Settings
+from .Search import SearchResultCache as SearchResultCacheClass
+from ..helpers import Annotated
+
+
+# the services are app-scoped singletons, resolved from the ServiceContainer created in the lifespan
+def get_parsing_service(request: Request):
+    return request.app.services.parsing_service
+
+
+ParsingService = Annotated[ParsingServiceClass, Depends(get_parsing_service)]
+
 
-ParsingService = Annotated[ParsingServiceClass, Depends(getParsingService)]
-LanguageProcessingService = Annotated[LanguageProcessingServiceClass, Depends(getLanguageProcessingService)]
+def get_language_processing_service(request: Request):
+    return request.app.services.language_processing_service
 
 
-# Modified to include the Request in the dependency chain
-def get_indexing_service(settings: Settings, request: Request):
-    return getIndexingService(settings, request)
+LanguageProcessingService = Annotated[LanguageProcessingServiceClass, Depends(get_language_processing_service)]
+
+
+def get_indexing_service(request: Request):
+    return request.app.services.indexing_service
 
 
 IndexingService = Annotated[IndexingServiceClass, Depends(get_indexing_service)]
+
+
+def get_lexical_indexing_service(request: Request):
+    return request.app.services.lexical_indexing_service
+
+
+LexicalIndexingService = Annotated[Optional[IndexingServiceClass], Depends(get_lexical_indexing_service)]
+
+
+def get_indexing_job_runner(request: Request):
+    return request.app.services.indexing_job_runner
+
+
+IndexingJobRunner = Annotated[IndexingJobRunnerClass, Depends(get_indexing_job_runner)]
+
+
+def get_evaluation_job_runner(request: Request):
+    return request.app.services.evaluation_job_runner
+
+
+EvaluationJobRunner = Annotated[EvaluationJobRunnerClass, Depends(get_evaluation_job_runner)]
+
+
+def get_search_result_cache(request: Request):
+    return request.app.search_result_cache
+
+
+SearchResultCache = Annotated[Optional[SearchResultCacheClass], Depends(get_search_result_cache)]
@@ -1,8 +1,10 @@
-from fastapi import HTTPException, Request
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
 
 from ..helpers import Settings
 from ..models.enums import LanguageProcessingEnum, FileEnum, IndexingEnum
-from ..services.Indexing import IndexingService, PyTerrierService, ElasticSearchService
+from ..services.Indexing import IndexingService, BM25Service, ElasticSearchService, NumpyService
 from ..services.NLP import LanguageProcessingService, NLTKService
 from ..services.Parsing import ParsingService, LangChainService
 
@@ -51,13 +53,13 @@ def getLanguageProcessingService(settings: Settings) -> LanguageProcessingServic
     )
 
 
-def getIndexingService(settings: Settings, request: Request = None) -> IndexingService:
+def getIndexingService(settings: Settings, app: FastAPI = None) -> IndexingService:
     """
     Retrieves the appropriate indexing service based on the provided settings.
 
     Args:
         settings (Settings): The settings object containing configuration for the indexing service.
-        request (Request, optional): The FastAPI request object, needed for ElasticSearch service.
+        app (FastAPI, optional): The FastAPI application, needed to reach the app-scoped clients and indices.
 
     Returns:
         IndexingService: An instance of the selected indexing service.
@@ -65,18 +67,49 @@ def getIndexingService(settings: Settings, request: Request = None) -> IndexingS
     Raises:
         HTTPException: If the specified indexing service is not found in the settings.
     """
-    if settings.INDEXING_SERVICE == IndexingEnum.PyTerrier.value:
-        return PyTerrierService()
+    if settings.INDEXING_SERVICE == IndexingEnum.BM25.value:
+        if app is None:
+            raise HTTPException(
+                status_code=500,
+                detail="Application object is required for BM25 service"
+            )
+        return BM25Service(app)
 
     if settings.INDEXING_SERVICE == IndexingEnum.ElasticSearch.value:
-        if request is None:
+        if app is None:
             raise HTTPException(
                 status_code=500,
-                detail="Request object is required for ElasticSearch service"
+                detail="Application object is required for ElasticSearch service"
             )
-        return ElasticSearchService(request)
+        return ElasticSearchService(app)
+
+    if settings.INDEXING_SERVICE == IndexingEnum.Numpy.value:
+        if app is None:
+            raise HTTPException(
+                status_code=500,
+                detail="Application object is required for Numpy service"
+            )
+        return NumpyService(app)
 
     raise HTTPException(
         status_code=404,
         detail="Indexing service not found"
     )
+
+
+def getLexicalIndexingService(settings: Settings, app: FastAPI) -> Optional[IndexingService]:
+    """
+    Retrieves the lexical indexing service used next to the dense one for hybrid search.
+
+    Args:
+        settings (Settings): The settings object containing the hybrid search configuration.
+        app (FastAPI): The FastAPI application, needed to reach the app-scoped BM25 index.
+
+    Returns:
+        Optional[IndexingService]: The lexical service if hybrid search is enabled and the main
+        indexing service is not already lexical, None otherwise.
+    """
+    if not settings.HYBRID_SEARCH_ENABLED or settings.INDEXING_SERVICE == IndexingEnum.BM25.value:
+        return None
+
+    return BM25Service(app)
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from core.services.Indexing import BM25Index
+
+
+def test_indexes_sharing_a_directory_see_each_others_writes(tmp_path):
+    # two instances stand for two workers, each holds its own lock file descriptor
+    first = BM25Index(str(tmp_path))
+    second = BM25Index(str(tmp_path))
+
+    first.add([("a", "apple banana")])
+    second.add([("b", "cherry banana")])
+    first.delete("a")
+
+    assert "a" not in second and "b" in second
+    assert [file_id for file_id, _ in second.search("banana", 5)] == ["b"]
+    assert [file_id for file_id, _ in first.search("cherry", 5)] == ["b"]
+
+
+def test_concurrent_writers_keep_the_log_readable(tmp_path):
+    indexes = [BM25Index(str(tmp_path)) for _ in range(2)]
+
+    def add(index: BM25Index, offset: int) -> None:
+        for position in range(offset, 40, 2):
+            index.add([(f"id{position}", f"term{position} shared")])
+
+    threads = [threading.Thread(target=add, args=(index, offset)) for offset, index in enumerate(indexes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reopened = BM25Index(str(tmp_path))
+    assert len(reopened) == 40
+    assert all(reopened.search(f"term{position}", 1)[0][0] == f"id{position}" for position in range(40))
+    assert len(indexes[0]) == len(indexes[1]) == 40
+
+
+def test_reload_replays_the_additions_and_deletions(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add([("a", "apple banana"), ("b", "banana cherry"), ("c", "cherry date")])
+    index.add([("b", "elderberry")])  # replaces the previous version of b
+    assert index.delete("c")
+    assert not index.delete("unknown")
+
+    reloaded = BM25Index(str(tmp_path))
+
+    assert len(reloaded) == 2
+    assert "c" not in reloaded
+    assert [file_id for file_id, _ in reloaded.search("banana", 5)] == ["a"]
+    assert [file_id for file_id, _ in reloaded.search("elderberry", 5)] == ["b"]
+    assert reloaded.search("cherry date", 5) == []
+
+
+def test_rarer_terms_score_higher(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add([("a", "common rare"), ("b", "common"), ("c", "common")])
+
+    scores = dict(index.search("common rare", 3))
+
+    assert max(scores, key=scores.get) == "a"
+    assert scores["b"] == pytest.approx(scores["c"])
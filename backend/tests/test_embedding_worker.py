@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from core.services.Embedding import EmbeddingWorker
+
+
+def test_a_failed_model_load_fails_the_waiting_requests():
+    async def scenario():
+        worker = EmbeddingWorker(max_batch_size=4, batch_window_ms=0, encode_batch_size=4)
+        worker.start()
+        waiting = asyncio.ensure_future(worker.encode("queued before the failure"))
+        await asyncio.sleep(0)
+
+        worker.set_failed(RuntimeError("no model"))
+
+        errors = []
+        for request in (waiting, worker.encode("sent after the failure")):
+            with pytest.raises(HTTPException) as error:
+                await asyncio.wait_for(request, timeout=1)
+            errors.append(error.value.status_code)
+
+        await worker.stop()
+        return errors, worker.ready
+
+    assert asyncio.run(scenario()) == ([503, 503], False)
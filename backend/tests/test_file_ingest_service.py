@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.models import FileManifestEntry
+from core.services.Directory import DirectoryService
+from core.services.Ingest import FileIngestService
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+class RecordingRepository:
+    def __init__(self):
+        self.deleted_keys = []
+
+    async def delete_by_key(self, hashing_key: str) -> bool:
+        self.deleted_keys.append(hashing_key)
+        return True
+
+
+def entry(file_name: str, hashed_content: str, ingested_at: datetime) -> FileManifestEntry:
+    return FileManifestEntry(file_name=file_name, size=1, mtime_ns=1, raw_hash="", hashed_content=hashed_content,
+                             ingested_at=ingested_at)
+
+
+def test_remove_missing_forgets_the_deleted_files(tmp_path, monkeypatch):
+    from beanie import init_beanie
+
+    monkeypatch.setattr(DirectoryService, "files_dir", str(tmp_path))
+    (tmp_path / "present.txt").write_text("present")
+    (tmp_path / "copy.txt").write_text("same content as deleted.txt")
+    listed_at = datetime.now(timezone.utc)
+    earlier = listed_at - timedelta(minutes=1)
+
+    async def scenario():
+        await init_beanie(database=mongomock_motor.AsyncMongoMockClient().db, document_models=[FileManifestEntry])
+        for manifest_entry in (
+                entry("present.txt", "h_present", earlier),
+                entry("deleted.txt", "h_deleted", earlier),
+                entry("duplicate.txt", "h_shared", earlier),
+                entry("copy.txt", "h_shared", earlier),
+                # written after the listing, such as an upload claimed but not renamed yet
+                entry("claimed.txt", None, listed_at + timedelta(seconds=1)),
+        ):
+            await manifest_entry.insert()
+
+        repository = RecordingRepository()
+        service = FileIngestService(processing_pool=None, document_repository=repository)
+        removed = await service.remove_missing(["present.txt", "copy.txt"], since=listed_at)
+        return removed, repository.deleted_keys, sorted(await FileManifestEntry.distinct("file_name"))
+
+    removed, deleted_keys, manifest = asyncio.run(scenario())
+
+    assert removed == 2
+    # the document of duplicate.txt is still produced by copy.txt
+    assert deleted_keys == ["h_deleted"]
+    assert manifest == ["claimed.txt", "copy.txt", "present.txt"]
+
+
+def test_remove_missing_keeps_a_file_created_after_the_listing(tmp_path, monkeypatch):
+    from beanie import init_beanie
+
+    monkeypatch.setattr(DirectoryService, "files_dir", str(tmp_path))
+    (tmp_path / "late.txt").write_text("late")
+
+    async def scenario():
+        await init_beanie(database=mongomock_motor.AsyncMongoMockClient().db, document_models=[FileManifestEntry])
+        await entry("late.txt", "h_late", datetime.now(timezone.utc) - timedelta(minutes=1)).insert()
+
+        service = FileIngestService(processing_pool=None, document_repository=RecordingRepository())
+        return await service.remove_missing([])
+
+    assert asyncio.run(scenario()) == 0
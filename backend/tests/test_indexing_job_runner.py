@@ -0,0 +1,65 @@
+import asyncio
+import os
+
+import pytest
+
+from core.models import Document, FileManifestEntry, IndexingJob
+from core.services.Directory import DirectoryService
+from core.services.Ingest import FileIngestService
+from core.services.Jobs import IndexingJobRunner
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+class UploadDuringIngest(FileIngestService):
+    """Ingests nothing, but uploads files the way the DataController does while the first batch runs."""
+
+    def __init__(self, uploads: list[str], claims: list[str]):
+        super().__init__(processing_pool=None, document_repository=None)
+        self.uploads = uploads
+        self.claims = claims
+
+    async def ingest(self, file_names: list[str]) -> dict:
+        for file_name in self.uploads:
+            path = DirectoryService.get_file_path(file_name)
+            with open(f"{path}.part", "w", encoding="utf-8") as f:
+                f.write(file_name)
+            await self.claim(file_name, os.stat(f"{path}.part"), self.raw_hash(f"{file_name}.part"))
+            os.replace(f"{path}.part", path)
+
+        # claimed, but not renamed yet when the job ends
+        for file_name in self.claims:
+            await self.claim(file_name, os.stat(DirectoryService.get_file_path(file_names[0])), "")
+
+        self.uploads, self.claims = [], []
+        return {"indexed": 0, "already_indexed": 0, "unchanged": len(file_names), "replaced": 0, "failures": []}
+
+
+async def run_job(runner: IndexingJobRunner) -> IndexingJob:
+    job, _ = await runner.submit()
+    while (await IndexingJob.get(job.id)).status == "running":
+        await asyncio.sleep(0.01)
+    return await IndexingJob.get(job.id)
+
+
+def test_files_uploaded_during_a_job_are_kept(tmp_path, monkeypatch):
+    from beanie import init_beanie
+
+    monkeypatch.setattr(DirectoryService, "files_dir", str(tmp_path))
+    (tmp_path / "kept.txt").write_text("kept")
+
+    async def scenario():
+        await init_beanie(database=mongomock_motor.AsyncMongoMockClient().db,
+                          document_models=[Document, FileManifestEntry, IndexingJob])
+        # a file deleted before the job started
+        await FileManifestEntry(file_name="deleted.txt", size=1, mtime_ns=1, raw_hash="").insert()
+
+        service = UploadDuringIngest(uploads=["uploaded.txt"], claims=["renaming.txt"])
+        job = await run_job(IndexingJobRunner(service, batch_size=8, heartbeat_interval=1, max_reported_failures=10))
+        return job, sorted(await FileManifestEntry.distinct("file_name"))
+
+    job, manifest = asyncio.run(scenario())
+
+    assert job.status == "completed"
+    assert job.removed_count == 1
+    assert manifest == ["renaming.txt", "uploaded.txt"]
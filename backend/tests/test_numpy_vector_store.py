@@ -0,0 +1,79 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from core.services.Indexing import NumpyVectorStore
+
+
+def vector(position: int, dims: int = 8) -> np.ndarray:
+    embedding = np.zeros(dims, dtype=np.float32)
+    embedding[position] = 1
+    return embedding
+
+
+def test_reload_keeps_the_stored_vectors(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    store.add(["a", "b"], [vector(0), vector(1)])
+    store.delete(["a"])
+
+    reloaded = NumpyVectorStore(str(tmp_path))
+
+    assert len(reloaded) == 1
+    assert "a" not in reloaded
+    assert reloaded.search(vector(1), 1)[0][0] == "b"
+
+
+def test_reload_drops_the_uncommitted_ids(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    store.add(["a", "b"], [vector(0), vector(1)])
+
+    # an add interrupted after writing its ids, before committing the meta
+    with open(os.path.join(str(tmp_path), "ids.txt"), "a", encoding="utf-8") as f:
+        f.write("ghost\n")
+
+    reloaded = NumpyVectorStore(str(tmp_path))
+    reloaded.add(["c"], [vector(2)])
+
+    assert reloaded.search(vector(2), 1)[0][0] == "c"
+
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert [reopened.search(vector(position), 1)[0][0] for position in range(3)] == ["a", "b", "c"]
+    assert "ghost" not in reopened
+    with open(os.path.join(str(tmp_path), "meta.json"), encoding="utf-8") as f:
+        assert json.load(f)["count"] == 3
+
+
+def test_stores_sharing_a_directory_see_each_others_writes(tmp_path):
+    # two instances stand for two workers, each holds its own lock file descriptor
+    first = NumpyVectorStore(str(tmp_path))
+    second = NumpyVectorStore(str(tmp_path))
+
+    first.add(["a"], [vector(0)])
+    second.add(["b"], [vector(1)])
+    first.add(["c"], [vector(2)])
+    second.delete(["a"])
+
+    assert "a" not in first and "b" in first
+    assert [first.search(vector(position), 1)[0][0] for position in (1, 2)] == ["b", "c"]
+    assert "a" not in [hit[0] for hit in first.search(vector(0), 3)]
+    assert len(second) == 2
+
+
+def test_concurrent_writers_keep_the_ids_aligned(tmp_path):
+    stores = [NumpyVectorStore(str(tmp_path)) for _ in range(2)]
+
+    def add(store: NumpyVectorStore, offset: int) -> None:
+        for position in range(offset, 32, 2):
+            store.add([f"id{position}"], [vector(position, dims=32)])
+
+    threads = [threading.Thread(target=add, args=(store, offset)) for offset, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert len(reopened) == 32
+    assert all(reopened.search(vector(position, dims=32), 1)[0][0] == f"id{position}" for position in range(32))
@@ -0,0 +1,32 @@
+import pytest
+
+from core.services.Indexing import RankFusion
+
+
+def ranked(*file_ids_and_scores) -> list[dict]:
+    return [{"file_id": file_id, "score": score} for file_id, score in file_ids_and_scores]
+
+
+def test_reciprocal_rank_sums_the_inverse_ranks():
+    fused = RankFusion.reciprocal_rank([ranked(("a", 9), ("b", 8)), ranked(("b", 0.2), ("c", 0.1))], k=60)
+
+    assert [result["file_id"] for result in fused] == ["b", "a", "c"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[2]["score"] == pytest.approx(1 / 62)
+
+
+def test_weighted_score_normalizes_each_branch():
+    fused = RankFusion.weighted_score(
+        [ranked(("a", 10), ("b", 5), ("c", 0)), ranked(("c", 2), ("b", 1)), []],
+        weights=[0.7, 0.3, 1]
+    )
+
+    assert [(result["file_id"], round(result["score"], 4)) for result in fused] == [
+        ("a", 0.7), ("b", 0.35), ("c", 0.3)
+    ]
+
+
+def test_weighted_score_of_a_branch_with_equal_scores():
+    fused = RankFusion.weighted_score([ranked(("a", 3), ("b", 3))], weights=[0.5])
+
+    assert [result["score"] for result in fused] == [0.5, 0.5]
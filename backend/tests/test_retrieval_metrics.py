@@ -0,0 +1,37 @@
+import math
+
+import pytest
+
+from core.services.Evaluation import RetrievalMetrics
+
+RANKING = ["d1", "d2", "d3", "d4"]
+RELEVANT = {"d2", "d4", "d9"}
+
+
+def test_metrics_of_a_known_ranking():
+    assert RetrievalMetrics.average_precision(RANKING, RELEVANT) == pytest.approx((1 / 2 + 2 / 4) / 3)
+    assert RetrievalMetrics.precision_at(RANKING, RELEVANT, 1) == 0
+    assert RetrievalMetrics.precision_at(RANKING, RELEVANT, 2) == 0.5
+    assert RetrievalMetrics.recall(RANKING, RELEVANT) == pytest.approx(2 / 3)
+    assert RetrievalMetrics.ndcg_at(RANKING, RELEVANT, 10) == pytest.approx(
+        (1 / math.log2(3) + 1 / math.log2(5)) / (1 + 1 / math.log2(3) + 1 / math.log2(4))
+    )
+
+
+def test_a_perfect_ranking_scores_one():
+    assert RetrievalMetrics.average_precision(["a", "b"], {"a", "b"}) == 1
+    assert RetrievalMetrics.ndcg_at(["a", "b", "c"], {"a", "b"}, 10) == 1
+
+
+def test_quality_averages_the_queries():
+    quality = RetrievalMetrics.quality({"q1": RANKING, "q2": ["d9"]}, {"q1": RELEVANT, "q2": {"d9"}})
+
+    assert quality["map"] == round((1 / 3 + 1) / 2, 4)
+    assert quality["precision_at_1"] == 0.5
+    assert quality["recall"] == round((2 / 3 + 1) / 2, 4)
+
+
+def test_no_relevant_document_scores_zero():
+    assert RetrievalMetrics.average_precision(RANKING, set()) == 0
+    assert RetrievalMetrics.recall(RANKING, set()) == 0
+    assert RetrievalMetrics.ndcg_at(RANKING, set(), 10) == 0
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from core.models import IndexGeneration, SearchCacheEntry
+from core.services.Search import SearchResultCache
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+async def init_database() -> None:
+    from beanie import init_beanie
+
+    await init_beanie(database=mongomock_motor.AsyncMongoMockClient().db,
+                      document_models=[IndexGeneration, SearchCacheEntry])
+
+
+def test_a_new_generation_invalidates_the_cached_results():
+    async def scenario():
+        await init_database()
+        cache = SearchResultCache(max_size=10, namespace="test", shared=True)
+        key = cache.key("Moon  Sun", retrieved_count=10)
+
+        generation = await cache.generation()
+        await cache.put(key, generation, [{"title": "moon.txt"}])
+        before = await cache.get(cache.key("moon sun", retrieved_count=10), generation)
+
+        new_generation = await cache.bump()
+        return before, new_generation, await cache.get(key, new_generation), await cache.get(key, generation)
+
+    before, new_generation, after, stale = asyncio.run(scenario())
+
+    assert before == [{"title": "moon.txt"}]
+    assert new_generation == 1
+    assert after is None and stale is None
+
+
+def test_workers_share_the_entries_of_the_current_generation():
+    async def scenario():
+        await init_database()
+        first = SearchResultCache(max_size=10, namespace="test", shared=True)
+        second = SearchResultCache(max_size=10, namespace="test", shared=True)
+        key = first.key("moon", retrieved_count=10)
+
+        await first.put(key, await first.generation(), ["cached"])
+        shared = await second.get(key, await second.generation())
+
+        # the generation is read again on every lookup without a ttl
+        await first.bump()
+        return shared, await second.get(key, await second.generation()), await SearchCacheEntry.count()
+
+    shared, after_bump, entries = asyncio.run(scenario())
+
+    assert shared == ["cached"]
+    assert after_bump is None
+    assert entries == 0
+
+
+def test_the_generation_is_reused_within_its_ttl():
+    async def scenario():
+        await init_database()
+        reader = SearchResultCache(max_size=10, namespace="test", generation_ttl=60)
+        writer = SearchResultCache(max_size=10, namespace="test")
+
+        read = await reader.generation()
+        await writer.bump()
+        return read, await reader.generation(), await writer.generation()
+
+    assert asyncio.run(scenario()) == (0, 0, 1)
+
+
+def test_the_keys_depend_on_the_parameters():
+    cache = SearchResultCache(max_size=10, namespace="test")
+
+    assert cache.key("moon", rocchio={"alpha": 1}) != cache.key("moon", rocchio={"alpha": 0.5})
+    assert cache.key("moon") != SearchResultCache(max_size=10, namespace="other").key("moon")
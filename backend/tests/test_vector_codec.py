@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from core.services.Embedding import VectorCodec
+
+
+@pytest.fixture
+def embedding() -> np.ndarray:
+    return np.random.default_rng(0).normal(size=384).astype(np.float32)
+
+
+def test_float32_is_stored_as_a_list(embedding):
+    stored = VectorCodec("float32").encode(embedding)
+
+    assert isinstance(stored, list)
+    assert np.array_equal(VectorCodec.decode(stored), embedding)
+
+
+def test_float16_round_trip(embedding):
+    stored = VectorCodec("float16").encode(embedding)
+
+    assert len(stored) == 8 + 2 * len(embedding)
+    assert np.allclose(VectorCodec.decode(stored), embedding, atol=1e-2)
+
+
+def test_int8_round_trip_within_half_a_step(embedding):
+    stored = VectorCodec("int8").encode(embedding)
+    step = np.abs(embedding).max() / 127
+
+    assert len(stored) == 8 + len(embedding)
+    decoded = VectorCodec.decode(stored)
+    assert decoded.dtype == np.float32
+    assert np.abs(decoded - embedding).max() <= step / 2 + 1e-6
+
+
+def test_formats_decode_side_by_side(embedding):
+    stored = [VectorCodec(storage).encode(embedding) for storage in ("float32", "float16", "int8")]
+
+    decoded = [VectorCodec.decode(vector) for vector in stored]
+
+    assert all(vector.shape == embedding.shape for vector in decoded)
+    assert all(np.dot(vector, embedding) / np.linalg.norm(vector) / np.linalg.norm(embedding) > 0.999
+               for vector in decoded)
+
+
+def test_an_all_zero_vector_survives_int8():
+    assert not VectorCodec.decode(VectorCodec("int8").encode(np.zeros(4, dtype=np.float32))).any()